@@ -0,0 +1,75 @@
+# coding=utf-8
+"""
+Throughput benchmark of writing a zlib-compressed NetCDF variable, by number of compression threads.
+
+One thread is the usual write through netCDF4, with HDF5 compressing each chunk as it's written. More
+threads compress the chunks in parallel (see :mod:`datacube.storage.parallel_compression`), which
+requires `h5py`.
+
+python benchmarks/compression.py --size 4000 --times 4 --threads 1 2 4 8
+"""
+from __future__ import absolute_import, division, print_function
+
+import os
+import shutil
+import tempfile
+import timeit
+
+import click
+import numpy
+import xarray
+
+import datacube
+from datacube.utils import geometry
+from datacube.storage.storage import write_dataset_to_netcdf
+
+CRS = geometry.CRS('EPSG:3577')
+
+
+def make_dataset(size, times):
+    # Smooth and noisy, to compress about as well as imagery
+    data = (numpy.arange(size, dtype='int16')[None, :] + numpy.arange(size, dtype='int16')[:, None] +
+            numpy.random.randint(0, 50, (times, size, size)).astype('int16'))
+    dataset = xarray.Dataset({'band': (('time', 'y', 'x'), data)},
+                             coords={'time': numpy.arange(times, dtype='float64'),
+                                     'y': numpy.arange(size, dtype='float64') * -25,
+                                     'x': numpy.arange(size, dtype='float64') * 25},
+                             attrs={'crs': CRS})
+    dataset.band.attrs['nodata'] = -999
+    dataset.time.attrs['units'] = 'seconds since 1970-01-01 00:00:00'
+    dataset.y.attrs['units'] = dataset.x.attrs['units'] = 'metre'
+    return dataset
+
+
+@click.command(help="Benchmark writing compressed NetCDF files with different numbers of compression threads.")
+@click.option('--size', type=int, default=4000, help="Width and height of each time slice")
+@click.option('--times', type=int, default=4, help="Number of time slices")
+@click.option('--chunk', type=int, default=200, help="Chunk width and height")
+@click.option('--complevel', type=int, default=4, help="zlib compression level")
+@click.option('--repeat', type=int, default=3, help="Best of how many runs")
+@click.option('--threads', type=int, multiple=True, default=[1, 2, 4], help="Numbers of threads to time")
+def main(size, times, chunk, complevel, repeat, threads):
+    dataset = make_dataset(size, times)
+    variable_params = {'band': {'zlib': True, 'complevel': complevel, 'shuffle': True,
+                                'chunksizes': [1, chunk, chunk]}}
+    megabytes = dataset.band.nbytes / 2 ** 20
+
+    directory = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(directory, 'benchmark.nc')
+
+        def write():
+            if os.path.exists(filename):
+                os.remove(filename)
+            write_dataset_to_netcdf(dataset, filename, variable_params=variable_params)
+
+        for count in threads:
+            with datacube.set_options(compress_threads=count):
+                seconds = min(timeit.repeat(write, number=1, repeat=repeat))
+            print('%3d threads  %8.2fs  %8.1f MB/s' % (count, seconds, megabytes / seconds))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
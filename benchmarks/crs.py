@@ -0,0 +1,61 @@
+# coding=utf-8
+"""
+Microbenchmark of CRS comparisons and reprojections, as made for every dataset found by a search.
+
+Compares the interned CRS identities and cached coordinate transformations with working them out on
+every call (the proj.4 string comparison and new transformation used before).
+
+python benchmarks/crs.py --calls 10000
+"""
+from __future__ import absolute_import, division, print_function
+
+import timeit
+
+import click
+from osgeo import osr
+
+from datacube.utils import geometry
+
+WGS84 = geometry.CRS('EPSG:4326')
+ALBERS = geometry.CRS('EPSG:3577')
+# The same CRS, from a different string
+ALBERS_AGAIN = geometry.CRS('epsg:3577')
+FOOTPRINT = geometry.box(149.0, -36.0, 150.0, -35.0, WGS84)
+
+
+def proj4_equality(a, b):
+    # pylint: disable=protected-access
+    canonical = lambda crs: set(crs.ExportToProj4().split() + ['+wktext'])
+    return canonical(a._crs) == canonical(b._crs)
+
+
+def uncached_to_crs(geom, crs):
+    # pylint: disable=protected-access
+    transform = osr.CoordinateTransformation(geom.crs._crs, crs._crs)
+    clone = geom._geom.Clone()
+    clone.Segmentize(1)
+    clone.Transform(transform)
+    return clone
+
+
+def per_call(func, calls, repeat):
+    return min(timeit.repeat(func, number=calls, repeat=repeat)) / calls
+
+
+@click.command(help="Benchmark CRS equality and geometry reprojection.")
+@click.option('--calls', type=int, default=10000, help="Number of calls timed")
+@click.option('--repeat', type=int, default=3, help="Best of how many runs")
+def main(calls, repeat):
+    cases = [
+        ('equality', lambda: proj4_equality(ALBERS, ALBERS_AGAIN), lambda: ALBERS == ALBERS_AGAIN),
+        ('to_crs', lambda: uncached_to_crs(FOOTPRINT, ALBERS), lambda: FOOTPRINT.to_crs(ALBERS)),
+    ]
+    for name, before, after in cases:
+        before_seconds = per_call(before, calls, repeat)
+        after_seconds = per_call(after, calls, repeat)
+        print('%-10s before %9.2fus  after %9.2fus  (%.1fx)' % (name, before_seconds * 1e6, after_seconds * 1e6,
+                                                               before_seconds / after_seconds))
+
+
+if __name__ == '__main__':
+    main()
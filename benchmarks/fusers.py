@@ -0,0 +1,78 @@
+# coding=utf-8
+"""
+Microbenchmark of the built-in fusers, against the simple numpy expressions they replace.
+
+Each fuser combines `--sources` random arrays with 20% nodata into one destination.
+
+python benchmarks/fusers.py --size 4000 --sources 4
+"""
+from __future__ import absolute_import, division, print_function
+
+import timeit
+
+import click
+import numpy
+
+from datacube.storage.fusers import FUSERS, get_fuser
+
+NODATA = -999
+
+
+def copyto_fuser(dest, src):
+    """The default fuser before named fusers existed"""
+    numpy.copyto(dest, src, where=(dest == NODATA))
+
+
+def pq_fuser(dest, src):
+    """The pixel quality fuser from the `Datacube.load` documentation"""
+    valid_bit = 8
+    valid_val = (1 << valid_bit)
+
+    no_data_dest_mask = ~(dest & valid_val).astype(bool)
+    numpy.copyto(dest, src, where=no_data_dest_mask)
+
+    both_data_mask = (valid_val & dest & src).astype(bool)
+    numpy.copyto(dest, src & dest, where=both_data_mask)
+
+
+def make_sources(size, count, dtype):
+    rng = numpy.random.RandomState(42)
+    sources = []
+    for _ in range(count):
+        data = rng.randint(0, 10000, size=(size, size)).astype(dtype)
+        data[rng.random_sample((size, size)) < 0.2] = NODATA
+        sources.append(data)
+    return sources
+
+
+def time_fuser(make_fuser, sources, repeat):
+    dest = numpy.empty_like(sources[0])
+
+    def run():
+        fuse_func = make_fuser()
+        dest.fill(NODATA)
+        for source in sources:
+            fuse_func(dest, source)
+
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+@click.command(help="Benchmark the built-in fusers.")
+@click.option('--size', type=int, default=4000, help="Width and height of the arrays")
+@click.option('--sources', type=int, default=4, help="Number of sources fused into each destination")
+@click.option('--repeat', type=int, default=5, help="Best of how many runs")
+def main(size, sources, repeat):
+    arrays = make_sources(size, sources, 'int16')
+    megapixels = size * size * sources / 1e6
+
+    print('%-20s %10s %12s' % ('fuser', 'time', 'Mpixel/s'))
+    candidates = [('numpy copyto (old)', lambda: copyto_fuser),
+                  ('pq_fuser (docs)', lambda: pq_fuser)]
+    candidates += [(name, lambda name=name: get_fuser(name, numpy.int16(NODATA))) for name in sorted(FUSERS)]
+    for name, make_fuser in candidates:
+        seconds = time_fuser(make_fuser, arrays, repeat)
+        print('%-20s %9.3fs %12.1f' % (name, seconds, megapixels / seconds))
+
+
+if __name__ == '__main__':
+    main()
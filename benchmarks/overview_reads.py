@@ -0,0 +1,102 @@
+# coding=utf-8
+"""
+Compare low resolution reads with and without GDAL overviews.
+
+Writes a tiled GeoTIFF with overviews, then loads it at a range of coarser resolutions,
+once reading from the best overview and once reprojecting from full resolution.
+
+python benchmarks/overview_reads.py --size 8192 --repeat 3
+"""
+from __future__ import absolute_import, division, print_function
+
+import os
+import shutil
+import tempfile
+import time
+
+import click
+import numpy
+import rasterio
+from affine import Affine
+
+import datacube
+from datacube.storage.file_cache import FILE_CACHE
+from datacube.storage.storage import RasterFileDataSource, read_from_source, Resampling
+from datacube.utils import geometry
+
+CRS = 'EPSG:3577'
+
+
+def bytes_read():
+    """
+    Bytes read by this process so far, or None if the OS doesn't tell us.
+    """
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except IOError:
+        pass
+    return None
+
+
+def write_test_file(filename, size, overviews):
+    transform = Affine(25.0, 0.0, 1000000.0, 0.0, -25.0, -1000000.0)
+    with rasterio.open(filename, 'w', driver='GTiff', width=size, height=size, count=1, dtype='int16',
+                       crs=CRS, transform=transform, nodata=-999, tiled=True, blockxsize=256, blockysize=256) as dst:
+        for row in range(0, size, 1024):
+            rows = min(1024, size - row)
+            data = (numpy.arange(rows * size, dtype='int32').reshape((rows, size)) % 10000).astype('int16')
+            dst.write(data, 1, window=((row, row + rows), (0, size)))
+        dst.build_overviews(overviews, Resampling.average)
+    return transform
+
+
+def time_read(source, shape, transform, crs, tolerance, repeat):
+    best = float('inf')
+    read = None
+    for _ in range(repeat):
+        FILE_CACHE.clear()
+        dest = numpy.empty(shape, dtype='int16')
+        before = bytes_read()
+        start = time.time()
+        with datacube.set_options(overview_tolerance=tolerance):
+            read_from_source(source, dest, transform, numpy.int16(-999), crs, Resampling.average)
+        best = min(best, time.time() - start)
+        if before is not None:
+            read = bytes_read() - before
+    return best, read
+
+
+def format_bytes(count):
+    return 'n/a' if count is None else '%.1fMB' % (count / 1e6)
+
+
+@click.command(help="Benchmark low resolution reads with and without overviews.")
+@click.option('--size', type=int, default=8192, help="Width and height of the test file in pixels")
+@click.option('--repeat', type=int, default=3, help="Best of how many runs")
+@click.option('--tolerance', type=float, default=0.1, help="overview_tolerance option to use")
+def main(size, repeat, tolerance):
+    tmpdir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(tmpdir, 'overviews.tif')
+        transform = write_test_file(filename, size, [2, 4, 8, 16, 32])
+        source = RasterFileDataSource(filename, 1)
+        crs = geometry.CRS(CRS)
+
+        print('%8s %12s %12s %12s %12s %8s' % ('scale', 'full time', 'full read', 'ovr time', 'ovr read', 'speedup'))
+        for scale in (1.5, 2, 3, 4, 6, 8, 12, 16, 32):
+            shape = (int(size / scale), int(size / scale))
+            dst_transform = transform * Affine.scale(scale, scale)
+            full_time, full_read = time_read(source, shape, dst_transform, crs, None, repeat)
+            ovr_time, ovr_read = time_read(source, shape, dst_transform, crs, tolerance, repeat)
+            print('%8s %11.3fs %12s %11.3fs %12s %7.1fx' % (scale, full_time, format_bytes(full_read),
+                                                         ovr_time, format_bytes(ovr_read), full_time / ovr_time))
+    finally:
+        FILE_CACHE.clear()
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# coding=utf-8
+"""
+Memory bandwidth benchmark for fusing sources that each cover part of a large destination.
+
+Compares `reproject_and_fuse`, which only touches the window each source covers, with the
+previous approach of filling and fusing whole destination-sized arrays for every source.
+Sources are in-memory arrays on the destination grid, so only the memory traffic is measured.
+
+python benchmarks/partial_loads.py --size 10000 --sources 4
+"""
+from __future__ import absolute_import, division, print_function
+
+import timeit
+from contextlib import contextmanager
+
+import click
+import numpy
+from affine import Affine, identity
+
+from datacube.storage.storage import reproject_and_fuse, read_from_source, Resampling
+
+CRS = 'EPSG:3577'
+NODATA = numpy.int16(-999)
+
+
+class InMemorySource(object):
+    """An array at a pixel offset on the destination grid"""
+    def __init__(self, data, x, y):
+        self.data = data
+        self.transform = Affine.translation(x, y)
+        self.crs = CRS
+        self.nodata = NODATA
+        self.shape = data.shape
+
+    def read(self, window=None, out_shape=None):
+        return self.data[slice(*window[0]), slice(*window[1])]
+
+    @contextmanager
+    def open(self):
+        yield self
+
+
+def whole_array_fuse(sources, destination):
+    """Fill, read and fuse whole destination-sized arrays, as `reproject_and_fuse` used to"""
+    destination.fill(NODATA)
+    buffer_ = numpy.empty(destination.shape, dtype=destination.dtype)
+    for source in sources:
+        read_from_source(source, buffer_, identity, NODATA, CRS, Resampling.nearest)
+        numpy.copyto(destination, buffer_, where=(destination == NODATA))
+
+
+def windowed_fuse(sources, destination):
+    reproject_and_fuse(sources, destination, identity, CRS, NODATA)
+
+
+def make_sources(size, count, coverage):
+    """`count` square sources, each covering `coverage` of the destination, spread along the diagonal"""
+    side = int(size * coverage ** 0.5)
+    rng = numpy.random.RandomState(42)
+    sources = []
+    for i in range(count):
+        offset = (size - side) * i // max(1, count - 1)
+        data = rng.randint(0, 10000, size=(side, side)).astype('int16')
+        sources.append(InMemorySource(data, offset, offset))
+    return sources
+
+
+@click.command(help="Benchmark windowed fusing of partially overlapping sources.")
+@click.option('--size', type=int, default=10000, help="Width and height of the destination")
+@click.option('--sources', 'count', type=int, default=4, help="Number of sources")
+@click.option('--coverage', type=float, default=0.25, help="Fraction of the destination each source covers")
+@click.option('--repeat', type=int, default=3, help="Best of how many runs")
+def main(size, count, coverage, repeat):
+    sources = make_sources(size, count, coverage)
+    destination = numpy.empty((size, size), dtype='int16')
+    gigabytes = destination.nbytes / 1e9
+
+    results = {}
+    for name, func in [('whole arrays', whole_array_fuse), ('windowed', windowed_fuse)]:
+        seconds = min(timeit.repeat(lambda: func(sources, destination), number=1, repeat=repeat))
+        results[name] = destination.copy()
+        print('%-14s %8.3fs  (%.1f destination sizes/s, %.2fGB destination)' % (name, seconds, 1 / seconds,
+                                                                                gigabytes))
+
+    assert (results['whole arrays'] == results['windowed']).all()
+
+
+if __name__ == '__main__':
+    main()
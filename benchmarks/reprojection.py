@@ -0,0 +1,81 @@
+# coding=utf-8
+"""
+Benchmark of repeated nearest neighbour reads of sources on the same grid, as in a stack of time slices.
+
+Compares reading with the cached pixel mapping (`reproject_cache_size` > 0) with leaving every read to
+GDAL. Sources are in-memory arrays, so only the reprojection is measured.
+
+python benchmarks/reprojection.py --size 2000 --reads 20
+"""
+from __future__ import absolute_import, division, print_function
+
+import timeit
+from contextlib import contextmanager
+
+import click
+import numpy
+import rasterio.warp
+from affine import Affine
+
+import datacube
+from datacube.utils import geometry
+from datacube.storage.storage import read_from_source, Resampling
+from datacube.storage.warp import PIXEL_MAPPINGS
+
+SRC_CRS = geometry.CRS('EPSG:4326')
+SRC_TRANSFORM = Affine(0.00025, 0.0, 149.0, 0.0, -0.00025, -35.0)
+DST_CRS = geometry.CRS('EPSG:3577')
+DST_TRANSFORM = Affine(25.0, 0.0, 1548000.0, 0.0, -25.0, -3950000.0)
+NODATA = numpy.int16(-999)
+
+
+class InMemorySource(object):
+    """An array on a geographic grid"""
+    def __init__(self, data):
+        self.data = data
+        self.transform = SRC_TRANSFORM
+        self.crs = SRC_CRS
+        self.nodata = NODATA
+        self.shape = data.shape
+
+    def read(self, window=None, out_shape=None):
+        return self.data[slice(*window[0]), slice(*window[1])]
+
+    def overviews(self):
+        return []
+
+    def reproject(self, dest, dst_transform, dst_crs, dst_nodata, resampling, **kwargs):
+        return rasterio.warp.reproject(self.data, dest,
+                                       src_transform=self.transform, src_crs=str(self.crs), src_nodata=self.nodata,
+                                       dst_transform=dst_transform, dst_crs=str(dst_crs), dst_nodata=dst_nodata,
+                                       resampling=resampling, **kwargs)
+
+    @contextmanager
+    def open(self):
+        yield self
+
+
+def read_all(sources, destination):
+    for source in sources:
+        read_from_source(source, destination, DST_TRANSFORM, NODATA, DST_CRS, Resampling.nearest)
+
+
+@click.command(help="Benchmark repeated nearest neighbour reprojection onto the same grid.")
+@click.option('--size', type=int, default=2000, help="Width and height of the sources and destination")
+@click.option('--reads', type=int, default=20, help="Number of sources read, all on the same grid")
+@click.option('--repeat', type=int, default=3, help="Best of how many runs")
+def main(size, reads, repeat):
+    rng = numpy.random.RandomState(42)
+    sources = [InMemorySource(rng.randint(0, 10000, size=(size, size)).astype('int16')) for _ in range(reads)]
+    destination = numpy.empty((size, size), dtype='int16')
+
+    for name, cache_size in [('gdal', 0), ('cached mapping', 256)]:
+        with datacube.set_options(reproject_cache_size=cache_size):
+            PIXEL_MAPPINGS.clear()
+            seconds = min(timeit.repeat(lambda: read_all(sources, destination), number=1, repeat=repeat))
+        print('%-15s %8.3fs  (%.1f reads/s)' % (name, seconds, reads / seconds))
+    print(PIXEL_MAPPINGS.stats())
+
+
+if __name__ == '__main__':
+    main()
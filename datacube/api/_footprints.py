@@ -0,0 +1,93 @@
+# coding=utf-8
+"""
+Spatial filtering of many datasets at once.
+"""
+from __future__ import absolute_import
+
+import numpy
+
+from ..utils import intersects
+
+
+class _CRSGroup(object):
+    """
+    The footprints sharing a CRS
+
+    :type crs: datacube.utils.geometry.CRS
+    :param numpy.ndarray indexes: positions of the datasets in the full list
+    :param numpy.ndarray bounds: (left, bottom, right, top) of each footprint, one row per dataset
+    """
+
+    def __init__(self, crs, indexes, bounds):
+        self.crs = crs
+        self.indexes = indexes
+        self.bounds = bounds
+
+
+class DatasetFootprints(object):
+    """
+    Footprints of a list of datasets, for finding the ones that intersect a geometry
+
+    Geometries are reprojected once for each distinct CRS of the footprints, rather than once per
+    dataset. Datasets whose bounding boxes don't overlap the geometry's are ruled out all at once, and
+    only the rest are compared exactly.
+
+    Datasets without an extent never intersect anything.
+
+    :param list[datacube.model.Dataset] datasets:
+    """
+
+    def __init__(self, datasets):
+        self.datasets = list(datasets)
+
+        by_crs_string = {}
+        for index, dataset in enumerate(self.datasets):
+            extent = dataset.extent
+            if extent is None:
+                continue
+            envelope = extent.envelope
+            key = str(extent.crs)
+            if key not in by_crs_string:
+                by_crs_string[key] = (extent.crs, [], [])
+            by_crs_string[key][1].append(index)
+            by_crs_string[key][2].append((envelope.left, envelope.bottom, envelope.right, envelope.top))
+
+        # Different strings can still describe the same CRS
+        self._groups = []
+        for crs, indexes, bounds in by_crs_string.values():
+            for group in self._groups:
+                if group.crs == crs:
+                    group.indexes = numpy.concatenate([group.indexes, indexes])
+                    group.bounds = numpy.concatenate([group.bounds, bounds])
+                    break
+            else:
+                self._groups.append(_CRSGroup(crs, numpy.array(indexes, dtype='intp'),
+                                              numpy.array(bounds, dtype='float64')))
+
+    def intersecting_indexes(self, geom):
+        """
+        Positions of the datasets that intersect `geom`, in ascending order.
+
+        :param datacube.utils.geometry.Geometry geom:
+        :rtype: numpy.ndarray
+        """
+        found = []
+        for group in self._groups:
+            group_geom = geom.to_crs(group.crs)
+            envelope = group_geom.envelope
+            bounds = group.bounds
+            # Footprints with bounding boxes that only touch can't intersect either
+            overlaps = ((bounds[:, 0] < envelope.right) & (bounds[:, 2] > envelope.left) &
+                        (bounds[:, 1] < envelope.top) & (bounds[:, 3] > envelope.bottom))
+            found.extend(index for index in group.indexes[overlaps]
+                         if intersects(group_geom, self.datasets[index].extent))
+        return numpy.array(sorted(found), dtype='intp')
+
+    def intersecting(self, geom):
+        """
+        The datasets that intersect `geom`, in their original order.
+
+        :param datacube.utils.geometry.Geometry geom:
+        :rtype: list[datacube.model.Dataset]
+        """
+        return [self.datasets[index] for index in self.intersecting_indexes(geom)]
@@ -4,6 +4,7 @@ import logging
 from itertools import groupby
 from collections import namedtuple, OrderedDict
 from math import ceil
+from multiprocessing.pool import ThreadPool
 import warnings
 
 import pandas
@@ -12,11 +13,14 @@ import xarray
 from affine import Affine
 from dask import array as da
 
-from ..config import LocalConfig
+from ..config import LocalConfig, OPTIONS
 from ..compat import string_types
 from ..index import index_connect
-from ..storage.storage import DatasetSource, reproject_and_fuse
+from ..storage.storage import DatasetSource, reproject_and_fuse, reproject_and_fuse_many, reproject_and_fuse_bands
+from ..storage.storage import FuseJob
+from ..storage.fusers import check_fuser
 from ..utils import geometry, intersects, data_resolution_and_offset
+from ._footprints import DatasetFootprints
 from .query import Query, query_group_by, query_geopolygon
 
 _LOG = logging.getLogger(__name__)
@@ -189,6 +193,7 @@ class Datacube(object):
 
             For data that has different values for the scene overlap the requires more complex rules for combining data,
             such as GA's Pixel Quality dataset, a function can be provided to the merging into a single time slice.
+            Common rules are built in, and can be selected by name, eg. ``fuse_func='bitwise_and'``.
             ::
 
                 def pq_fuser(dest, src):
@@ -209,6 +214,8 @@ class Datacube(object):
             To reproject or resample the data, supply the ``output_crs``, ``resolution``, ``resampling`` and ``align``
             fields.
 
+            To work through queries that are too large to load into memory at once, see :meth:`load_iter`.
+
             To reproject data to 25m resolution for EPSG:3577::
 
                 dc.load(product='ls5_nbar_albers', x=(148.15, 148.2), y=(-35.15, -35.2), time=('1990', '1991'),
@@ -276,6 +283,12 @@ class Datacube(object):
             data is simply copied over the top of each other, in a relatively undefined manner. This function can
             perform a specific combining step, eg. for combining GA PQ data.
 
+            The name of a built-in fuser can be given instead of a function: ``'first_valid'`` (the default),
+            ``'last_valid'``, ``'min'``, ``'max'``, ``'bitwise_and'``, ``'bitwise_or'`` or ``'nanmean'``.
+            See :mod:`datacube.storage.fusers`.
+
+        :type fuse_func: callable or str
+
         :param datasets:
             Optional. If this is a non-empty list of :class:`datacube.model.Dataset` objects, these will be loaded
             instead of performing a database lookup.
@@ -289,6 +302,52 @@ class Datacube(object):
         if not observations:
             return None if stack else xarray.Dataset()
 
+        grouped, geobox, measurements = self._prepare_load(observations, product, measurements, output_crs,
+                                                           resolution, resampling, like, align, **query)
+
+        result = self.load_data(grouped, geobox, measurements.values(),
+                                fuse_func=fuse_func, dask_chunks=dask_chunks)
+        return _stack(result, stack)
+
+    def load_iter(self, product=None, measurements=None, output_crs=None, resolution=None, resampling=None,
+                  stack=False, like=None, fuse_func=None, align=None, datasets=None, batch_size=1, prefetch=True,
+                  **query):
+        """
+        Load data one time slice (or `batch_size` time slices) at a time.
+
+        Takes the same arguments as :meth:`load` (except ``dask_chunks``), and yields an :class:`xarray.Dataset`
+        (or :class:`xarray.DataArray` if `stack` is given) for each batch of time slices in turn.
+
+        Only the batches being used and prefetched are held in memory, so this can process queries that
+        are far too big to :meth:`load` at once::
+
+            for data in dc.load_iter(product='ls5_nbar_albers', time=('1990', '2010'), batch_size=10):
+                ...
+
+        :param int batch_size: Number of time slices in each batch
+        :param bool prefetch: Load the next batch in a background thread while the current batch is being used.
+            This holds (at most) one extra batch in memory.
+
+        .. seealso:: :meth:`load` :meth:`load_data_iter`
+        """
+        observations = datasets or self.find_datasets(product=product, like=like, **query)
+        if not observations:
+            return
+
+        grouped, geobox, measurements = self._prepare_load(observations, product, measurements, output_crs,
+                                                           resolution, resampling, like, align, **query)
+
+        for result in self.load_data_iter(grouped, geobox, measurements.values(), fuse_func=fuse_func,
+                                          batch_size=batch_size, prefetch=prefetch):
+            yield _stack(result, stack)
+
+    def _prepare_load(self, observations, product, measurements, output_crs, resolution, resampling, like, align,
+                      **query):
+        """
+        Work out what :meth:`load` should load.
+
+        :return: (grouped datasets, output geobox, measurements by name)
+        """
         if like:
             assert output_crs is None, "'like' and 'output_crs' are not supported together"
             assert resolution is None, "'like' and 'resolution' are not supported together"
@@ -318,14 +377,7 @@ class Datacube(object):
         measurements = self.index.products.get_by_name(product).lookup_measurements(measurements)
         measurements = set_resampling_method(measurements, resampling)
 
-        result = self.load_data(grouped, geobox, measurements.values(),
-                                fuse_func=fuse_func, dask_chunks=dask_chunks)
-        if not stack:
-            return result
-        else:
-            if not isinstance(stack, string_types):
-                stack = 'measurement'
-            return result.to_array(dim=stack)
+        return grouped, geobox, measurements
 
     def product_observations(self, **kwargs):
         warnings.warn("product_observations() has been renamed to find_datasets() and will eventually be removed",
@@ -337,7 +389,8 @@ class Datacube(object):
         Find datasets for a product.
 
         :param kwargs: see :class:`datacube.api.query.Query`
-        :return: list of datasets
+        :return: list of datasets, or of :class:`datacube.model.DatasetRecord` if the `lightweight_datasets`
+                 option is set (see :class:`datacube.set_options`)
         :rtype: list[:class:`datacube.model.Dataset`]
 
         .. seealso:: :meth:`group_datasets` :meth:`load_data`
@@ -346,10 +399,9 @@ class Datacube(object):
         if not query.product:
             raise RuntimeError('must specify a product')
 
-        datasets = self.index.datasets.search_eager(**query.search_terms)
+        datasets = _search_datasets(self.index, query.search_terms)
         if query.geopolygon:
-            datasets = [dataset for dataset in datasets
-                        if intersects(query.geopolygon.to_crs(dataset.crs), dataset.extent)]
+            datasets = DatasetFootprints(datasets).intersecting(query.geopolygon)
             # Check against the bounding box of the original scene, can throw away some portions
 
         return datasets
@@ -463,7 +515,8 @@ class Datacube(object):
             list of measurement dicts with keys: {'name', 'dtype', 'nodata', 'units'}
 
         :param fuse_func:
-            function to merge successive arrays as an output
+            function to merge successive arrays as an output, or the name of a built-in fuser
+            (see :mod:`datacube.storage.fusers`)
 
         :param dict dask_chunks:
             If provided, the data will be loaded on demand using using :class:`dask.array.Array`.
@@ -476,13 +529,22 @@ class Datacube(object):
 
         .. seealso:: :meth:`find_datasets` :meth:`group_datasets`
         """
-        if dask_chunks is None:
+        check_fuser(fuse_func)
+
+        if dask_chunks is None and OPTIONS['read_threads'] > 1:
+            measurements = list(measurements)
+            loaded = _fuse_measurements_concurrently(sources, geobox, measurements, fuse_func=fuse_func,
+                                                     skip_broken_datasets=skip_broken_datasets)
+
             def data_func(measurement):
-                data = numpy.full(sources.shape + geobox.shape, measurement['nodata'], dtype=measurement['dtype'])
-                for index, datasets in numpy.ndenumerate(sources.values):
-                    _fuse_measurement(data[index], datasets, geobox, measurement, fuse_func=fuse_func,
-                                      skip_broken_datasets=skip_broken_datasets)
-                return data
+                return loaded[measurement['name']]
+        elif dask_chunks is None:
+            measurements = list(measurements)
+            loaded = _fuse_measurements(sources, geobox, measurements, fuse_func=fuse_func,
+                                        skip_broken_datasets=skip_broken_datasets)
+
+            def data_func(measurement):
+                return loaded[measurement['name']]
         else:
             def data_func(measurement):
                 return _make_dask_array(sources, geobox, measurement, fuse_func, dask_chunks)
@@ -490,6 +552,38 @@ class Datacube(object):
         return Datacube.create_storage(OrderedDict((dim, sources.coords[dim]) for dim in sources.dims),
                                        geobox, measurements, data_func)
 
+    @staticmethod
+    def load_data_iter(sources, geobox, measurements, fuse_func=None, skip_broken_datasets=False, batch_size=1,
+                       prefetch=True):
+        """
+        Load data from :meth:`group_datasets` a batch of time slices at a time.
+
+        Yields the same data as :meth:`load_data`, split along the first dimension of `sources` into
+        :class:`xarray.Dataset` objects of (at most) `batch_size` slices.
+
+        :param int batch_size: Number of time slices in each batch
+        :param bool prefetch: Load the next batch in a background thread while the current batch is being used.
+            This holds (at most) one extra batch in memory.
+
+        .. seealso:: :meth:`load_data`
+        """
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        measurements = list(measurements)
+
+        def load_batch(batch):
+            return Datacube.load_data(batch, geobox, measurements, fuse_func=fuse_func,
+                                      skip_broken_datasets=skip_broken_datasets)
+
+        batches = (sources[start:start + batch_size] for start in range(0, sources.shape[0], batch_size))
+        if not prefetch:
+            for batch in batches:
+                yield load_batch(batch)
+            return
+
+        for result in _prefetch(load_batch, batches):
+            yield result
+
     @staticmethod
     def measurement_data(sources, geobox, measurement, fuse_func=None, dask_chunks=None):
         """
@@ -498,7 +592,7 @@ class Datacube(object):
         :param xarray.DataArray sources: DataArray holding a list of :class:`datacube.model.Dataset` objects
         :param GeoBox geobox: A GeoBox defining the output spatial projection and resolution
         :param measurement: measurement definition with keys: {'name', 'dtype', 'nodata', 'units'}
-        :param fuse_func: function to merge successive arrays as an output
+        :param fuse_func: function to merge successive arrays as an output, or the name of a built-in fuser
         :param dict dask_chunks: If the data should be loaded as needed using :class:`dask.array.Array`,
             specify the chunk size in each output direction.
 
@@ -532,10 +626,49 @@ class Datacube(object):
         self.close()
 
 
+def _search_datasets(index, search_terms):
+    """
+    Search for datasets to load: as lightweight records if the `lightweight_datasets` option is set.
+
+    :rtype: list[datacube.model.Dataset|datacube.model.DatasetRecord]
+    """
+    if OPTIONS['lightweight_datasets']:
+        return list(index.datasets.search_records(**search_terms))
+    return index.datasets.search_eager(**search_terms)
+
+
+def _stack(result, stack):
+    if not stack:
+        return result
+    if not isinstance(stack, string_types):
+        stack = 'measurement'
+    return result.to_array(dim=stack)
+
+
+def _prefetch(func, items):
+    """
+    Yield `func(item)` for each of `items`, computing the next result in a background thread
+    while the current one is being used.
+    """
+    pool = ThreadPool(1)
+    try:
+        pending = None
+        for item in items:
+            result = pending.get() if pending is not None else None
+            pending = pool.apply_async(func, (item,))
+            if result is not None:
+                yield result
+                del result
+        if pending is not None:
+            yield pending.get()
+    finally:
+        pool.terminate()
+
+
 def fuse_lazy(datasets, geobox, measurement, fuse_func=None, prepend_dims=0):
     prepend_shape = (1,) * prepend_dims
-    data = numpy.full(geobox.shape, measurement['nodata'], dtype=measurement['dtype'])
-    _fuse_measurement(data, datasets, geobox, measurement, fuse_func)
+    data = numpy.empty(geobox.shape, dtype=measurement['dtype'])
+    _fuse_measurement(data, datasets, geobox, measurement, fuse_func=fuse_func)
     return data.reshape(prepend_shape + geobox.shape)
 
 
@@ -550,6 +683,58 @@ def _fuse_measurement(dest, datasets, geobox, measurement, skip_broken_datasets=
                        skip_broken_datasets=skip_broken_datasets)
 
 
+def _fuse_measurements(sources, geobox, measurements, fuse_func=None, skip_broken_datasets=False):
+    """
+    Load every measurement of every group in `sources`.
+
+    Measurements stored in the same file are read together, opening each file once per dataset.
+
+    :rtype: dict[str, numpy.ndarray]
+    """
+    loaded = OrderedDict((measurement['name'], numpy.empty(sources.shape + geobox.shape,
+                                                           dtype=measurement['dtype']))
+                         for measurement in measurements)
+    nodatas = [loaded[measurement['name']].dtype.type(measurement['nodata']) for measurement in measurements]
+    resamplings = [measurement.get('resampling_method', 'nearest') for measurement in measurements]
+
+    for index, datasets in numpy.ndenumerate(sources.values):
+        reproject_and_fuse_bands([[DatasetSource(dataset, measurement['name']) for measurement in measurements]
+                                  for dataset in datasets],
+                                 [loaded[measurement['name']][index] for measurement in measurements],
+                                 geobox.affine,
+                                 geobox.crs,
+                                 nodatas,
+                                 resamplings,
+                                 fuse_func=fuse_func,
+                                 skip_broken_datasets=skip_broken_datasets)
+    return loaded
+
+
+def _fuse_measurements_concurrently(sources, geobox, measurements, fuse_func=None, skip_broken_datasets=False):
+    """
+    Load every measurement of every group in `sources`, reading all the datasets concurrently.
+
+    :rtype: dict[str, numpy.ndarray]
+    """
+    loaded = OrderedDict()
+    jobs = []
+    for measurement in measurements:
+        data = numpy.empty(sources.shape + geobox.shape, dtype=measurement['dtype'])
+        loaded[measurement['name']] = data
+        nodata = data.dtype.type(measurement['nodata'])
+        for index, datasets in numpy.ndenumerate(sources.values):
+            jobs.append(FuseJob([DatasetSource(dataset, measurement['name']) for dataset in datasets],
+                                data[index],
+                                geobox.affine,
+                                geobox.crs,
+                                nodata,
+                                measurement.get('resampling_method', 'nearest'),
+                                fuse_func))
+
+    reproject_and_fuse_many(jobs, skip_broken_datasets=skip_broken_datasets)
+    return loaded
+
+
 def get_bounds(datasets, crs):
     left = min([d.extent.to_crs(crs).boundingbox.left for d in datasets])
     right = max([d.extent.to_crs(crs).boundingbox.right for d in datasets])
@@ -599,6 +784,26 @@ def _chunk_geobox(geobox, chunk_size):
     return geobox_subsets
 
 
+def _datasets_intersecting(datasets, geobox, footprints):
+    """
+    Those of `datasets` whose footprint intersects `geobox`, in their original order.
+
+    Datasets without a known footprint are always included.
+
+    :param dict footprints: Dataset footprints in `geobox.crs` by dataset id, filled in as they are needed
+    :rtype: tuple
+    """
+    extent = geobox.extent
+    subset = []
+    for dataset in datasets:
+        if dataset.id not in footprints:
+            footprints[dataset.id] = dataset.extent.to_crs(geobox.crs) if dataset.extent is not None else None
+        footprint = footprints[dataset.id]
+        if footprint is None or intersects(extent, footprint):
+            subset.append(dataset)
+    return tuple(subset)
+
+
 def _calculate_chunk_sizes(sources, geobox, dask_chunks):
     valid_keys = sources.dims + geobox.dimensions
     bad_keys = set(dask_chunks) - set(valid_keys)
@@ -625,11 +830,17 @@ def _make_dask_array(sources, geobox, measurement, fuse_func=None, dask_chunks=N
 
     dsk = {}
     geobox_subsets = _chunk_geobox(geobox, grid_chunks)
+    footprints = {}
 
     for irr_index, datasets in numpy.ndenumerate(sources.values):
         for grid_index, subset_geobox in geobox_subsets.items():
-            dsk[(dsk_name,) + irr_index + grid_index] = (fuse_lazy,
-                                                         datasets, subset_geobox, measurement, fuse_func, sources.ndim)
+            subset_datasets = _datasets_intersecting(datasets, subset_geobox, footprints)
+            if subset_datasets:
+                dsk[(dsk_name,) + irr_index + grid_index] = (fuse_lazy, subset_datasets, subset_geobox, measurement,
+                                                             fuse_func, sources.ndim)
+            else:
+                dsk[(dsk_name,) + irr_index + grid_index] = (numpy.full, sliced_irr_chunks + subset_geobox.shape,
+                                                             measurement['nodata'], measurement['dtype'])
 
     data = da.Array(dsk, dsk_name,
                     chunks=(sliced_irr_chunks + grid_chunks),
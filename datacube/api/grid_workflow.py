@@ -8,9 +8,9 @@ from collections import OrderedDict
 import warnings
 import pandas as pd
 
-from ..utils import intersects
+from ._footprints import DatasetFootprints
 from .query import Query, query_group_by
-from .core import Datacube, set_resampling_method
+from .core import Datacube, set_resampling_method, _search_datasets
 
 _LOG = logging.getLogger(__name__)
 
@@ -182,37 +182,30 @@ class GridWorkflow(object):
         if cell_index:
             assert len(cell_index) == 2
             cell_index = tuple(cell_index)
-            geobox = self.grid_spec.tile_geobox(cell_index)
-            geobox = geobox.buffered(*tile_buffer) if tile_buffer else geobox
+            geobox = self.grid_spec.buffered_tile_geobox(cell_index, tile_buffer)
 
             datasets, query = self._find_datasets(geobox.extent, indexers)
-            for dataset in datasets:
-                if intersects(geobox.extent, dataset.extent.to_crs(self.grid_spec.crs)):
-                    add_dataset_to_cells(cell_index, geobox, dataset)
+            for dataset in DatasetFootprints(datasets).intersecting(geobox.extent):
+                add_dataset_to_cells(cell_index, geobox, dataset)
             return cells
         else:
             datasets, query = self._find_datasets(geopolygon, indexers)
 
             if query.geopolygon:
-                # Get a rough region of tiles
-                query_tiles = set(
-                    tile_index for tile_index, tile_geobox in
-                    self.grid_spec.tiles_inside_geopolygon(query.geopolygon))
-
-                for dataset in datasets:
-                    # Go through our datasets and see which tiles each dataset produces, and whether they intersect
-                    # our query geopolygon.
-                    dataset_extent = dataset.extent.to_crs(self.grid_spec.crs)
-                    for tile_index, tile_geobox in self.grid_spec.tiles(
-                            dataset_extent.boundingbox.buffered(*tile_buffer)):
-                        if tile_index in query_tiles and intersects(tile_geobox.extent, dataset_extent):
-                            add_dataset_to_cells(tile_index, tile_geobox, dataset)
+                # Go through the tiles intersecting our query geopolygon, and see which datasets intersect each.
+                footprints = DatasetFootprints(datasets)
+                for tile_index, tile_geobox in self.grid_spec.tiles_inside_geopolygon(query.geopolygon):
+                    for dataset in footprints.intersecting(tile_geobox.extent):
+                        add_dataset_to_cells(tile_index, tile_geobox, dataset)
 
             else:
-                for dataset in datasets:
-                    for tile_index, tile_geobox in self.grid_spec.tiles_inside_geopolygon(dataset.extent,
-                                                                                          tile_buffer=tile_buffer):
-                        add_dataset_to_cells(tile_index, tile_geobox, dataset)
+                # Tile the footprints of all the datasets at once, making geoboxes for only the tiles used
+                tiles = self.grid_spec.tiles_of_geopolygons([dataset.extent for dataset in datasets],
+                                                            tile_buffer=tile_buffer)
+                for tile_index, positions in tiles.items():
+                    tile_geobox = self.grid_spec.buffered_tile_geobox(tile_index, tile_buffer)
+                    for position in positions:
+                        add_dataset_to_cells(tile_index, tile_geobox, datasets[position])
 
             return cells
 
@@ -220,7 +213,7 @@ class GridWorkflow(object):
         query = Query(index=self.index, geopolygon=geopolygon, **indexers)
         if not query.product:
             raise RuntimeError('must specify a product')
-        datasets = self.index.datasets.search_eager(**query.search_terms)
+        datasets = _search_datasets(self.index, query.search_terms)
         return datasets, query
 
     @staticmethod
@@ -352,7 +345,8 @@ class GridWorkflow(object):
             for more information.
 
         :param fuse_func: Function to fuse together a tile that has been pre-grouped by calling
-            :meth:`list_cells` with a ``group_by`` parameter.
+            :meth:`list_cells` with a ``group_by`` parameter, or the name of a built-in fuser
+            (see :mod:`datacube.storage.fusers`).
 
         :param str resampling: The resampling method to use if re-projection is required.
 
@@ -102,6 +102,9 @@ class Query(object):
                 kwargs['lon'] = Range(geo_bb.left, geo_bb.right)
             else:
                 kwargs['lon'] = geo_bb.left
+            if geo_bb.bottom != geo_bb.top and geo_bb.left != geo_bb.right:
+                # Only datasets whose footprint intersects the polygon, not just its bounding box
+                kwargs['footprint'] = self.geopolygon
         if self.product:
             kwargs['product'] = self.product
         if self.source_filter:
@@ -30,6 +30,8 @@ db_hostname:
 db_database: datacube
 # If a connection is unused for this length of time, expect it to be invalidated.
 db_connection_timeout: 60
+# Search results are streamed from the database this many rows at a time. 0 fetches all results at once.
+db_fetch_size: 1000
 """
 
 DATACUBE_SECTION = 'datacube'
@@ -78,6 +80,10 @@ class LocalConfig(object):
     def db_connection_timeout(self):
         return int(self._prop('db_connection_timeout'))
 
+    @property
+    def db_fetch_size(self):
+        return int(self._prop('db_fetch_size') or 1000)
+
     @property
     def db_username(self):
         try:
@@ -107,15 +113,43 @@ class LocalConfig(object):
         return self.__str__()
 
 
-OPTIONS = {'reproject_threads': 4}
+OPTIONS = {'reproject_threads': 4, 'read_threads': 1, 'file_cache_size': 64, 'file_cache_timeout': 60,
+           'overview_tolerance': 0.1, 'reproject_cache_size': 256, 'catalogue_refresh_interval': 10,
+           'search_cache_size': 0, 'search_cache_ttl': 60, 'lightweight_datasets': False,
+           'compress_threads': 1}
 
 
 #: pylint: disable=invalid-name
 class set_options(object):
     """Set global state within a controlled context
 
-    Currently, the only supported options are:
+    Currently, the supported options are:
     * reproject_threads: The number of threads to use when reprojecting
+    * read_threads: The number of threads used to read source datasets concurrently when loading.
+      Values greater than 1 read every source of every time slice and measurement in a thread pool,
+      fusing them in the same order as a serial load. Defaults to 1 (serial reads).
+    * file_cache_size: The maximum number of idle source files kept open for reuse. 0 disables the cache.
+    * file_cache_timeout: Seconds after which an unused cached file is closed.
+    * overview_tolerance: When loading at a coarser resolution than the source, read from the coarsest
+      overview that is at most this fraction coarser than the destination. None disables overview reads.
+    * reproject_cache_size: Megabytes of memory used to remember where each destination pixel comes from
+      in the source, when reprojecting with nearest neighbour resampling. 0 disables the cache, and
+      leaves all reprojection to GDAL.
+    * catalogue_refresh_interval: Seconds for which the index's in-memory copy of its products and metadata
+      types is used without checking the database for changes made by other processes. 0 checks on every
+      use, None never checks. Changes made through the same index are always seen straight away.
+    * search_cache_size: The maximum total number of datasets kept from recent dataset searches, so that
+      repeating a search doesn't query the database again. 0 (the default) disables the cache. Its use can
+      be seen with ``index.datasets.search_cache.stats()``.
+    * search_cache_ttl: Seconds for which a cached search is used. Changes made through the same index
+      remove the affected searches straight away, but changes made by other processes aren't seen until then.
+    * lightweight_datasets: Whether ``Datacube.find_datasets()``, ``Datacube.load()`` and ``GridWorkflow`` search
+      for :class:`datacube.model.DatasetRecord` objects, which only read the parts of each document needed for
+      loading, rather than full datasets. Much faster for searches finding many datasets. Defaults to False.
+    * compress_threads: The number of threads compressing the chunks of zlib-compressed variables when writing
+      NetCDF files with ``write_dataset_to_netcdf`` (as ingest does), or the chunks of every variable when writing
+      Zarr storage units with ``write_dataset_to_zarr``. Values greater than 1 require the ``h5py`` package for
+      NetCDF files. Defaults to 1 (compression by HDF5 as each chunk is written).
 
     You can use ``set_options`` either as a context manager::
 
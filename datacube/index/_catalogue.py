@@ -0,0 +1,129 @@
+# coding=utf-8
+"""
+In-memory copy of the index's catalogue of metadata types and products.
+
+The catalogue is small and changes rarely, but is consulted for every search and every load: to find
+the products that can match a query, and the search fields each one has. Building it from the database
+means parsing every definition and its search fields, so it's kept here instead, shared by the metadata
+type and product resources of an index.
+
+Changes made through the same index replace the copy straight away. Changes made elsewhere are noticed
+by comparing a cheap version of the catalogue tables with the one the copy was built from, at most once
+every `catalogue_refresh_interval` seconds (see :class:`datacube.set_options`). In between, lookups
+don't touch the database at all.
+"""
+from __future__ import absolute_import
+
+import logging
+import threading
+import time
+
+from datacube.config import OPTIONS
+from datacube.model import DatasetType
+
+_LOG = logging.getLogger(__name__)
+
+
+class _Contents(object):
+    """
+    One consistent snapshot of the catalogue
+
+    :type metadata_types: list[datacube.model.MetadataType]
+    :type products: list[datacube.model.DatasetType]
+    """
+
+    def __init__(self, version, metadata_types, products):
+        self.version = version
+        self.metadata_types = metadata_types
+        self.products = products
+
+        self.metadata_types_by_id = {type_.id: type_ for type_ in metadata_types}
+        self.metadata_types_by_name = {type_.name: type_ for type_ in metadata_types}
+        self.products_by_id = {product.id: product for product in products}
+        self.products_by_name = {product.name: product for product in products}
+
+
+class CatalogueCache(object):
+    """
+    Metadata types and products of an index, loaded once and kept until they change
+
+    Thread safe.
+
+    :param db: database to load the catalogue from
+    :type db: datacube.index.postgres._connections.PostgresDb
+    :param make_metadata_type: function creating a :class:`datacube.model.MetadataType` from its table row
+    """
+
+    def __init__(self, db, make_metadata_type):
+        self._db = db
+        self._make_metadata_type = make_metadata_type
+        self._lock = threading.Lock()
+        self._contents = None
+        self._checked = None
+
+    def invalidate(self):
+        """
+        Forget the catalogue, so that it's loaded again when it's next used.
+
+        Called after every change made through this index.
+        """
+        with self._lock:
+            self._contents = None
+            self._checked = None
+
+    def contents(self, refresh=False):
+        """
+        The current catalogue.
+
+        :param bool refresh: check for changes made elsewhere, even if it was checked recently
+        :rtype: _Contents
+        """
+        with self._lock:
+            contents = self._contents
+            if contents is not None and not refresh and not self._check_due():
+                return contents
+
+            if contents is None or self._changed(contents):
+                contents = self._load()
+
+            self._contents = contents
+            self._checked = time.time()
+            return contents
+
+    def find(self, lookup):
+        """
+        Look something up in the catalogue, checking for changes made elsewhere before giving up.
+
+        :param lookup: function returning the item from the catalogue contents, or None if it isn't there
+        """
+        found = lookup(self.contents())
+        if found is None:
+            found = lookup(self.contents(refresh=True))
+        return found
+
+    def _check_due(self):
+        interval = OPTIONS['catalogue_refresh_interval']
+        if interval is None:
+            return False
+        return time.time() - self._checked >= interval
+
+    def _changed(self, contents):
+        with self._db.connect() as connection:
+            return connection.get_catalogue_version() != contents.version
+
+    def _load(self):
+        # Both tables (and their version) are read from one snapshot. Otherwise a product added
+        # elsewhere in between could refer to a metadata type that wasn't there when they were read.
+        with self._db.begin() as transaction:
+            transaction.set_repeatable_read()
+            version = transaction.get_catalogue_version()
+            _LOG.debug('Loading catalogue (version %s)', version)
+            metadata_types = [self._make_metadata_type(row) for row in transaction.get_all_metadata_types()]
+            product_rows = transaction.get_all_dataset_types()
+
+        by_id = {type_.id: type_ for type_ in metadata_types}
+        products = [DatasetType(metadata_type=by_id[row['metadata_type_ref']],
+                                definition=row['definition'],
+                                id_=row['id'])
+                    for row in product_rows]
+        return _Contents(version, metadata_types, products)
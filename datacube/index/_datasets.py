@@ -4,23 +4,31 @@ API for dataset indexing, access and search.
 """
 from __future__ import absolute_import
 
+import functools
+import itertools
 import logging
 import warnings
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+from contextlib import contextmanager
 from uuid import UUID
 
-from cachetools.func import lru_cache
+import numpy
 
 from datacube import compat
 from datacube.index.fields import Field
-from datacube.model import Dataset, DatasetType, MetadataType
+from datacube.model import Dataset, DatasetRecord, DatasetType, MetadataType
 from datacube.utils import InvalidDocException, jsonify_document, changes
 from datacube.utils.changes import get_doc_changes, check_doc_unchanged
 from . import fields
+from ._catalogue import CatalogueCache
+from ._search_cache import SearchCache, query_key
 from .exceptions import DuplicateRecordError
 
 _LOG = logging.getLogger(__name__)
 
+# Results read from the database at a time by search_returning_columnar()
+_COLUMNAR_BATCH_SIZE = 50000
+
 try:
     from typing import Any, Iterable, Mapping, Set, Tuple, Union
 except ImportError:
@@ -32,11 +40,17 @@ except ImportError:
 
 
 class MetadataTypeResource(object):
+    """
+    :type _db: datacube.index.postgres._connections.PostgresDb
+    :type catalogue: datacube.index._catalogue.CatalogueCache
+    """
+
     def __init__(self, db):
         """
         :type db: datacube.index.postgres._connections.PostgresDb
         """
         self._db = db
+        self.catalogue = CatalogueCache(db, self._make_from_query_row)
 
     def from_doc(self, definition):
         """
@@ -74,6 +88,7 @@ class MetadataTypeResource(object):
                     definition=metadata_type.definition,
                     concurrently=not allow_table_lock
                 )
+            self.catalogue.invalidate()
         return self.get_by_name(metadata_type.name)
 
     def can_update(self, metadata_type, allow_unsafe_updates=False):
@@ -145,8 +160,7 @@ class MetadataTypeResource(object):
                 concurrently=not allow_table_lock
             )
 
-        self.get_by_name_unsafe.cache_clear()
-        self.get_unsafe.cache_clear()
+        self.catalogue.invalidate()
         return self.get_by_name(metadata_type.name)
 
     def update_document(self, definition, allow_unsafe_updates=False):
@@ -179,21 +193,17 @@ class MetadataTypeResource(object):
         except KeyError:
             return None
 
-    @lru_cache()
     def get_unsafe(self, id_):
-        with self._db.connect() as connection:
-            record = connection.get_metadata_type(id_)
-        if record is None:
-            raise KeyError('%s is not a valid MetadataType id')
-        return self._make_from_query_row(record)
+        metadata_type = self.catalogue.find(lambda contents: contents.metadata_types_by_id.get(id_))
+        if metadata_type is None:
+            raise KeyError('%s is not a valid MetadataType id' % id_)
+        return metadata_type
 
-    @lru_cache()
     def get_by_name_unsafe(self, name):
-        with self._db.connect() as connection:
-            record = connection.get_metadata_type_by_name(name)
-        if not record:
+        metadata_type = self.catalogue.find(lambda contents: contents.metadata_types_by_name.get(name))
+        if metadata_type is None:
             raise KeyError('%s is not a valid MetadataType name' % name)
-        return self._make_from_query_row(record)
+        return metadata_type
 
     def check_field_indexes(self, allow_table_lock=False, rebuild_all=None,
                             rebuild_views=False, rebuild_indexes=False):
@@ -225,14 +235,7 @@ class MetadataTypeResource(object):
 
         :rtype: iter[datacube.model.MetadataType]
         """
-        with self._db.connect() as connection:
-            return self._make_many(connection.get_all_metadata_types())
-
-    def _make_many(self, query_rows):
-        """
-        :rtype: list[datacube.model.MetadataType]
-        """
-        return (self._make_from_query_row(c) for c in query_rows)
+        return iter(self.catalogue.contents().metadata_types)
 
     def _make_from_query_row(self, query_row):
         """
@@ -257,6 +260,7 @@ class ProductResource(object):
     """
     :type _db: datacube.index.postgres._connections.PostgresDb
     :type metadata_type_resource: MetadataTypeResource
+    :type catalogue: datacube.index._catalogue.CatalogueCache
     """
 
     def __init__(self, db, metadata_type_resource):
@@ -266,6 +270,7 @@ class ProductResource(object):
         """
         self._db = db
         self.metadata_type_resource = metadata_type_resource
+        self.catalogue = metadata_type_resource.catalogue
 
     def from_doc(self, definition):
         """
@@ -330,6 +335,7 @@ class ProductResource(object):
                     definition=product.definition,
                     concurrently=not allow_table_lock,
                 )
+            self.catalogue.invalidate()
         return self.get_by_name(product.name)
 
     def can_update(self, product, allow_unsafe_updates=False):
@@ -431,8 +437,7 @@ class ProductResource(object):
                 concurrently=not allow_table_lock
             )
 
-        self.get_by_name_unsafe.cache_clear()
-        self.get_unsafe.cache_clear()
+        self.catalogue.invalidate()
         return self.get_by_name(product.name)
 
     def update_document(self, definition, allow_unsafe_updates=False, allow_table_lock=False):
@@ -489,21 +494,17 @@ class ProductResource(object):
         except KeyError:
             return None
 
-    @lru_cache()
     def get_unsafe(self, id_):
-        with self._db.connect() as connection:
-            result = connection.get_dataset_type(id_)
-        if not result:
+        product = self.catalogue.find(lambda contents: contents.products_by_id.get(id_))
+        if product is None:
             raise KeyError('"%s" is not a valid Product id' % id_)
-        return self._make(result)
+        return product
 
-    @lru_cache()
     def get_by_name_unsafe(self, name):
-        with self._db.connect() as connection:
-            result = connection.get_dataset_type_by_name(name)
-        if not result:
+        product = self.catalogue.find(lambda contents: contents.products_by_name.get(name))
+        if product is None:
             raise KeyError('"%s" is not a valid Product name' % name)
-        return self._make(result)
+        return product
 
     def get_with_fields(self, field_names):
         """
@@ -580,27 +581,14 @@ class ProductResource(object):
 
         :rtype: iter[datacube.model.DatasetType]
         """
-        with self._db.connect() as connection:
-            return (self._make(record) for record in connection.get_all_dataset_types())
-
-    def _make_many(self, query_rows):
-        return (self._make(c) for c in query_rows)
-
-    def _make(self, query_row):
-        """
-        :rtype datacube.model.DatasetType
-        """
-        return DatasetType(
-            definition=query_row['definition'],
-            metadata_type=self.metadata_type_resource.get(query_row['metadata_type_ref']),
-            id_=query_row['id'],
-        )
+        return iter(self.catalogue.contents().products)
 
 
 class DatasetResource(object):
     """
     :type _db: datacube.index.postgres._connections.PostgresDb
     :type types: datacube.index._datasets.ProductResource
+    :type search_cache: datacube.index._search_cache.SearchCache
     """
 
     def __init__(self, db, dataset_type_resource):
@@ -610,6 +598,7 @@ class DatasetResource(object):
         """
         self._db = db
         self.types = dataset_type_resource
+        self.search_cache = SearchCache()
 
     def get(self, id_, include_sources=False):
         """
@@ -619,31 +608,34 @@ class DatasetResource(object):
         :param bool include_sources: get the full provenance graph?
         :rtype: datacube.model.Dataset
         """
-        if isinstance(id_, compat.string_types):
-            id_ = UUID(id_)
+        id_ = _to_uuid(id_)
 
         with self._db.connect() as connection:
             if not include_sources:
                 dataset = connection.get_dataset(id_)
                 return self._make(dataset, full_info=True) if dataset else None
 
-            datasets = {result['id']: (self._make(result, full_info=True), result)
-                        for result in connection.get_dataset_sources(id_)}
+            return self._make_with_sources(connection.get_dataset_sources([id_])).get(id_)
 
-        if not datasets:
-            # No dataset found
-            return None
+    def get_many(self, ids, include_sources=False):
+        """
+        Get several datasets by id, in one query.
 
-        for dataset, result in datasets.values():
-            dataset.metadata_doc['lineage']['source_datasets'] = {
-                classifier: datasets[source][0].metadata_doc
-                for source, classifier in zip(result['sources'], result['classes']) if source
-            }
-            dataset.sources = {
-                classifier: datasets[source][0]
-                for source, classifier in zip(result['sources'], result['classes']) if source
-            }
-        return datasets[id_][0]
+        :param list[UUID|str] ids: ids of the datasets to retrieve
+        :param bool include_sources: get the full provenance graph of each?
+        :return: the datasets that exist, in the order of `ids`
+        :rtype: list[datacube.model.Dataset]
+        """
+        ids = [_to_uuid(id_) for id_ in ids]
+
+        with self._db.connect() as connection:
+            if include_sources:
+                datasets = self._make_with_sources(connection.get_dataset_sources(ids))
+            else:
+                datasets = {result['id']: self._make(result, full_info=True)
+                            for result in connection.get_datasets(ids)}
+
+        return [datasets[id_] for id_ in ids if id_ in datasets]
 
     def get_derived(self, id_):
         """
@@ -652,9 +644,24 @@ class DatasetResource(object):
         :param UUID id_: dataset id
         :rtype: list[datacube.model.Dataset]
         """
+        id_ = _to_uuid(id_)
+        return self.get_derived_many([id_]).get(id_, [])
+
+    def get_derived_many(self, ids):
+        """
+        Get the datasets derived directly from each of several datasets, in one query.
+
+        :param list[UUID|str] ids: dataset ids
+        :return: the derived datasets of each of the ids that has any
+        :rtype: dict[UUID, list[datacube.model.Dataset]]
+        """
+        ids = [_to_uuid(id_) for id_ in ids]
+
+        derived = {}
         with self._db.connect() as connection:
-            return [self._make(result, full_info=True)
-                    for result in connection.get_derived_datasets(id_)]
+            for result in connection.get_derived_datasets(ids):
+                derived.setdefault(result['source_dataset_ref'], []).append(self._make(result, full_info=True))
+        return derived
 
     def has(self, id_):
         """
@@ -701,11 +708,139 @@ class DatasetResource(object):
                             connection.ensure_dataset_locations(dataset.id, dataset.uris)
                     except DuplicateRecordError as e:
                         _LOG.warning(str(e))
+                    self.search_cache.invalidate(dataset_ids=[dataset.id])
         finally:
             dataset.type.dataset_reader(dataset.metadata_doc).sources = sources_tmp
 
         return dataset
 
+    def add_many(self, datasets, sources_policy='verify', batch_size=1000):
+        """
+        Ensure many datasets are in the index, adding those not already present.
+
+        Equivalent to calling :meth:`add` for each dataset, but much faster: the datasets, their lineage
+        and locations are written a batch at a time, in a few multi-row statements in one transaction.
+        Datasets that are already indexed are checked and have any new locations added, as with :meth:`add`.
+
+        Source datasets are handled according to `sources_policy` before each batch. A batch with a
+        source that isn't indexed fails as a whole, with a MissingRecordError.
+
+        :param iterable[datacube.model.Dataset] datasets: datasets to add
+        :param str sources_policy: one of 'verify' - verify the metadata, 'ensure' - add if doesn't exist, 'skip' - skip
+        :param int batch_size: number of datasets written per transaction
+        :return: whether each dataset was newly added, False if it was already indexed
+        :rtype: list[bool]
+        """
+        if sources_policy not in ('verify', 'ensure', 'skip'):
+            raise ValueError('sources_policy must be one of ("verify", "ensure", "skip")')
+
+        products = {}
+        added = []
+        datasets = iter(datasets)
+        while True:
+            batch = list(itertools.islice(datasets, batch_size))
+            if not batch:
+                break
+            sources = self._sources_to_add(batch, sources_policy)
+            for start in range(0, len(sources), batch_size):
+                self._add_batch(sources[start:start + batch_size], products)
+            added.extend(self._add_batch(batch, products))
+        return added
+
+    def _sources_to_add(self, datasets, sources_policy):
+        """
+        Source datasets that `sources_policy` says must be added along with `datasets`, each after its own sources.
+        """
+        for dataset in datasets:
+            _check_sources_loaded(dataset)
+        if sources_policy == 'skip':
+            return []
+
+        # Sources that are in the batch themselves are added with it
+        in_batch = {dataset.id for dataset in datasets}
+        sources = _walk_sources(datasets, skip=in_batch)
+        if sources_policy == 'ensure':
+            # Sources that are already indexed are left alone, along with their own sources
+            with self._db.connect() as connection:
+                indexed = connection.datasets_contained([source.id for source in sources])
+            sources = _walk_sources(datasets, skip=in_batch | indexed)
+        return sources
+
+    def _add_batch(self, datasets, products):
+        """
+        Add `datasets` in one transaction, without looking at their sources.
+
+        :param dict products: products already looked up, by name
+        :return: whether each dataset was newly added
+        :rtype: list[bool]
+        """
+        for dataset in datasets:
+            if dataset.type.name not in products:
+                product = self.types.get_by_name(dataset.type.name)
+                if product is None:
+                    _LOG.warning('Adding product "%s" as it doesn\'t exist.', dataset.type.name)
+                    product = self.types.add(dataset.type)
+                products[dataset.type.name] = product
+
+        unique = OrderedDict()
+        for dataset in datasets:
+            unique.setdefault(dataset.id, dataset)
+        unique = list(unique.values())
+
+        with _sources_removed(datasets):
+            with self._db.begin() as transaction:
+                inserted = transaction.insert_datasets([
+                    dict(id=dataset.id,
+                         dataset_type_ref=products[dataset.type.name].id,
+                         metadata_type_ref=products[dataset.type.name].metadata_type.id,
+                         metadata=dataset.metadata_doc,
+                         footprint=_footprint(dataset))
+                    for dataset in unique
+                ])
+                transaction.insert_dataset_sources([
+                    (classifier, dataset.id, source.id)
+                    for dataset in unique if dataset.id in inserted
+                    for classifier, source in dataset.sources.items()
+                ])
+                transaction.insert_dataset_locations([
+                    (dataset.id, uri) for dataset in unique if dataset.id in inserted for uri in dataset.uris or []
+                ])
+
+            self.search_cache.invalidate(product_ids={products[dataset.type.name].id
+                                                      for dataset in unique if dataset.id in inserted})
+
+            added = []
+            for dataset in datasets:
+                added.append(dataset.id in inserted)
+                inserted.discard(dataset.id)  # a dataset repeated in the batch is a duplicate
+            duplicates = [dataset for dataset, was_added in zip(datasets, added) if not was_added]
+            if duplicates:
+                self._check_duplicates(duplicates)
+        return added
+
+    def _check_duplicates(self, datasets):
+        """
+        Check already indexed datasets haven't changed, and add any new locations.
+        """
+        with self._db.connect() as connection:
+            existing = {row['id']: row['metadata'] for row in connection.get_datasets([d.id for d in datasets])}
+        for dataset in datasets:
+            _LOG.warning('Duplicate dataset, not inserting: %s', dataset.id)
+            if dataset.id in existing:
+                check_doc_unchanged(
+                    existing[dataset.id],
+                    jsonify_document(dataset.metadata_doc),
+                    'Dataset {}'.format(dataset.id)
+                )
+
+        with self._db.begin() as transaction:
+            already_recorded = transaction.insert_dataset_locations([
+                (dataset.id, uri) for dataset in datasets for uri in dataset.uris or []
+            ])
+        self.search_cache.invalidate(dataset_ids=[dataset.id for dataset in datasets])
+        for _, uri in already_recorded:
+            _LOG.warning('Location already exists: %s', uri)
+
     def search_product_duplicates(self, product, *group_fields):
         # type: (DatasetType, Iterable[Union[str, Field]]) -> Iterable[tuple, Set[UUID]]
         """
@@ -735,11 +870,7 @@ class DatasetResource(object):
                 yield result_type(*grouped_fields), dataset_ids
 
     def _add_sources(self, dataset, sources_policy='verify'):
-        if dataset.sources is None:
-            raise ValueError('Dataset has missing (None) sources. Was this loaded without include_sources=True?\n'
-                             'Note that: \n'
-                             '  sources=None means "not loaded", '
-                             '  sources={}   means there are no sources (eg. raw telemetry data)')
+        _check_sources_loaded(dataset)
 
         if sources_policy == 'ensure':
             for source in dataset.sources.values():
@@ -812,8 +943,10 @@ class DatasetResource(object):
         try:
             product = self.types.get_by_name(dataset.type.name)
             with self._db.begin() as transaction:
-                if not transaction.update_dataset(dataset.metadata_doc, dataset.id, product.id):
+                if not transaction.update_dataset(dataset.metadata_doc, dataset.id, product.id,
+                                                  footprint=_footprint(dataset)):
                     raise ValueError("Failed to update dataset %s..." % dataset.id)
+            self.search_cache.invalidate(product_ids=[product.id])
 
             self._ensure_new_locations(dataset, existing)
         finally:
@@ -830,6 +963,7 @@ class DatasetResource(object):
                 # We probably want to do so anyway, as they are independently valid.
                 with self._db.begin() as transaction:
                     transaction.ensure_dataset_locations(dataset.id, [uri] if uri else None)
+            self.search_cache.invalidate(dataset_ids=[dataset.id])
 
     def archive(self, ids):
         """
@@ -838,8 +972,8 @@ class DatasetResource(object):
         :param list[UUID] ids: list of dataset ids to archive
         """
         with self._db.begin() as transaction:
-            for id_ in ids:
-                transaction.archive_dataset(id_)
+            product_ids = {transaction.archive_dataset(id_) for id_ in ids}
+        self.search_cache.invalidate(product_ids=product_ids)
 
     def restore(self, ids):
         """
@@ -848,8 +982,8 @@ class DatasetResource(object):
         :param list[UUID] ids: list of dataset ids to restore
         """
         with self._db.begin() as transaction:
-            for id_ in ids:
-                transaction.restore_dataset(id_)
+            product_ids = {transaction.restore_dataset(id_) for id_ in ids}
+        self.search_cache.invalidate(product_ids=product_ids)
 
     def get_field_names(self, type_name=None):
         """
@@ -863,7 +997,7 @@ class DatasetResource(object):
 
         out = set()
         for type_ in types:
-            out.update(type_.metadata_type.dataset_fields)
+            out.update(name for name, field in type_.metadata_type.dataset_fields.items() if not field.search_only)
         return out
 
     def get_locations(self, id_):
@@ -909,9 +1043,10 @@ class DatasetResource(object):
         with self._db.connect() as connection:
             try:
                 connection.ensure_dataset_locations(id_, [uri])
-                return True
             except DuplicateRecordError:
                 return False
+        self.search_cache.invalidate(dataset_ids=[_to_uuid(id_)])
+        return True
 
     def get_datasets_for_location(self, uri):
         with self._db.connect() as connection:
@@ -931,7 +1066,9 @@ class DatasetResource(object):
 
         with self._db.connect() as connection:
             was_removed = connection.remove_location(id_, uri)
-            return was_removed
+        if was_removed:
+            self.search_cache.invalidate(dataset_ids=[_to_uuid(id_)])
+        return was_removed
 
     def archive_location(self, id_, uri):
         """
@@ -946,7 +1083,9 @@ class DatasetResource(object):
 
         with self._db.connect() as connection:
             was_archived = connection.archive_location(id_, uri)
-            return was_archived
+        if was_archived:
+            self.search_cache.invalidate(dataset_ids=[_to_uuid(id_)])
+        return was_archived
 
     def restore_location(self, id_, uri):
         """
@@ -961,7 +1100,9 @@ class DatasetResource(object):
 
         with self._db.connect() as connection:
             was_restored = connection.restore_location(id_, uri)
-            return was_restored
+        if was_restored:
+            self.search_cache.invalidate(dataset_ids=[_to_uuid(id_)])
+        return was_restored
 
     def _make(self, dataset_res, full_info=False):
         """
@@ -981,6 +1122,26 @@ class DatasetResource(object):
             archived_time=dataset_res.archived
         )
 
+    def _make_with_sources(self, query_result):
+        """
+        Make datasets linked to their sources, from rows that include the ids of their sources.
+
+        :rtype: dict[UUID, datacube.model.Dataset]
+        """
+        datasets = {result['id']: (self._make(result, full_info=True), result)
+                    for result in query_result}
+
+        for dataset, result in datasets.values():
+            dataset.metadata_doc['lineage']['source_datasets'] = {
+                classifier: datasets[source][0].metadata_doc
+                for source, classifier in zip(result['sources'], result['classes']) if source
+            }
+            dataset.sources = {
+                classifier: datasets[source][0]
+                for source, classifier in zip(result['sources'], result['classes']) if source
+            }
+        return {id_: dataset for id_, (dataset, result) in datasets.items()}
+
     def _make_many(self, query_result):
         """
         :rtype list[datacube.model.Dataset]
@@ -1008,10 +1169,66 @@ class DatasetResource(object):
         :rtype: __generator[datacube.model.Dataset]
         """
         source_filter = query.pop('source_filter', None)
-        for _, datasets in self._do_search_by_product(query, source_filter=source_filter):
+
+        # Searches filtering on sources aren't cached: changes to the source products would affect them too
+        key = query_key(query) if self.search_cache.max_datasets and not source_filter else None
+        if key is None:
+            for _, datasets in self._do_search_by_product(query, source_filter=source_filter):
+                for dataset in self._make_many(datasets):
+                    yield dataset
+            return
+
+        cached = self.search_cache.get(key)
+        if cached is not None:
+            for dataset in cached:
+                yield dataset
+            return
+
+        generation = self.search_cache.generation
+        max_datasets = self.search_cache.max_datasets
+        product_ids = []
+        found = []
+        for product, datasets in self._do_search_by_product(query):
+            product_ids.append(product.id)
             for dataset in self._make_many(datasets):
+                if found is not None:
+                    found.append(dataset)
+                    if len(found) > max_datasets:
+                        found = None  # too many to cache
                 yield dataset
 
+        # Only complete results are cached: not those of a search abandoned part way through
+        if found is not None:
+            self.search_cache.put(key, product_ids, found, generation)
+
+    def search_records(self, **query):
+        """
+        Perform a search, returning lightweight :class:`datacube.model.DatasetRecord` objects.
+
+        Only the parts of each document needed to load the datasets are read from the index, which is
+        much faster than :meth:`search` for searches finding many datasets. The rest of a document is
+        fetched if it's used.
+
+        :param dict[str,str|float|datacube.model.Range] query:
+        :rtype: __generator[datacube.model.DatasetRecord]
+        """
+        fetch_doc = functools.partial(_fetch_metadata_doc, self._db)
+        product_queries = list(self._get_product_queries(query))
+        with self._db.connect() as connection:
+            for q, product in product_queries:
+                metadata_type = product.metadata_type
+                query_exprs = tuple(fields.to_expressions(metadata_type.dataset_fields.get, **q))
+                offsets = _record_offsets(metadata_type)
+                for row in connection.search_dataset_records(query_exprs, offsets, stream=True):
+                    yield DatasetRecord(
+                        type_=self.types.get(row.dataset_type_ref),
+                        id_=row.id,
+                        partial_doc=_partial_doc(offsets, row[4:]),
+                        uris=[uri for uri in row.uris if uri] if row.uris else [],
+                        archived_time=row.archived,
+                        fetch_doc=fetch_doc
+                    )
+
     def search_by_product(self, **query):
         """
         Perform a search, returning datasets grouped by product type.
@@ -1019,7 +1236,8 @@ class DatasetResource(object):
         :param dict[str,str|float|datacube.model.Range] query:
         :rtype: __generator[(datacube.model.DatasetType,  __generator[datacube.model.Dataset])]]
         """
-        for product, datasets in self._do_search_by_product(query):
+        # Not streamed: callers may keep the results of each product until after the search is finished
+        for product, datasets in self._do_search_by_product(query, stream=False):
             yield product, self._make_many(datasets)
 
     def search_returning(self, field_names, **query):
@@ -1043,6 +1261,40 @@ class DatasetResource(object):
             for columns in results:
                 yield result_type(*columns)
 
+    def search_returning_columnar(self, field_names, **query):
+        """
+        Perform a search, returning the specified fields of all results as a numpy array per field.
+
+        Much faster than :meth:`search_returning` for many results: they're read from the database in
+        large batches straight into arrays, without a Python object for each result. The arrays can be
+        made into a table with ``pandas.DataFrame(results)``.
+
+        Range fields are returned as two arrays, `<name>_begin` and `<name>_end`. Times are `datetime64`
+        arrays (in UTC), and numbers `int64` or `float64` arrays (with NaN for missing values). Other fields
+        are object arrays.
+
+        :param tuple[str] field_names:
+        :param dict[str,str|float|datacube.model.Range] query:
+        :returns: an array of each field, by name. Empty if no products match the search.
+        :rtype: collections.OrderedDict[str, numpy.ndarray]
+        """
+        product_columns = []
+        with self._db.connect() as connection:
+            for q, product in self._get_product_queries(query):
+                dataset_fields = product.metadata_type.dataset_fields
+                query_exprs = tuple(fields.to_expressions(dataset_fields.get, **q))
+                select_fields = tuple(dataset_fields[field_name] for field_name in field_names)
+                product_columns.append(
+                    connection.search_datasets_columnar(query_exprs, select_fields, _COLUMNAR_BATCH_SIZE)
+                )
+
+        if not product_columns:
+            return OrderedDict()
+        return OrderedDict(
+            (name, numpy.concatenate([columns[name] for columns in product_columns]))
+            for name in product_columns[0]
+        )
+
     def count(self, **query):
         """
         Perform a search, returning count of results.
@@ -1050,12 +1302,7 @@ class DatasetResource(object):
         :param dict[str,str|float|datacube.model.Range] query:
         :rtype: int
         """
-        # This may be optimised into one query in the future.
-        result = 0
-        for product_type, count in self._do_count_by_product(query):
-            result += count
-
-        return result
+        return sum(count for product, count in self._do_count_by_product(query))
 
     def count_by_product(self, **query):
         """
@@ -1105,7 +1352,8 @@ class DatasetResource(object):
 
         with self._db.begin() as transaction:
             try:
-                was_inserted = transaction.insert_dataset(dataset.metadata_doc, dataset.id, product.id)
+                was_inserted = transaction.insert_dataset(dataset.metadata_doc, dataset.id, product.id,
+                                                          footprint=_footprint(dataset))
 
                 for classifier, source_dataset in dataset.sources.items():
                     transaction.insert_dataset_source(classifier, dataset.id, source_dataset.id)
@@ -1117,6 +1365,8 @@ class DatasetResource(object):
                     transaction.ensure_dataset_locations(dataset.id, dataset.uris)
             except DuplicateRecordError as e:
                 _LOG.warning(str(e))
+        if was_inserted:
+            self.search_cache.invalidate(product_ids=[product.id])
         return was_inserted
 
     def _get_dataset_types(self, q):
@@ -1137,7 +1387,7 @@ class DatasetResource(object):
             yield q, product
 
     def _do_search_by_product(self, query, return_fields=False, select_field_names=None,
-                              with_source_ids=False, source_filter=None):
+                              with_source_ids=False, source_filter=None, stream=True):
         if source_filter:
             product_queries = list(self._get_product_queries(source_filter))
             if not product_queries:
@@ -1163,7 +1413,7 @@ class DatasetResource(object):
                     # if no fields specified, select all
                     if select_field_names is None:
                         select_fields = tuple(field for name, field in dataset_fields.items()
-                                              if not field.affects_row_selection)
+                                              if not field.affects_row_selection and not field.search_only)
                     else:
                         select_fields = tuple(dataset_fields[field_name]
                                               for field_name in select_field_names)
@@ -1172,18 +1422,26 @@ class DatasetResource(object):
                            query_exprs,
                            source_exprs,
                            select_fields=select_fields,
-                           with_source_ids=with_source_ids
+                           with_source_ids=with_source_ids,
+                           stream=stream
                        ))
 
+    def _product_expressions(self, product_queries):
+        return [tuple(fields.to_expressions(product.metadata_type.dataset_fields.get, **q))
+                for q, product in product_queries]
+
     def _do_count_by_product(self, query):
-        product_queries = self._get_product_queries(query)
+        product_queries = list(self._get_product_queries(query))
+        if not product_queries:
+            return
+
         with self._db.connect() as connection:
-            for q, product in product_queries:
-                dataset_fields = product.metadata_type.dataset_fields
-                query_exprs = tuple(fields.to_expressions(dataset_fields.get, **q))
-                count = connection.count_datasets(query_exprs)
-                if count > 0:
-                    yield product, count
+            counts = connection.count_datasets_by_product(self._product_expressions(product_queries))
+
+        for q, product in product_queries:
+            count = counts.get(product.id, 0)
+            if count > 0:
+                yield product, count
 
     def _do_time_count(self, period, query, ensure_single=False):
         if 'time' not in query:
@@ -1201,18 +1459,20 @@ class DatasetResource(object):
             if len(product_queries) > 1:
                 raise ValueError('Multiple products match single query search: %r' %
                                  ([dt.name for q, dt in product_queries],))
+        if not product_queries:
+            return
 
         with self._db.connect() as connection:
-            for q, product in product_queries:
-                dataset_fields = product.metadata_type.dataset_fields
-                query_exprs = tuple(fields.to_expressions(dataset_fields.get, **q))
-                yield product, list(connection.count_datasets_through_time(
-                    start,
-                    end,
-                    period,
-                    dataset_fields.get('time'),
-                    query_exprs
-                ))
+            periods = connection.count_datasets_by_product_through_time(
+                start,
+                end,
+                period,
+                self._product_expressions(product_queries),
+                [product.metadata_type.dataset_fields.get('time') for q, product in product_queries]
+            )
+
+        for q, product in product_queries:
+            yield product, [(time_range, counts.get(product.id, 0)) for time_range, counts in periods]
 
     def search_summaries(self, **query):
         """
@@ -1233,3 +1493,114 @@ class DatasetResource(object):
         :rtype: list[datacube.model.Dataset]
         """
         return list(self.search(**query))
+
+
+def _to_uuid(id_):
+    if isinstance(id_, compat.string_types):
+        return UUID(id_)
+    return id_
+
+
+def _fetch_metadata_doc(db, id_):
+    with db.connect() as connection:
+        return connection.get_dataset(id_).metadata
+
+
+def _record_offsets(metadata_type):
+    """
+    Offsets of the parts of a dataset document read into a :class:`datacube.model.DatasetRecord`
+
+    :type metadata_type: datacube.model.MetadataType
+    :rtype: list[tuple[str]]
+    """
+    system_offsets = metadata_type.definition['dataset']
+    offsets = [system_offsets[name] for name in ('format', 'grid_spatial', 'measurements')
+               if name in system_offsets]
+
+    time_field = metadata_type.dataset_fields.get('time')
+    for field in (getattr(time_field, 'lower', None), getattr(time_field, 'greater', None)):
+        if field is None:
+            continue
+        field_offsets = field.offset
+        if isinstance(field_offsets[0], compat.string_types):
+            # It's a single offset.
+            field_offsets = [field_offsets]
+        offsets.extend(field_offsets)
+
+    return list(OrderedDict.fromkeys(tuple(offset) for offset in offsets))
+
+
+def _partial_doc(offsets, values):
+    """
+    A document with only the given values, at their offsets
+
+    >>> doc = _partial_doc([('extent', 'from_dt'), ('format', 'name'), ('extent', 'to_dt')], ['2014', None, '2015'])
+    >>> doc == {'extent': {'from_dt': '2014', 'to_dt': '2015'}}
+    True
+    """
+    doc = {}
+    for offset, value in zip(offsets, values):
+        if value is None:
+            continue
+        parent = doc
+        for key in offset[:-1]:
+            parent = parent.setdefault(key, {})
+        parent[offset[-1]] = value
+    return doc
+
+
+def _footprint(dataset):
+    """
+    Extent of `dataset` to record for spatial searches, or None if its metadata type has no spatial information.
+
+    :rtype: datacube.utils.geometry.Geometry
+    """
+    if not hasattr(dataset.metadata, 'grid_spatial'):
+        return None
+    return dataset.extent
+
+
+def _check_sources_loaded(dataset):
+    if dataset.sources is None:
+        raise ValueError('Dataset has missing (None) sources. Was this loaded without include_sources=True?\n'
+                         'Note that: \n'
+                         '  sources=None means "not loaded", '
+                         '  sources={}   means there are no sources (eg. raw telemetry data)')
+
+
+def _walk_sources(datasets, skip=()):
+    """
+    All the source datasets of `datasets`, recursively, each after its own sources.
+
+    :param skip: ids of sources to leave out, along with their own sources
+    :rtype: list[datacube.model.Dataset]
+    """
+    found = OrderedDict()
+
+    def visit(dataset):
+        _check_sources_loaded(dataset)
+        for source in dataset.sources.values():
+            if source.id not in found and source.id not in skip:
+                visit(source)
+                found[source.id] = source
+
+    for dataset in datasets:
+        visit(dataset)
+    return list(found.values())
+
+
+@contextmanager
+def _sources_removed(datasets):
+    """
+    Leave the embedded source documents out of the metadata of `datasets`, which is how they are stored.
+    """
+    removed = []
+    try:
+        for dataset in datasets:
+            reader = dataset.type.dataset_reader(dataset.metadata_doc)
+            removed.append((reader, reader.sources))
+            reader.sources = {}
+        yield
+    finally:
+        for reader, sources in reversed(removed):
+            reader.sources = sources
@@ -0,0 +1,205 @@
+# coding=utf-8
+"""
+Cache of dataset search results, for applications that run the same searches over and over (such as
+a map server asked for the same tiles by many clients).
+
+Disabled by default: it's enabled by giving it room for some datasets with the `search_cache_size`
+option (see :class:`datacube.set_options`).
+
+Changes made through the same index remove the affected searches from the cache: adding, updating,
+archiving or restoring a dataset drops every search that could match its product, and changing its
+locations drops every search that returned it. Changes made by other processes are only seen once a
+search is older than `search_cache_ttl` seconds.
+"""
+from __future__ import absolute_import, division
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from datacube.config import OPTIONS
+from datacube.utils.geometry import Geometry
+
+
+class SearchCacheStats(namedtuple('SearchCacheStats', ['hits', 'misses', 'evictions', 'invalidations',
+                                                       'size', 'datasets'])):
+    """
+    Counts of cache use since it was created
+
+    `size` is the number of searches cached, and `datasets` the total number of datasets they hold.
+    """
+    __slots__ = ()
+
+    @property
+    def hit_rate(self):
+        """
+        Fraction of searches answered from the cache, or None if there haven't been any.
+
+        :rtype: float
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+
+class _Entry(object):
+    """
+    One cached search
+
+    :param float expires: time after which the search has to be run again
+    :param frozenset product_ids: every product the search could match, whether or not it found any datasets
+    :param tuple[datacube.model.Dataset] datasets: the results
+    """
+    __slots__ = ('expires', 'product_ids', 'dataset_ids', 'datasets')
+
+    def __init__(self, expires, product_ids, datasets):
+        self.expires = expires
+        self.product_ids = product_ids
+        self.dataset_ids = frozenset(dataset.id for dataset in datasets)
+        self.datasets = datasets
+
+
+def query_key(query):
+    """
+    A hashable key identifying a search, with the order of its terms normalised.
+
+    :param dict query: search terms
+    :return: the key, or None if the search has terms that can't be compared (and so can't be cached)
+    """
+    try:
+        key = _freeze(query)
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return ('dict', tuple(sorted((key, _freeze(item)) for key, item in value.items())))
+    if isinstance(value, Geometry):
+        return ('geometry', str(value.crs), value.wkt)
+    if isinstance(value, (list, tuple)):
+        # Keep the type: a Range and a list of values are different searches
+        return (type(value).__name__, tuple(_freeze(item) for item in value))
+    return value
+
+
+class SearchCache(object):
+    """
+    Bounded least-recently-used cache of search results, each kept for a limited time
+
+    The size and time are read from the `search_cache_size` and `search_cache_ttl` options (see
+    :class:`datacube.set_options`) each time the cache is used.
+
+    Cached datasets are shared by every search that returns them, so shouldn't be modified.
+
+    Thread safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._datasets = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._generation = 0
+
+    @property
+    def max_datasets(self):
+        """
+        Maximum total number of datasets held. 0 when the cache is disabled.
+
+        :rtype: int
+        """
+        return OPTIONS['search_cache_size'] or 0
+
+    @property
+    def generation(self):
+        """
+        Number of invalidations so far. Results found before an invalidation may be out of date.
+
+        :rtype: int
+        """
+        return self._generation
+
+    def get(self, key):
+        """
+        Results of a search, if it's cached and hasn't expired.
+
+        :return: the datasets found, or None
+        :rtype: list[datacube.model.Dataset]
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and entry.expires <= time.time():
+                self._remove(entry)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries[key] = entry  # most recently used
+            return list(entry.datasets)
+
+    def put(self, key, product_ids, datasets, generation):
+        """
+        Remember the results of a search, evicting the least recently used ones to make room.
+
+        :param key: from :func:`query_key`
+        :param product_ids: every product the search could match
+        :param list[datacube.model.Dataset] datasets: everything the search found
+        :param int generation: :attr:`generation` from before the search was run. If anything has been
+                               invalidated since, the results aren't kept.
+        """
+        max_datasets = self.max_datasets
+        if len(datasets) > max_datasets:
+            return
+
+        entry = _Entry(time.time() + OPTIONS['search_cache_ttl'], frozenset(product_ids), tuple(datasets))
+        with self._lock:
+            if generation != self._generation:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._remove(old)
+            self._entries[key] = entry
+            self._datasets += len(entry.datasets)
+            while self._datasets > max_datasets:
+                _, old = self._entries.popitem(last=False)
+                self._remove(old)
+                self._evictions += 1
+
+    def invalidate(self, product_ids=(), dataset_ids=()):
+        """
+        Forget the searches that could match any of the products, or that returned any of the datasets.
+
+        :param product_ids: ids of products whose datasets have changed
+        :param dataset_ids: ids of datasets that have changed
+        """
+        product_ids = frozenset(product_ids)
+        dataset_ids = frozenset(dataset_ids)
+        with self._lock:
+            self._generation += 1
+            for key, entry in list(self._entries.items()):
+                if entry.product_ids & product_ids or entry.dataset_ids & dataset_ids:
+                    del self._entries[key]
+                    self._remove(entry)
+                    self._invalidations += 1
+
+    def stats(self):
+        """
+        :rtype: SearchCacheStats
+        """
+        with self._lock:
+            return SearchCacheStats(self._hits, self._misses, self._evictions, self._invalidations,
+                                    len(self._entries), self._datasets)
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+            self._datasets = 0
+
+    def _remove(self, entry):
+        self._datasets -= len(entry.datasets)
@@ -9,6 +9,7 @@ from datetime import date, datetime, time
 from dateutil.tz import tz
 
 from datacube.model import Range
+from datacube.utils.geometry import Geometry
 from .exceptions import UnknownFieldError
 
 
@@ -25,6 +26,10 @@ class Field(object):
         # (eg. Does this join other tables that aren't 1:1 with datasets.)
         self.affects_row_selection = False
 
+        # Is this only used to search with, and not selected or listed with the other fields?
+        # (eg. a geometry, which isn't readable as a value)
+        self.search_only = False
+
     def __eq__(self, value):
         """
         Is this field equal to a value?
@@ -39,6 +44,13 @@ class Field(object):
         """
         raise NotImplementedError('between expression')
 
+    def intersects(self, geom):
+        """
+        Does this field intersect a geometry?
+        :rtype: Expression
+        """
+        raise NotImplementedError('intersects expression')
+
 
 class Expression(object):
     # No properties at the moment. These are built and returned by the
@@ -66,6 +78,8 @@ def as_expression(field, value):
     """
     if isinstance(value, Range):
         return field.between(value.begin, value.end)
+    elif isinstance(value, Geometry):
+        return field.intersects(value)
     elif isinstance(value, list):
         return OrExpression(*(as_expression(field, val) for val in value))
     # Treat a date (day) as a time range.
@@ -10,12 +10,15 @@
 Persistence API implementation for postgres.
 """
 import logging
+from collections import OrderedDict
 
+import numpy
 from sqlalchemy import cast
 from sqlalchemy import delete
-from sqlalchemy import select, text, bindparam, and_, or_, func, literal, distinct
+from sqlalchemy import select, text, bindparam, and_, or_, func, literal, literal_column, distinct
 from sqlalchemy.dialects.postgresql import INTERVAL
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import insert as postgres_insert
 from sqlalchemy.exc import IntegrityError
 
 from datacube.index.exceptions import DuplicateRecordError, MissingRecordError
@@ -24,8 +27,8 @@ from datacube.index.postgres._fields import PgExpression
 from datacube.model import Range
 from . import _dynamic as dynamic
 from . import tables
-from ._fields import parse_fields, NativeField, Expression, PgField
-from .tables import DATASET, DATASET_SOURCE, METADATA_TYPE, DATASET_LOCATION, DATASET_TYPE
+from ._fields import parse_fields, NativeField, FootprintField, Expression, PgField, footprint_polygon, columnar_fields
+from .tables import DATASET, DATASET_SOURCE, METADATA_TYPE, DATASET_LOCATION, DATASET_TYPE, PGPOLYGON
 
 try:
     from typing import Iterable
@@ -41,23 +44,27 @@ def _dataset_uri_field(table):
 # Fields for selecting dataset with uris
 # Need to alias the table, as queries may join the location table for filtering.
 SELECTED_DATASET_LOCATION = DATASET_LOCATION.alias('selected_dataset_location')
-_DATASET_SELECT_FIELDS = (
-    DATASET,
-    # All active URIs, from newest to oldest
-    func.array(
-        select([
-            _dataset_uri_field(SELECTED_DATASET_LOCATION)
-        ]).where(
-            and_(
-                SELECTED_DATASET_LOCATION.c.dataset_ref == DATASET.c.id,
-                SELECTED_DATASET_LOCATION.c.archived == None
-            )
-        ).order_by(
-            SELECTED_DATASET_LOCATION.c.added.desc()
-        ).label('uris')
+# All active URIs, from newest to oldest
+_DATASET_URIS = func.array(
+    select([
+        _dataset_uri_field(SELECTED_DATASET_LOCATION)
+    ]).where(
+        and_(
+            SELECTED_DATASET_LOCATION.c.dataset_ref == DATASET.c.id,
+            SELECTED_DATASET_LOCATION.c.archived == None
+        )
+    ).order_by(
+        SELECTED_DATASET_LOCATION.c.added.desc()
     ).label('uris')
 )
 
+_DATASET_SELECT_FIELDS = tuple(
+    # The footprint is only used for searching: don't send it back with every dataset.
+    column for column in DATASET.columns if column is not DATASET.c.footprint
+) + (
+    _DATASET_URIS.label('uris'),
+)
+
 PGCODE_UNIQUE_CONSTRAINT = '23505'
 PGCODE_FOREIGN_KEY_VIOLATION = '23503'
 
@@ -116,6 +123,11 @@ def get_native_fields():
             'Full metadata document',
             DATASET.c.metadata
         ),
+        'footprint': FootprintField(
+            'footprint',
+            'Outline of the dataset in longitude/latitude (search with a geometry)',
+            DATASET.c.footprint
+        ),
         # Fields that can affect row selection
 
         # Note that this field is a single uri: selecting it will result in one-result per uri.
@@ -144,9 +156,36 @@ def get_dataset_fields(dataset_search_fields):
     return fields
 
 
+def _column_array(values, dtype):
+    """
+    :param tuple values: one column of a batch of results
+    :param str dtype: as given by :func:`datacube.index.postgres._fields.columnar_fields`
+    :rtype: numpy.ndarray
+    """
+    if dtype == 'datetime64[us]':
+        # Selected as seconds since the epoch
+        seconds = numpy.array(values, dtype='float64')
+        microseconds = numpy.full(seconds.shape, numpy.datetime64('NaT').astype('int64'), dtype='int64')
+        present = ~numpy.isnan(seconds)
+        microseconds[present] = numpy.round(seconds[present] * 1e6)
+        return microseconds.view(dtype)
+    if dtype == 'int64' and None in values:
+        return numpy.array(values, dtype='float64')
+    if dtype == 'object':
+        array = numpy.empty(len(values), dtype=object)
+        array[:] = values
+        return array
+    return numpy.array(values, dtype=dtype)
+
+
 class PostgresDbAPI(object):
-    def __init__(self, connection):
+    def __init__(self, connection, fetch_size=None):
+        """
+        :param int fetch_size: stream large results from the server this many rows at a time,
+                               rather than fetching them all at once. Not for use within a transaction.
+        """
         self._connection = connection
+        self._fetch_size = fetch_size
 
     @property
     def in_transaction(self):
@@ -155,12 +194,35 @@ class PostgresDbAPI(object):
     def rollback(self):
         self._connection.execute(text('ROLLBACK'))
 
-    def insert_dataset(self, metadata_doc, dataset_id, dataset_type_id):
+    def set_repeatable_read(self):
+        """
+        Make every query of the current transaction see the same snapshot of the database.
+
+        Must be called before the transaction's first query.
+        """
+        self._connection.execute(text('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ'))
+
+    def _execute_streaming(self, query):
+        """
+        Execute a query with potentially many results, without holding them all in memory if streaming.
+        """
+        if not self._fetch_size:
+            return self._connection.execute(query)
+        # Results are read through a named (server-side) cursor. These only exist within a transaction, so
+        # the connection leaves autocommit mode until it is returned to the pool. Only use it for reading.
+        return self._connection.execution_options(
+            isolation_level='READ COMMITTED',
+            stream_results=True,
+            max_row_buffer=self._fetch_size
+        ).execute(query)
+
+    def insert_dataset(self, metadata_doc, dataset_id, dataset_type_id, footprint=None):
         """
         Insert dataset if not already indexed.
         :type metadata_doc: dict
         :type dataset_id: str or uuid.UUID
         :type dataset_type_id: int
+        :param datacube.utils.geometry.Geometry footprint: extent of the dataset, if known
         :return: whether it was inserted
         :rtype: bool
         """
@@ -168,7 +230,7 @@ class PostgresDbAPI(object):
             dataset_type_ref = bindparam('dataset_type_ref')
             ret = self._connection.execute(
                 DATASET.insert().from_select(
-                    ['id', 'dataset_type_ref', 'metadata_type_ref', 'metadata'],
+                    ['id', 'dataset_type_ref', 'metadata_type_ref', 'metadata', 'footprint'],
                     select([
                         bindparam('id'), dataset_type_ref,
                         select([
@@ -176,12 +238,14 @@ class PostgresDbAPI(object):
                         ]).where(
                             DATASET_TYPE.c.id == dataset_type_ref
                         ).label('metadata_type_ref'),
-                        bindparam('metadata', type_=JSONB)
+                        bindparam('metadata', type_=JSONB),
+                        cast(bindparam('footprint'), PGPOLYGON)
                     ])
                 ),
                 id=dataset_id,
                 dataset_type_ref=dataset_type_id,
-                metadata=metadata_doc
+                metadata=metadata_doc,
+                footprint=footprint_polygon(footprint)
             )
             return ret.rowcount > 0
         except IntegrityError as e:
@@ -189,12 +253,34 @@ class PostgresDbAPI(object):
                 raise DuplicateRecordError('Duplicate dataset, not inserting: %s' % dataset_id)
             raise
 
-    def update_dataset(self, metadata_doc, dataset_id, dataset_type_id):
+    def insert_datasets(self, datasets):
+        """
+        Insert many datasets in one statement, skipping any that are already indexed.
+        :param list[dict] datasets: values of the `id`, `dataset_type_ref`, `metadata_type_ref`
+                                    and `metadata` columns of each dataset, and its `footprint`
+                                    geometry if known
+        :return: ids of the datasets inserted
+        :rtype: set[uuid.UUID]
+        """
+        if not datasets:
+            return set()
+        res = self._connection.execute(
+            postgres_insert(DATASET).values([
+                dict(dataset, footprint=footprint_polygon(dataset.get('footprint')))
+                for dataset in datasets
+            ]).on_conflict_do_nothing(
+                index_elements=[DATASET.c.id]
+            ).returning(DATASET.c.id)
+        )
+        return {row[0] for row in res}
+
+    def update_dataset(self, metadata_doc, dataset_id, dataset_type_id, footprint=None):
         """
         Update dataset
         :type metadata_doc: dict
         :type dataset_id: str or uuid.UUID
         :type dataset_type_id: int
+        :param datacube.utils.geometry.Geometry footprint: extent of the dataset, if known
         """
         res = self._connection.execute(
             DATASET.update().returning(DATASET.c.id).where(
@@ -203,7 +289,8 @@ class PostgresDbAPI(object):
                     DATASET.c.dataset_type_ref == dataset_type_id
                 )
             ).values(
-                metadata=metadata_doc
+                metadata=metadata_doc,
+                footprint=footprint_polygon(footprint)
             )
         )
         return res.rowcount > 0
@@ -230,6 +317,26 @@ class PostgresDbAPI(object):
                     raise DuplicateRecordError('Location already exists: %s' % uri)
                 raise
 
+    def insert_dataset_locations(self, locations):
+        """
+        Add many locations in one statement, skipping any already recorded.
+        :param list[(uuid.UUID, str)] locations: dataset id and uri of each location
+        :return: the locations that were already recorded
+        :rtype: list[(uuid.UUID, str)]
+        """
+        if not locations:
+            return []
+        res = self._connection.execute(
+            postgres_insert(DATASET_LOCATION).values([
+                dict(zip(('dataset_ref', 'uri_scheme', 'uri_body'), (dataset_id,) + _split_uri(uri)))
+                for dataset_id, uri in locations
+            ]).on_conflict_do_nothing().returning(
+                DATASET_LOCATION.c.dataset_ref, DATASET_LOCATION.c.uri_scheme, DATASET_LOCATION.c.uri_body
+            )
+        )
+        inserted = {(row[0], row[1] + ':' + row[2]) for row in res}
+        return [location for location in locations if location not in inserted]
+
     def contains_dataset(self, dataset_id):
         return bool(
             self._connection.execute(
@@ -241,6 +348,24 @@ class PostgresDbAPI(object):
             ).fetchone()
         )
 
+    def datasets_contained(self, dataset_ids):
+        """
+        Which of the given datasets are indexed
+        :type dataset_ids: list[uuid.UUID]
+        :rtype: set[uuid.UUID]
+        """
+        if not dataset_ids:
+            return set()
+        return {
+            row[0] for row in self._connection.execute(
+                select(
+                    [DATASET.c.id]
+                ).where(
+                    DATASET.c.id.in_(dataset_ids)
+                )
+            )
+        }
+
     def get_datasets_for_location(self, uri):
         scheme, body = _split_uri(uri)
         return self._connection.execute(
@@ -269,23 +394,54 @@ class PostgresDbAPI(object):
                 raise MissingRecordError("Referenced source dataset doesn't exist")
             raise
 
+    def insert_dataset_sources(self, sources):
+        """
+        Record many lineage links in one statement, skipping any already recorded.
+        :param list[(str, uuid.UUID, uuid.UUID)] sources: classifier, dataset id and source dataset id of each link
+        """
+        if not sources:
+            return
+        try:
+            self._connection.execute(
+                postgres_insert(DATASET_SOURCE).values([
+                    dict(classifier=classifier, dataset_ref=dataset_id, source_dataset_ref=source_dataset_id)
+                    for classifier, dataset_id, source_dataset_id in sources
+                ]).on_conflict_do_nothing()
+            )
+        except IntegrityError as e:
+            if e.orig.pgcode == PGCODE_FOREIGN_KEY_VIOLATION:
+                raise MissingRecordError("Referenced source dataset doesn't exist")
+            raise
+
     def archive_dataset(self, dataset_id):
-        self._connection.execute(
+        """
+        :return: the product id of the dataset, or None if it wasn't found or was already archived
+        :rtype: int
+        """
+        return self._connection.scalar(
             DATASET.update().where(
                 DATASET.c.id == dataset_id
             ).where(
                 DATASET.c.archived == None
             ).values(
                 archived=func.now()
+            ).returning(
+                DATASET.c.dataset_type_ref
             )
         )
 
     def restore_dataset(self, dataset_id):
-        self._connection.execute(
+        """
+        :return: the product id of the dataset, or None if it wasn't found
+        :rtype: int
+        """
+        return self._connection.scalar(
             DATASET.update().where(
                 DATASET.c.id == dataset_id
             ).values(
                 archived=None
+            ).returning(
+                DATASET.c.dataset_type_ref
             )
         )
 
@@ -294,19 +450,48 @@ class PostgresDbAPI(object):
             select(_DATASET_SELECT_FIELDS).where(DATASET.c.id == dataset_id)
         ).first()
 
-    def get_derived_datasets(self, dataset_id):
+    def get_datasets(self, dataset_ids):
+        """
+        :type dataset_ids: list[uuid.UUID]
+        :return: the datasets that exist, in no particular order
+        """
+        if not dataset_ids:
+            return []
+        return self._connection.execute(
+            select(_DATASET_SELECT_FIELDS).where(DATASET.c.id.in_(dataset_ids))
+        ).fetchall()
+
+    def get_derived_datasets(self, dataset_ids):
+        """
+        The datasets derived directly from any of the given ones.
+
+        :type dataset_ids: list[uuid.UUID]
+        :return: the derived datasets, each with the `source_dataset_ref` it was derived from. A dataset
+                 derived from several of them is returned once for each.
+        """
+        if not dataset_ids:
+            return []
         return self._connection.execute(
             select(
-                _DATASET_SELECT_FIELDS
+                _DATASET_SELECT_FIELDS + (DATASET_SOURCE.c.source_dataset_ref,)
             ).select_from(
                 DATASET.join(DATASET_SOURCE, DATASET.c.id == DATASET_SOURCE.c.dataset_ref)
             ).where(
-                DATASET_SOURCE.c.source_dataset_ref == dataset_id
+                DATASET_SOURCE.c.source_dataset_ref.in_(dataset_ids)
             )
         ).fetchall()
 
-    def get_dataset_sources(self, dataset_id):
-        # recursively build the list of (dataset_ref, source_dataset_ref) pairs starting from dataset_id
+    def get_dataset_sources(self, dataset_ids):
+        """
+        The given datasets and all of their sources, recursively, in one query.
+
+        :type dataset_ids: list[uuid.UUID]
+        :return: each dataset, with the ids of its direct `sources` and their `classes`
+        """
+        if not dataset_ids:
+            return []
+
+        # recursively build the list of (dataset_ref, source_dataset_ref) pairs starting from dataset_ids
         # include (dataset_ref, NULL) [hence the left join]
         sources = select(
             [DATASET.c.id.label('dataset_ref'),
@@ -317,10 +502,11 @@ class PostgresDbAPI(object):
                          DATASET.c.id == DATASET_SOURCE.c.dataset_ref,
                          isouter=True)
         ).where(
-            DATASET.c.id == dataset_id
+            DATASET.c.id.in_(dataset_ids)
         ).cte(name="sources", recursive=True)
 
-        sources = sources.union_all(
+        # A union rather than union all: datasets sharing sources would otherwise repeat them.
+        sources = sources.union(
             select(
                 [sources.c.source_dataset_ref.label('dataset_ref'),
                  DATASET_SOURCE.c.source_dataset_ref,
@@ -350,13 +536,15 @@ class PostgresDbAPI(object):
         """
         Find any datasets that have the given metadata.
 
+        Results are streamed from the server, if enabled, so must be read before the connection is closed.
+
         :type metadata: dict
         :rtype: dict
         """
         # Find any storage types whose 'dataset_metadata' document is a subset of the metadata.
-        return self._connection.execute(
+        return self._execute_streaming(
             select(_DATASET_SELECT_FIELDS).where(DATASET.c.metadata.contains(metadata))
-        ).fetchall()
+        )
 
     @staticmethod
     def _alchemify_expressions(expressions):
@@ -444,15 +632,75 @@ class PostgresDbAPI(object):
             )
         )
 
-    def search_datasets(self, expressions, source_exprs=None, select_fields=None, with_source_ids=False):
+    def search_datasets(self, expressions, source_exprs=None, select_fields=None, with_source_ids=False,
+                        stream=False):
         """
         :type with_source_ids: bool
         :type select_fields: tuple[datacube.index.postgres._fields.PgField]
         :type expressions: tuple[datacube.index.postgres._fields.PgExpression]
+        :param bool stream: stream the results from the server, if enabled. They must be read before
+                            the connection is closed.
         """
         select_query = self.search_datasets_query(expressions, source_exprs, select_fields, with_source_ids)
+        if stream:
+            return self._execute_streaming(select_query)
         return self._connection.execute(select_query)
 
+    def search_dataset_records(self, expressions, document_offsets, stream=False):
+        """
+        Search, selecting only some parts of each dataset's document.
+
+        Each result has the `id`, `dataset_type_ref`, `archived` and `uris` of a dataset, followed by the
+        value at each of the offsets in its document (None where there's nothing there).
+
+        :type expressions: tuple[datacube.index.postgres._fields.PgExpression]
+        :param list[tuple[str]] document_offsets: paths to the values wanted from each document
+        :param bool stream: stream the results from the server, if enabled. They must be read before
+                            the connection is closed.
+        """
+        select_fields = (
+            NativeField('id', None, DATASET.c.id),
+            NativeField('dataset_type_ref', None, DATASET.c.dataset_type_ref),
+            NativeField('archived', None, DATASET.c.archived),
+            NativeField('uris', None, DATASET.c.id, alchemy_expression=_DATASET_URIS),
+        ) + tuple(
+            NativeField('document_%d' % i, None, DATASET.c.metadata,
+                        alchemy_expression=DATASET.c.metadata[tuple(offset)])
+            for i, offset in enumerate(document_offsets)
+        )
+        return self.search_datasets(expressions, select_fields=select_fields, stream=stream)
+
+    def search_datasets_columnar(self, expressions, select_fields, batch_size):
+        """
+        Search, reading the fields of the results into numpy arrays a batch at a time.
+
+        See :func:`datacube.index.postgres._fields.columnar_fields` for the columns made from each field.
+        Numbers with missing values are returned as floats, with NaN for the missing ones, and missing
+        dates as NaT.
+
+        :type expressions: tuple[datacube.index.postgres._fields.PgExpression]
+        :type select_fields: tuple[datacube.index.postgres._fields.PgField]
+        :param int batch_size: number of results read at a time
+        :returns: an array of each column, by name
+        :rtype: collections.OrderedDict[str, numpy.ndarray]
+        """
+        columns = [column for field in select_fields for column in columnar_fields(field)]
+        results = self._execute_streaming(
+            self.search_datasets_query(expressions, select_fields=tuple(field for field, _ in columns))
+        )
+
+        batches = []
+        while True:
+            rows = results.fetchmany(batch_size)
+            if not rows:
+                break
+            batches.append([_column_array(values, dtype) for (_, dtype), values in zip(columns, zip(*rows))])
+
+        return OrderedDict(
+            (field.name, numpy.concatenate([batch[i] for batch in batches]) if batches else _column_array((), dtype))
+            for i, (field, dtype) in enumerate(columns)
+        )
+
     def get_duplicates(self, match_fields, expressions):
         # type: (Tuple[PgField], Tuple[PgExpression]) -> Iterable[tuple]
         group_expressions = tuple(f.alchemy_expression for f in match_fields)
@@ -470,37 +718,70 @@ class PostgresDbAPI(object):
         )
         return self._connection.execute(select_query)
 
-    def count_datasets(self, expressions):
+    @staticmethod
+    def _product_conditions(product_expressions, extra_conditions=()):
         """
-        :type expressions: tuple[datacube.index.postgres._fields.PgExpression]
-        :rtype: int
+        One condition matching the datasets of any of the products.
+
+        :param product_expressions: search expressions of each product, including its `dataset_type_id`
+        :type product_expressions: list[tuple[datacube.index.postgres._fields.PgExpression]]
+        :param extra_conditions: an additional condition for each product, in the same order
+        """
+        conditions = [and_(*PostgresDbAPI._alchemify_expressions(expressions))
+                      for expressions in product_expressions]
+        if extra_conditions:
+            conditions = [and_(condition, extra) for condition, extra in zip(conditions, extra_conditions)]
+        return or_(*conditions)
+
+    @staticmethod
+    def _from_product_expressions(product_expressions):
+        return PostgresDbAPI._from_expression(
+            DATASET,
+            tuple(expression for expressions in product_expressions for expression in expressions)
+        )
+
+    def count_datasets_by_product(self, product_expressions):
         """
+        Count the datasets of several products in one query.
 
-        raw_expressions = self._alchemify_expressions(expressions)
+        :param product_expressions: search expressions of each product, including its `dataset_type_id`
+        :type product_expressions: list[tuple[datacube.index.postgres._fields.PgExpression]]
+        :returns: number of datasets of each product id. Products without any are left out.
+        :rtype: dict[int, int]
+        """
+        if not product_expressions:
+            return {}
 
         select_query = (
             select(
-                [func.count('*')]
+                (DATASET.c.dataset_type_ref, func.count('*'))
             ).select_from(
-                self._from_expression(DATASET, expressions)
+                self._from_product_expressions(product_expressions)
             ).where(
-                and_(DATASET.c.archived == None, *raw_expressions)
+                and_(DATASET.c.archived == None, self._product_conditions(product_expressions))
+            ).group_by(
+                DATASET.c.dataset_type_ref
             )
         )
+        return dict(self._connection.execute(select_query).fetchall())
 
-        return self._connection.scalar(select_query)
-
-    def count_datasets_through_time(self, start, end, period, time_field, expressions):
+    def count_datasets_by_product_through_time(self, start, end, period, product_expressions, time_fields):
         """
+        Count the datasets of several products in each time period, in one query.
+
+        A dataset is counted in every period its time range overlaps.
+
         :type period: str
         :type start: datetime.datetime
         :type end: datetime.datetime
-        :type expressions: tuple[datacube.index.postgres._fields.PgExpression]
-        :rtype: list[((datetime.datetime, datetime.datetime), int)]
+        :param product_expressions: search expressions of each product, including its `dataset_type_id`
+        :type product_expressions: list[tuple[datacube.index.postgres._fields.PgExpression]]
+        :param time_fields: time field of each product, in the same order
+        :type time_fields: list[datacube.index.postgres._fields.PgField]
+        :returns: the time periods, and the number of datasets in each of them for each product id.
+                  Products without any datasets in a period are left out of its counts.
+        :rtype: list[(datacube.model.Range, dict[int, int])]
         """
-
-        raw_expressions = self._alchemify_expressions(expressions)
-
         start_times = select((
             func.generate_series(start, end, cast(period, INTERVAL)).label('start_time'),
         )).alias('start_times')
@@ -521,30 +802,49 @@ class PostgresDbAPI(object):
             )).where(
                 ~func.upper_inf(time_range_select.c.time_period)
             )
-        ).alias('time_ranges')
+        ).cte('time_ranges')
 
-        count_query = (
-            select(
-                (func.count('*'),)
-            ).select_from(
-                self._from_expression(DATASET, expressions)
-            ).where(
-                and_(
-                    time_field.alchemy_expression.overlaps(time_ranges.c.time_period),
-                    DATASET.c.archived == None,
-                    *raw_expressions
+        overlaps_period = [time_field.alchemy_expression.overlaps(time_ranges.c.time_period)
+                           for time_field in time_fields]
+
+        # Every dataset is matched with the periods it overlaps in a single scan, grouped by product and period.
+        counts = (
+            select((
+                time_ranges.c.time_period,
+                DATASET.c.dataset_type_ref,
+                func.count('*').label('dataset_count'),
+            )).select_from(
+                time_ranges.join(
+                    self._from_product_expressions(product_expressions),
+                    and_(DATASET.c.archived == None,
+                         self._product_conditions(product_expressions, overlaps_period))
                 )
+            ).group_by(
+                time_ranges.c.time_period,
+                DATASET.c.dataset_type_ref
             )
-        )
+        ).alias('counts')
 
-        results = self._connection.execute(select((
-            time_ranges.c.time_period,
-            count_query.label('dataset_count')
-        )))
+        # ... and joined back to all periods, so that empty ones are returned too.
+        results = self._connection.execute(
+            select((
+                time_ranges.c.time_period,
+                counts.c.dataset_type_ref,
+                counts.c.dataset_count,
+            )).select_from(
+                time_ranges.outerjoin(counts, counts.c.time_period == time_ranges.c.time_period)
+            ).order_by(
+                func.lower(time_ranges.c.time_period)
+            )
+        )
 
-        for time_period, dataset_count in results:
-            # if not time_period.upper_inf:
-            yield Range(time_period.lower, time_period.upper), dataset_count
+        periods = []
+        for time_period, dataset_type_ref, dataset_count in results:
+            if not periods or periods[-1][0] != (time_period.lower, time_period.upper):
+                periods.append((Range(time_period.lower, time_period.upper), {}))
+            if dataset_type_ref is not None:
+                periods[-1][1][dataset_type_ref] = dataset_count
+        return periods
 
     @staticmethod
     def _from_expression(source_table, expressions=None, fields=None):
@@ -749,6 +1049,24 @@ class PostgresDbAPI(object):
     def get_all_metadata_types(self):
         return self._connection.execute(METADATA_TYPE.select().order_by(METADATA_TYPE.c.name.asc())).fetchall()
 
+    def get_catalogue_version(self):
+        """
+        A value that changes whenever a metadata type or product is added, updated or removed.
+
+        Postgres records the transaction that last wrote each row in its `xmin` system column, so a digest
+        of every row's id and `xmin` changes on every write without needing a column or trigger of our own.
+        (Transaction ids wrap around, so a rewritten row can get a lower `xmin`: only equality is meaningful.)
+
+        :rtype: tuple
+        """
+        rows_written = literal_column("md5(coalesce(string_agg(id::text || ':' || xmin::text, ',' ORDER BY id), ''))")
+        return tuple(self._connection.execute(
+            select([
+                select([rows_written]).select_from(table).as_scalar()
+                for table in (METADATA_TYPE, DATASET_TYPE)
+            ])
+        ).first())
+
     def get_locations(self, dataset_id):
         return [
             record[0]
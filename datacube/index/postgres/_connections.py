@@ -48,17 +48,18 @@ class PostgresDb(object):
     or else use a separate instance of this class in each process.
     """
 
-    def __init__(self, engine):
+    def __init__(self, engine, fetch_size=None):
         # We don't recommend using this constructor directly as it may change.
         # Use static methods PostgresDb.create() or PostgresDb.from_config()
         self._engine = engine
+        self._fetch_size = fetch_size
 
     def __getstate__(self):
         _LOG.warning("Serializing PostgresDb engine %s", self.url)
-        return {'url': self.url}
+        return {'url': self.url, 'fetch_size': self._fetch_size}
 
     def __setstate__(self, state):
-        self.__init__(self._create_engine(state['url']))
+        self.__init__(self._create_engine(state['url']), state.get('fetch_size'))
 
     @property
     def url(self):
@@ -85,7 +86,11 @@ class PostgresDb(object):
 
     @classmethod
     def create(cls, hostname, database, username=None, password=None, port=None,
-               application_name=None, validate=True, pool_timeout=60):
+               application_name=None, validate=True, pool_timeout=60, fetch_size=None):
+        """
+        :param int fetch_size: stream search results from the server this many rows at a time,
+                               rather than fetching them all at once
+        """
         engine = cls._create_engine(
             EngineUrl(
                 'postgresql',
@@ -106,7 +111,7 @@ class PostgresDb(object):
                     'An administrator must run init:\n\t{init_command}'.format(
                         init_command='datacube -v system init'
                     ))
-        return PostgresDb(engine)
+        return PostgresDb(engine, fetch_size=fetch_size)
 
     @classmethod
     def from_config(cls, config=LocalConfig.find(), application_name=None, validate_connection=True):
@@ -120,7 +125,8 @@ class PostgresDb(object):
             config.db_port,
             application_name=app_name,
             validate=validate_connection,
-            pool_timeout=config.db_connection_timeout
+            pool_timeout=config.db_connection_timeout,
+            fetch_size=config.db_fetch_size
         )
 
     def close(self):
@@ -181,7 +187,7 @@ class PostgresDb(object):
         """
         Borrow a connection from the pool.
         """
-        return _PostgresDbConnection(self._engine)
+        return _PostgresDbConnection(self._engine, self._fetch_size)
 
     def begin(self):
         """
@@ -206,13 +212,14 @@ class PostgresDb(object):
 
 
 class _PostgresDbConnection(object):
-    def __init__(self, engine):
+    def __init__(self, engine, fetch_size=None):
         self._engine = engine
+        self._fetch_size = fetch_size
         self._connection = None
 
     def __enter__(self):
         self._connection = self._engine.connect()
-        return _api.PostgresDbAPI(self._connection)
+        return _api.PostgresDbAPI(self._connection, fetch_size=self._fetch_size)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self._connection.close()
@@ -47,7 +47,7 @@ def _ensure_view(conn, fields, name, replace_existing, where_expression):
                 view_name,
                 select(
                     [field.alchemy_expression.label(field.name) for field in fields.values()
-                     if not field.affects_row_selection]
+                     if not field.affects_row_selection and not field.search_only]
                 ).select_from(
                     tables.DATASET.join(tables.DATASET_TYPE).join(tables.METADATA_TYPE)
                 ).where(where_expression)
@@ -11,18 +11,19 @@ from decimal import Decimal
 
 from dateutil import tz
 from psycopg2.extras import NumericRange, DateTimeTZRange
-from sqlalchemy import cast, func, and_
+from sqlalchemy import cast, func, and_, or_, true
 from sqlalchemy.dialects import postgresql as postgres
 from sqlalchemy.dialects.postgresql import INT4RANGE
 from sqlalchemy.dialects.postgresql import NUMRANGE, TSTZRANGE
 from sqlalchemy.sql import ColumnElement
+from sqlalchemy.sql import sqltypes
 
 from datacube import compat
 from datacube import utils
 from datacube.index.fields import Expression, Field
-from datacube.index.postgres.tables import FLOAT8RANGE
+from datacube.index.postgres.tables import FLOAT8RANGE, PGPOLYGON
 from datacube.model import Range
-from datacube.utils import get_doc_offset_safe
+from datacube.utils import get_doc_offset_safe, geometry
 
 try:
     from typing import Any, Callable, Tuple, Union
@@ -106,6 +107,23 @@ class NativeField(PgField):
         return None
 
 
+class FootprintField(NativeField):
+    """
+    The outline of each dataset, searched by intersection with a geometry.
+    """
+
+    def __init__(self, name, description, alchemy_column):
+        super(FootprintField, self).__init__(name, description, alchemy_column)
+        self.search_only = True
+
+    def intersects(self, geom):
+        """
+        :param datacube.utils.geometry.Geometry geom:
+        :rtype: Expression
+        """
+        return FootprintIntersectsExpression(self, geom)
+
+
 class PgDocField(PgField):
     """
     A field extracted from inside a (jsonb) document.
@@ -496,6 +514,26 @@ class RangeContainsExpression(PgExpression):
         return self.field.alchemy_expression.contains(self.value)
 
 
+class FootprintIntersectsExpression(PgExpression):
+    """
+    Datasets whose footprint intersects a geometry, using the footprint's GiST index.
+
+    Datasets without a footprint are always included, so a search never misses any.
+    """
+
+    def __init__(self, field, geom):
+        super(FootprintIntersectsExpression, self).__init__(field)
+        self.geom = geom
+
+    @property
+    def alchemy_expression(self):
+        polygon = footprint_polygon(self.geom)
+        if polygon is None:
+            return true()
+        column = self.field.alchemy_column
+        return or_(column == None, column.op('&&')(cast(polygon, PGPOLYGON)))
+
+
 class EqualsExpression(PgExpression):
     def __init__(self, field, value):
         super(EqualsExpression, self).__init__(field)
@@ -580,6 +618,64 @@ def parse_fields(doc, table_column):
     return {name: _get_field(name, descriptor, table_column) for name, descriptor in doc.items()}
 
 
+def columnar_fields(field):
+    """
+    Fields for selecting `field` straight into numpy arrays, each with the dtype of its array.
+
+    Ranges are split into `<name>_begin` and `<name>_end`. Dates are selected as seconds since the epoch and
+    decimal numbers as doubles, so that a datetime or Decimal object isn't made for every value.
+
+    :type field: PgField
+    :rtype: list[(PgField, str)]
+    """
+    if isinstance(field, RangeDocField):
+        return [_columnar_field(field.name + '_begin', field.lower),
+                _columnar_field(field.name + '_end', field.greater)]
+    return [_columnar_field(field.name, field)]
+
+
+def _columnar_field(name, field):
+    expression = field.alchemy_expression
+    if isinstance(field, DateDocField):
+        expression, dtype = func.date_part('epoch', expression), 'datetime64[us]'
+    elif isinstance(field, (NumericDocField, DoubleDocField)):
+        expression, dtype = cast(expression, postgres.DOUBLE_PRECISION), 'float64'
+    elif isinstance(field, IntDocField) or (isinstance(field, NativeField) and
+                                            isinstance(field.alchemy_column.type, sqltypes.Integer)):
+        dtype = 'int64'
+    else:
+        dtype = 'object'
+    return NativeField(name, field.description, field.alchemy_column, alchemy_expression=expression), dtype
+
+
+def footprint_polygon(geom):
+    """
+    The outline of `geom` in longitude and latitude, as a postgres polygon.
+
+    Anything other than a single polygon is replaced by its convex hull, as a postgres polygon
+    only has an outer boundary.
+
+    :param datacube.utils.geometry.Geometry geom:
+    :return: text form of the polygon, or None if it can't be represented in longitude and latitude.
+    :rtype: str
+    """
+    if geom is None:
+        return None
+    geom = geom.to_crs(geometry.CRS('EPSG:4326'))
+    if geom.type != 'Polygon':
+        geom = geom.convex_hull
+    if geom.is_empty or geom.type != 'Polygon':
+        return None
+
+    envelope = geom.envelope
+    if envelope.right - envelope.left > 180:
+        # It probably wraps around the antimeridian.
+        return None
+
+    outer_ring = geom.json['coordinates'][0]
+    return '(%s)' % ','.join('(%r,%r)' % (float(point[0]), float(point[1])) for point in outer_ring)
+
+
 def _coalesce(*values):
     """
     Return first non-none value.
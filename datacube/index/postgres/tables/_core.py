@@ -146,7 +146,8 @@ def schema_is_latest(engine):
     has_dataset_source_update = not _pg_exists(engine, schema_qualified('uq_dataset_source_dataset_ref'))
     has_uri_searches = _pg_exists(engine, schema_qualified(location_first_index))
     has_dataset_location = _pg_column_exists(engine, schema_qualified('dataset_location'), 'archived')
-    return has_dataset_source_update and has_uri_searches and has_dataset_location
+    has_dataset_footprint = _pg_column_exists(engine, schema_qualified('dataset'), 'footprint')
+    return has_dataset_source_update and has_uri_searches and has_dataset_location and has_dataset_footprint
 
 
 def update_schema(engine):
@@ -193,6 +194,18 @@ def update_schema(engine):
         """.format(schema=SCHEMA_NAME))
         _LOG.info('Completed uri-search update')
 
+    # Spatial index of dataset footprints.
+    if not _pg_column_exists(engine, schema_qualified('dataset'), 'footprint'):
+        _LOG.info('Applying dataset.footprint update')
+        engine.execute("""
+        begin;
+          alter table {schema}.dataset add column footprint polygon;
+          create index ix_{schema}_dataset_footprint on {schema}.dataset using gist (footprint);
+        commit;
+        """.format(schema=SCHEMA_NAME))
+        _LOG.info('Completed dataset.footprint update. Datasets indexed earlier have no footprint until updated, '
+                  'and are included in every spatial search.')
+
 
 def _ensure_role(engine, name, inherits_from=None, add_user=False, create_db=False):
     if has_role(engine, name):
@@ -6,7 +6,7 @@ from __future__ import absolute_import
 
 import logging
 
-from sqlalchemy import ForeignKey, UniqueConstraint, PrimaryKeyConstraint, CheckConstraint, SmallInteger
+from sqlalchemy import ForeignKey, UniqueConstraint, PrimaryKeyConstraint, CheckConstraint, SmallInteger, Index
 from sqlalchemy import Table, Column, Integer, String, DateTime, Boolean
 from sqlalchemy.dialects import postgresql as postgres
 from sqlalchemy.sql import func
@@ -70,8 +70,14 @@ DATASET = Table(
     # When it was added and by whom.
     Column('added', DateTime(timezone=True), server_default=func.now(), nullable=False),
     Column('added_by', _sql.PGNAME, server_default=func.current_user(), nullable=False),
+
+    # Outline of the dataset in longitude/latitude (EPSG:4326), for spatial searches.
+    # Null if it has no known extent (or was indexed before footprints were recorded).
+    Column('footprint', _sql.PGPOLYGON, nullable=True),
 )
 
+Index('ix_{schema}_dataset_footprint'.format(schema=_sql.SCHEMA_NAME), DATASET.c.footprint, postgresql_using='gist')
+
 DATASET_LOCATION = Table(
     'dataset_location', _core.METADATA,
     Column('id', Integer, primary_key=True, autoincrement=True),
@@ -70,6 +70,16 @@ class Float8Range(GenericFunction):
     name = '%s.float8range' % SCHEMA_NAME
 
 
+class PGPOLYGON(sqltypes.Text):
+    """Postgres native 'POLYGON' type, bound and returned as its text form: '((x1,y1),...,(xn,yn))'"""
+    __visit_name__ = 'POLYGON'
+
+
+@compiles(PGPOLYGON)
+def visit_polygon(element, compiler, **kw):
+    return "POLYGON"
+
+
 class PGNAME(sqltypes.Text):
     """Postgres 'NAME' type."""
     __visit_name__ = 'NAME'
@@ -11,6 +11,7 @@ from collections import namedtuple, OrderedDict, Sequence
 from pathlib import Path
 from uuid import UUID
 
+import numpy
 from affine import Affine
 
 from datacube.utils import geometry
@@ -161,41 +162,30 @@ class Dataset(object):
 
     @property
     def measurements(self):
-        # It's an optional field in documents.
         # Dictionary of key -> measurement descriptor
-        if not hasattr(self.metadata, 'measurements'):
-            return {}
-        return self.metadata.measurements
+        return _dataset_measurements(self.metadata)
 
     @cached_property
     def center_time(self):
         """
         :rtype: datetime.datetime
         """
-        time = self.time
-        return time.begin + (time.end - time.begin) // 2
+        return _center_time(self.time)
 
     @property
     def time(self):
-        time = self.metadata.time
-        return Range(parse_time(time.begin), parse_time(time.end))
+        return _dataset_time(self.metadata)
 
     @property
     def bounds(self):
         """
         :rtype: geometry.BoundingBox
         """
-        bounds = self.metadata.grid_spatial['geo_ref_points']
-        return geometry.BoundingBox(left=min(bounds['ur']['x'], bounds['ll']['x']),
-                                    right=max(bounds['ur']['x'], bounds['ll']['x']),
-                                    top=max(bounds['ur']['y'], bounds['ll']['y']),
-                                    bottom=min(bounds['ur']['y'], bounds['ll']['y']))
+        return _dataset_bounds(self.metadata)
 
     @property
     def transform(self):
-        bounds = self.metadata.grid_spatial['geo_ref_points']
-        return Affine(bounds['lr']['x'] - bounds['ul']['x'], 0, bounds['ul']['x'],
-                      0, bounds['lr']['y'] - bounds['ul']['y'], bounds['ul']['y'])
+        return _dataset_transform(self.metadata)
 
     @property
     def is_archived(self):
@@ -215,62 +205,14 @@ class Dataset(object):
         """
         :rtype: geometry.CRS
         """
-        projection = self.metadata.grid_spatial
-        if not projection:
-            return None
-
-        crs = projection.get('spatial_reference', None)
-        if crs:
-            return geometry.CRS(str(crs))
-
-        # Try to infer CRS
-        zone_ = projection.get('zone')
-        datum_ = projection.get('datum')
-        if zone_ and datum_:
-            try:
-                # TODO: really need CRS specified properly in agdc-metadata.yaml
-                if datum_ == 'GDA94':
-                    return geometry.CRS('EPSG:283' + str(abs(zone_)))
-                if datum_ == 'WGS84':
-                    if zone_[-1] == 'S':
-                        return geometry.CRS('EPSG:327' + str(abs(int(zone_[:-1]))))
-                    else:
-                        return geometry.CRS('EPSG:326' + str(abs(int(zone_[:-1]))))
-            except geometry.InvalidCRSError:
-                # We still return None, as they didn't specify a CRS explicitly...
-                _LOG.warning(
-                    "Can't figure out projection: possibly invalid zone (%r) for datum (%r).", zone_, datum_
-                )
-
-        return None
+        return _dataset_crs(self.metadata)
 
     @cached_property
     def extent(self):
         """
         :rtype: geometry.Geometry
         """
-
-        def xytuple(obj):
-            return obj['x'], obj['y']
-
-        # If no projection or crs, they have no extent.
-        projection = self.metadata.grid_spatial
-        if not projection:
-            return None
-        crs = self.crs
-        if not crs:
-            _LOG.debug("No CRS, assuming no extent (dataset %s)", self.id)
-            return None
-
-        valid_data = projection.get('valid_data')
-        geo_ref_points = projection.get('geo_ref_points')
-        if valid_data:
-            return geometry.Geometry(valid_data, crs=crs)
-        elif geo_ref_points:
-            return geometry.polygon([xytuple(geo_ref_points[key]) for key in ('ll', 'ul', 'ur', 'lr', 'll')],
-                                    crs=crs)
-
-        return None
+        return _dataset_extent(self.metadata, self.crs, self.id)
 
     def __eq__(self, other):
         return self.id == other.id
@@ -291,6 +233,271 @@ class Dataset(object):
         return self.metadata_type.dataset_reader(self.metadata_doc)
 
 
+class DatasetRecord(object):
+    """
+    A lightweight, read-only stand-in for a :class:`Dataset`, as found by
+    :meth:`datacube.index._datasets.DatasetResource.search_records`.
+
+    Only the parts of the document needed to load the dataset are read from the index: its format,
+    time, spatial and measurement sections. The full document is fetched from the index the first time
+    `metadata_doc` or `metadata` is used. Sources are never loaded.
+
+    It has the same properties as a :class:`Dataset`, and compares equal to one with the same id.
+
+    :type type_: DatasetType
+    :param UUID id_:
+    :param dict partial_doc: the needed sections of the document, at their usual offsets
+    :param list[str] uris: All active uris for the dataset
+    :param fetch_doc: function returning the full document of a dataset, given its id. It must be
+                      picklable for the record to be.
+    """
+    __slots__ = ('type', 'id', 'uris', 'archived_time', '_partial_doc', '_fetch_doc', '_metadata_doc',
+                 '_center_time', '_extent')
+
+    # Never loaded for a record
+    sources = None
+    indexed_by = None
+    indexed_time = None
+
+    def __init__(self, type_, id_, partial_doc, uris=None, archived_time=None, fetch_doc=None):
+        assert isinstance(type_, DatasetType)
+
+        self.type = type_
+        self.id = id_
+        self.uris = uris
+        self.archived_time = archived_time
+        self._partial_doc = partial_doc
+        self._fetch_doc = fetch_doc
+        self._metadata_doc = None
+        self._center_time = None
+        self._extent = None
+
+    def __getstate__(self):
+        # The extent holds an OGR geometry: it's worked out again when needed.
+        return (self.type, self.id, self.uris, self.archived_time, self._partial_doc, self._fetch_doc,
+                self._metadata_doc)
+
+    def __setstate__(self, state):
+        (self.type, self.id, self.uris, self.archived_time, self._partial_doc, self._fetch_doc,
+         self._metadata_doc) = state
+        self._center_time = None
+        self._extent = None
+
+    @property
+    def metadata_doc(self):
+        """
+        The full document of the dataset, fetched from the index on first use.
+
+        :rtype: dict
+        """
+        if self._metadata_doc is None:
+            if self._fetch_doc is None:
+                raise ValueError('The full document of dataset %s is not available' % self.id)
+            self._metadata_doc = self._fetch_doc(self.id)
+        return self._metadata_doc
+
+    @property
+    def metadata(self):
+        return self.metadata_type.dataset_reader(self.metadata_doc)
+
+    @property
+    def _partial_metadata(self):
+        return self.metadata_type.dataset_reader(self._partial_doc)
+
+    def to_dataset(self):
+        """
+        A full :class:`Dataset`, fetching its document if it hasn't been already.
+
+        :rtype: Dataset
+        """
+        return Dataset(self.type, self.metadata_doc, uris=self.uris, archived_time=self.archived_time)
+
+    @property
+    def metadata_type(self):
+        return self.type.metadata_type
+
+    @property
+    def local_uri(self):
+        """
+        The latest local file uri, if any.
+        :rtype: str
+        """
+        local_uris = [uri for uri in self.uris if uri.startswith('file:')]
+        if local_uris:
+            return local_uris[0]
+
+        return None
+
+    @property
+    def local_path(self):
+        """
+        A path to this dataset on the local filesystem (if available).
+
+        :rtype: pathlib.Path
+        """
+        return uri_to_local_path(self.local_uri)
+
+    @property
+    def managed(self):
+        return self.type.managed
+
+    @property
+    def format(self):
+        return self._partial_metadata.format
+
+    @property
+    def measurements(self):
+        return _dataset_measurements(self._partial_metadata)
+
+    @property
+    def center_time(self):
+        """
+        :rtype: datetime.datetime
+        """
+        if self._center_time is None:
+            self._center_time = _center_time(self.time)
+        return self._center_time
+
+    @property
+    def time(self):
+        return _dataset_time(self._partial_metadata)
+
+    @property
+    def bounds(self):
+        """
+        :rtype: geometry.BoundingBox
+        """
+        return _dataset_bounds(self._partial_metadata)
+
+    @property
+    def transform(self):
+        return _dataset_transform(self._partial_metadata)
+
+    @property
+    def is_archived(self):
+        """
+        :rtype: bool
+        """
+        return self.archived_time is not None
+
+    @property
+    def crs(self):
+        """
+        :rtype: geometry.CRS
+        """
+        return _dataset_crs(self._partial_metadata)
+
+    @property
+    def extent(self):
+        """
+        :rtype: geometry.Geometry
+        """
+        if self._extent is None:
+            self._extent = _dataset_extent(self._partial_metadata, self.crs, self.id)
+        return self._extent
+
+    def __eq__(self, other):
+        return self.id == other.id
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __str__(self):
+        return "DatasetRecord <id={id} type={type} location={loc}>".format(id=self.id,
+                                                                           type=self.type.name,
+                                                                           loc=self.local_path)
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _dataset_measurements(metadata):
+    # It's an optional field in documents.
+    if not hasattr(metadata, 'measurements'):
+        return {}
+    return metadata.measurements
+
+
+def _dataset_time(metadata):
+    time = metadata.time
+    return Range(parse_time(time.begin), parse_time(time.end))
+
+
+def _center_time(time):
+    return time.begin + (time.end - time.begin) // 2
+
+
+def _dataset_bounds(metadata):
+    bounds = metadata.grid_spatial['geo_ref_points']
+    return geometry.BoundingBox(left=min(bounds['ur']['x'], bounds['ll']['x']),
+                                right=max(bounds['ur']['x'], bounds['ll']['x']),
+                                top=max(bounds['ur']['y'], bounds['ll']['y']),
+                                bottom=min(bounds['ur']['y'], bounds['ll']['y']))
+
+
+def _dataset_transform(metadata):
+    bounds = metadata.grid_spatial['geo_ref_points']
+    return Affine(bounds['lr']['x'] - bounds['ul']['x'], 0, bounds['ul']['x'],
+                  0, bounds['lr']['y'] - bounds['ul']['y'], bounds['ul']['y'])
+
+
+def _dataset_crs(metadata):
+    projection = metadata.grid_spatial
+    if not projection:
+        return None
+
+    crs = projection.get('spatial_reference', None)
+    if crs:
+        return geometry.CRS(str(crs))
+
+    # Try to infer CRS
+    zone_ = projection.get('zone')
+    datum_ = projection.get('datum')
+    if zone_ and datum_:
+        try:
+            # TODO: really need CRS specified properly in agdc-metadata.yaml
+            if datum_ == 'GDA94':
+                return geometry.CRS('EPSG:283' + str(abs(zone_)))
+            if datum_ == 'WGS84':
+                if zone_[-1] == 'S':
+                    return geometry.CRS('EPSG:327' + str(abs(int(zone_[:-1]))))
+                else:
+                    return geometry.CRS('EPSG:326' + str(abs(int(zone_[:-1]))))
+        except geometry.InvalidCRSError:
+            # We still return None, as they didn't specify a CRS explicitly...
+            _LOG.warning(
+                "Can't figure out projection: possibly invalid zone (%r) for datum (%r).", zone_, datum_
+            )
+
+    return None
+
+
+def _dataset_extent(metadata, crs, id_):
+    def xytuple(obj):
+        return obj['x'], obj['y']
+
+    # If no projection or crs, they have no extent.
+    projection = metadata.grid_spatial
+    if not projection:
+        return None
+    if not crs:
+        _LOG.debug("No CRS, assuming no extent (dataset %s)", id_)
+        return None
+
+    valid_data = projection.get('valid_data')
+    geo_ref_points = projection.get('geo_ref_points')
+    if valid_data:
+        return geometry.Geometry(valid_data, crs=crs)
+    elif geo_ref_points:
+        return geometry.polygon([xytuple(geo_ref_points[key]) for key in ('ll', 'ul', 'ur', 'lr', 'll')],
+                                crs=crs)
+
+    return None
+
+
 class Measurement(object):
     def __init__(self, measurement_dict):
         self.name = measurement_dict['name']
@@ -498,6 +705,20 @@ def _polygon_from_sources_extents(sources, geobox):
 GeoPolygon.from_sources_extents = _polygon_from_sources_extents
 
 
+def _vertices(coordinates):
+    """
+    The (x, y) points of GeoJSON-style coordinates, however deeply nested
+
+    >>> _vertices([[(0, 0), (0, 1), (1, 1), (0, 0)], [(0.5, 0.5, 3.0)]])
+    [(0, 0), (0, 1), (1, 1), (0, 0), (0.5, 0.5)]
+    """
+    if not coordinates:
+        return []
+    if not isinstance(coordinates[0], (list, tuple)):
+        return [tuple(coordinates[:2])]
+    return [point for part in coordinates for point in _vertices(part)]
+
+
 class FlagsDefinition(object):
     def __init__(self, flags_def_dict):
         self.flags_def_dict = flags_def_dict
@@ -627,14 +848,104 @@ class GridSpec(object):
         :param tile_buffer:
         :return: iterator of grid cells with :py:class:`GeoBox` tiles
         """
-        result = []
-        geopolygon = geopolygon.to_crs(self.crs)
-        for tile_index, tile_geobox in self.tiles(geopolygon.boundingbox.buffered(*tile_buffer)):
-            if tile_buffer:
-                tile_geobox = tile_geobox.buffered(*tile_buffer)
+        tile_indexes = sorted(self.tiles_of_geopolygons([geopolygon], tile_buffer), key=lambda index: index[::-1])
+        return [(tile_index, self.buffered_tile_geobox(tile_index, tile_buffer)) for tile_index in tile_indexes]
+
+    def buffered_tile_geobox(self, tile_index, tile_buffer=(0, 0)):
+        """
+        Tile geobox, buffered by (y, x) in CRS units.
+
+        :param (int,int) tile_index:
+        :param (float,float) tile_buffer:
+        :rtype: datacube.utils.geometry.GeoBox
+        """
+        geobox = self.tile_geobox(tile_index)
+        return geobox.buffered(*tile_buffer) if tile_buffer else geobox
+
+    def tiles_of_geopolygons(self, geopolygons, tile_buffer=(0, 0)):
+        """
+        Find the tiles intersecting each of many polygons, such as the footprints of datasets, all at once.
+
+        Candidate tiles come from the bounding box of each polygon. A polygon within a single tile, or
+        with a corner inside a tile, certainly intersects it. Only the remaining candidates are compared
+        exactly. No :py:class:`GeoBox` is made except for those comparisons: use :meth:`tile_geobox` for the
+        tiles that are needed.
+
+        .. note::
+
+           Grid cells are referenced by coordinates `(x, y)`, which is the opposite to the usual CRS
+           dimension order.
+
+        :param list[geometry.Geometry] geopolygons: polygons in any CRS. Any that are None are skipped.
+        :param (float,float) tile_buffer: buffer tiles by (y, x) in CRS units
+        :return: for each tile index, the positions in `geopolygons` of the polygons intersecting it,
+                 in ascending order
+        :rtype: dict[(int,int), list[int]]
+        """
+        positions = [position for position, geopolygon in enumerate(geopolygons) if geopolygon is not None]
+        polygons = [geopolygons[position].to_crs(self.crs) for position in positions]
+        if not polygons:
+            return {}
+
+        envelopes = [polygon.envelope for polygon in polygons]
+        buffer_y, buffer_x = tile_buffer
+        lower_x, upper_x = self._tile_index_ranges([(e.left - buffer_x, e.right + buffer_x) for e in envelopes], 1)
+        lower_y, upper_y = self._tile_index_ranges([(e.bottom - buffer_y, e.top + buffer_y) for e in envelopes], 0)
+        counts_x, counts_y = upper_x - lower_x, upper_y - lower_y
+
+        # Every (polygon, tile) pair in the bounding boxes, with the tiles of each polygon in (y, x) order
+        counts = counts_x * counts_y
+        polygon_numbers = numpy.repeat(numpy.arange(len(polygons)), counts)
+        offsets = numpy.arange(counts.sum()) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        tiles_x = lower_x[polygon_numbers] + offsets % counts_x[polygon_numbers]
+        tiles_y = lower_y[polygon_numbers] + offsets // counts_x[polygon_numbers]
 
-            if intersects(tile_geobox.extent, geopolygon):
-                result.append((tile_index, tile_geobox))
+        # Only tiles at least as big as the grid cover all of a polygon's bounding box, and contain its corners
+        covering = buffer_x >= 0 and buffer_y >= 0
+        certain = (counts == 1)[polygon_numbers] if covering else numpy.zeros(len(polygon_numbers), dtype=bool)
+        uncertain_numbers = numpy.unique(polygon_numbers[~certain]).tolist() if covering else []
+        corner_tiles = dict(zip(uncertain_numbers,
+                                self._corner_tiles([polygons[number] for number in uncertain_numbers])))
+
+        found = {}
+        for number, tile_x, tile_y, is_certain in zip(polygon_numbers.tolist(), tiles_x.tolist(), tiles_y.tolist(),
+                                                      certain.tolist()):
+            tile_index = (tile_x, tile_y)
+            if (is_certain or tile_index in corner_tiles.get(number, ()) or
+                    intersects(self.buffered_tile_geobox(tile_index, tile_buffer).extent, polygons[number])):
+                found.setdefault(tile_index, []).append(positions[number])
+        return found
+
+    def _tile_index_ranges(self, bounds, axis):
+        """
+        Indexes of the first and one past the last tile covering each range of coordinates along an axis,
+        as :meth:`grid_range` would give them.
+
+        :param list[(float,float)] bounds: (lower, upper) coordinates of each range
+        :param int axis: 0 for y, 1 for x
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        bounds = (numpy.array(bounds, dtype='float64').reshape((-1, 2)) - self.origin[axis]) / self.tile_size[axis]
+        return (numpy.floor(bounds.min(axis=1)).astype('int64'),
+                numpy.ceil(bounds.max(axis=1)).astype('int64'))
+
+    def _corner_tiles(self, polygons):
+        """
+        Indexes of the tiles containing a corner of each polygon.
+
+        :param list[geometry.Geometry] polygons: in the CRS of the grid
+        :rtype: list[set[(int,int)]]
+        """
+        corners = [_vertices(polygon.json['coordinates']) for polygon in polygons]
+        points = numpy.array([point for polygon_corners in corners for point in polygon_corners],
+                             dtype='float64').reshape((-1, 2))
+        tiles = numpy.floor((points - self.origin[::-1]) / self.tile_size[::-1]).astype('int64').tolist()
+
+        result = []
+        start = 0
+        for polygon_corners in corners:
+            result.append(set(map(tuple, tiles[start:start + len(polygon_corners)])))
+            start += len(polygon_corners)
         return result
 
     @staticmethod
@@ -2,11 +2,13 @@ from __future__ import absolute_import
 
 import csv
 import datetime
+import itertools
 import logging
 import sys
 from collections import OrderedDict
 from decimal import Decimal
 from pathlib import Path
+from uuid import UUID
 
 import click
 import yaml
@@ -174,10 +176,28 @@ def index_cmd(index, match_rules, dtype, auto_match, sources_policy, dry_run, da
         index_dataset_paths(sources_policy, dry_run, index, rules, dataset_paths)
 
 
+#: Number of datasets added to the index in each transaction
+_INDEX_BATCH_SIZE = 1000
+
+
 def index_dataset_paths(sources_policy, dry_run, index, rules, dataset_paths):
-    for dataset in load_datasets(dataset_paths, rules):
-        _LOG.info('Matched %s', dataset)
+    datasets = load_datasets(dataset_paths, rules)
+    while True:
+        batch = list(itertools.islice(datasets, _INDEX_BATCH_SIZE))
+        if not batch:
+            break
+        for dataset in batch:
+            _LOG.info('Matched %s', dataset)
         if not dry_run:
+            _index_batch(index, batch, sources_policy)
+
+
+def _index_batch(index, datasets, sources_policy):
+    try:
+        index.datasets.add_many(datasets, sources_policy=sources_policy, batch_size=len(datasets))
+    except (ValueError, MissingRecordError):
+        # Add them one at a time to find out which are at fault
+        for dataset in datasets:
             try:
                 index.datasets.add(dataset, sources_policy=sources_policy)
             except (ValueError, MissingRecordError) as e:
@@ -253,8 +273,13 @@ def update_dry_run(index, updates, dataset):
     return can_update
 
 
-def build_dataset_info(index, dataset, show_sources=False, show_derived=False, depth=1, max_depth=99):
+def build_dataset_info(index, dataset, show_sources=False, show_derived=False, depth=1, max_depth=99,
+                       derived=None):
     # type: (Index, Dataset, bool) -> dict
+    """
+    :param dict[UUID, list[Dataset]] derived: datasets derived from each dataset, if already looked up
+                                              (see :func:`_get_derived_generations`)
+    """
 
     info = OrderedDict((
         ('id', str(dataset.id)),
@@ -277,10 +302,13 @@ def build_dataset_info(index, dataset, show_sources=False, show_derived=False, d
                                for key, source in dataset.sources.items()}
 
         if show_derived:
-            info['derived'] = [build_dataset_info(index, derived,
+            if derived is None:
+                derived = _get_derived_generations(index, [dataset.id], max_depth - depth)
+            info['derived'] = [build_dataset_info(index, derived_dataset,
                                                   show_sources=False, show_derived=True,
-                                                  depth=depth + 1, max_depth=max_depth)
-                               for derived in index.datasets.get_derived(dataset.id)]
+                                                  depth=depth + 1, max_depth=max_depth,
+                                                  derived=derived)
+                               for derived_dataset in derived.get(dataset.id, [])]
 
     return info
 
@@ -348,6 +376,32 @@ _OUTPUT_WRITERS = {
 }
 
 
+def _validate_ids(ctx, param, value):
+    for id_ in value:
+        try:
+            UUID(id_)
+        except ValueError:
+            raise click.BadParameter('%s is not a valid dataset id' % id_)
+    return value
+
+
+def _get_datasets(index, ids, include_sources=False):
+    """
+    Fetch the datasets with the given ids, reporting those that aren't indexed.
+
+    :param list[str] ids:
+    :return: the datasets found, and the ids that are missing
+    :rtype: (list[Dataset], list[str])
+    """
+    datasets = index.datasets.get_many(ids, include_sources=include_sources)
+
+    found_ids = {dataset.id for dataset in datasets}
+    missing_ids = [id_ for id_ in ids if UUID(id_) not in found_ids]
+    for id_ in missing_ids:
+        click.echo('%s missing' % id_, err=True)
+    return datasets, missing_ids
+
+
 @dataset_cmd.command('info', help="Display dataset information")
 @click.option('--show-sources', help='Also show source datasets', is_flag=True, default=False)
 @click.option('--show-derived', help='Also show derived datasets', is_flag=True, default=False)
@@ -358,33 +412,28 @@ _OUTPUT_WRITERS = {
               type=int,
               # Unlikely to be hit, but will avoid total-death by circular-references.
               default=99)
-@click.argument('ids', nargs=-1)
+@click.argument('ids', nargs=-1, callback=_validate_ids)
 @ui.pass_index()
 def info_cmd(index, show_sources, show_derived, f, max_depth, ids):
     # type: (Index, bool, bool, Iterable[str]) -> None
 
-    # Using an array wrapper to get around the lack of "nonlocal" in py2
-    missing_datasets = [0]
+    datasets, missing_ids = _get_datasets(index, ids, include_sources=show_sources)
 
-    def get_datasets(ids):
-        for id_ in ids:
-            dataset = index.datasets.get(id_, include_sources=show_sources)
-            if dataset:
-                yield dataset
-            else:
-                click.echo('%s missing' % id_, err=True)
-                missing_datasets[0] += 1
+    derived = None
+    if show_derived:
+        derived = _get_derived_generations(index, [dataset.id for dataset in datasets], max_depth - 1)
 
     _OUTPUT_WRITERS[f](
         build_dataset_info(index,
                            dataset,
                            show_sources=show_sources,
                            show_derived=show_derived,
-                           max_depth=max_depth)
-        for dataset in get_datasets(ids)
+                           max_depth=max_depth,
+                           derived=derived)
+        for dataset in datasets
     )
 
-    sys.exit(missing_datasets[0])
+    sys.exit(len(missing_ids))
 
 
 @dataset_cmd.command('search')
@@ -403,17 +452,41 @@ def search_cmd(index, f, expressions):
     )
 
 
-def _get_derived_set(index, id_):
+def _get_derived_generations(index, ids, max_generations=None):
+    """
+    Find the datasets derived from each of the given ones, and from those in turn, one generation per query.
+
+    :param list[UUID] ids:
+    :param int max_generations: how many generations to look for, or None for all of them
+    :return: the datasets derived directly from each dataset that has any
+    :rtype: dict[UUID, list[Dataset]]
+    """
+    derived = {}
+    seen = set(ids)
+    to_process = set(ids)
+    generation = 0
+    while to_process and (max_generations is None or generation < max_generations):
+        found = index.datasets.get_derived_many(list(to_process))
+        derived.update(found)
+
+        to_process = {dataset.id for datasets in found.values() for dataset in datasets} - seen
+        seen.update(to_process)
+        generation += 1
+    return derived
+
+
+def _get_derived_set(index, datasets):
     """
-    Get a single flat set of all derived datasets.
+    Get a single flat set of the given datasets and all derived from them.
     (children, grandchildren, great-grandchildren...)
+
+    :param list[Dataset] datasets:
+    :rtype: set[Dataset]
     """
-    derived_set = {index.datasets.get(id_)}
-    to_process = {id_}
-    while to_process:
-        derived = index.datasets.get_derived(to_process.pop())
-        to_process.update(d.id for d in derived)
-        derived_set.update(derived)
+    derived = _get_derived_generations(index, [dataset.id for dataset in datasets])
+    derived_set = set(datasets)
+    for derived_datasets in derived.values():
+        derived_set.update(derived_datasets)
     return derived_set
 
 
@@ -421,15 +494,17 @@ def _get_derived_set(index, id_):
 @click.option('--archive-derived', '-d', help='Also recursively archive derived datasets', is_flag=True, default=False)
 @click.option('--dry-run', help="Don't archive. Display datasets that would get archived",
               is_flag=True, default=False)
-@click.argument('ids', nargs=-1)
+@click.argument('ids', nargs=-1, callback=_validate_ids)
 @ui.pass_index()
 def archive_cmd(index, archive_derived, dry_run, ids):
-    for id_ in ids:
-        to_process = _get_derived_set(index, id_) if archive_derived else [index.datasets.get(id_)]
-        for d in to_process:
-            click.echo('archiving %s %s %s' % (d.type.name, d.id, d.local_uri))
-        if not dry_run:
-            index.datasets.archive(d.id for d in to_process)
+    datasets, missing_ids = _get_datasets(index, ids)
+    to_process = _get_derived_set(index, datasets) if archive_derived else datasets
+    for d in to_process:
+        click.echo('archiving %s %s %s' % (d.type.name, d.id, d.local_uri))
+    if not dry_run:
+        index.datasets.archive(d.id for d in to_process)
+
+    sys.exit(len(missing_ids))
 
 
 @dataset_cmd.command('restore', help="Restore datasets")
@@ -440,25 +515,27 @@ def archive_cmd(index, archive_derived, dry_run, ids):
               help="Only restore derived datasets that were archived "
                    "this recently to the original dataset",
               default=10 * 60)
-@click.argument('ids', nargs=-1)
+@click.argument('ids', nargs=-1, callback=_validate_ids)
 @ui.pass_index()
 def restore_cmd(index, restore_derived, derived_tolerance_seconds, dry_run, ids):
     tolerance = datetime.timedelta(seconds=derived_tolerance_seconds)
 
-    for id_ in ids:
-        _restore_one(dry_run, id_, index, restore_derived, tolerance)
+    datasets, missing_ids = _get_datasets(index, ids)
+    for target_dataset in datasets:
+        _restore_one(dry_run, target_dataset, index, restore_derived, tolerance)
+
+    sys.exit(len(missing_ids))
 
 
-def _restore_one(dry_run, id_, index, restore_derived, tolerance):
+def _restore_one(dry_run, target_dataset, index, restore_derived, tolerance):
     """
     :type index: datacube.index._api.Index
     :type restore_derived: bool
     :type tolerance: datetime.timedelta
     :type dry_run:  bool
-    :type id_: str
+    :type target_dataset: Dataset
     """
-    target_dataset = index.datasets.get(id_)
-    to_process = _get_derived_set(index, id_) if restore_derived else {target_dataset}
+    to_process = _get_derived_set(index, [target_dataset]) if restore_derived else {target_dataset}
     _LOG.debug("%s selected", len(to_process))
 
     # Only the already-archived ones.
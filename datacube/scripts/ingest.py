@@ -18,7 +18,8 @@ import datacube
 from datacube.api.core import Datacube
 from datacube.model import DatasetType, Range, GeoPolygon
 from datacube.model.utils import make_dataset, xr_apply, datasets_to_doc
-from datacube.storage.storage import write_dataset_to_netcdf
+from datacube.storage.drivers import get_driver
+from datacube.storage.fusers import check_fuser
 from datacube.ui import click as ui
 from datacube.utils import read_documents, changes
 from datacube.ui.task_app import check_existing_files, load_tasks as load_tasks_, save_tasks as save_tasks_
@@ -46,7 +47,7 @@ def morph_dataset_type(source_type, config):
     output_type.definition['name'] = config['output_type']
     output_type.definition['managed'] = True
     output_type.definition['description'] = config['description']
-    output_type.metadata_doc['format'] = {'name': 'NetCDF'}
+    output_type.metadata_doc['format'] = {'name': get_storage_driver(config).format}
 
     output_type.definition['storage'] = {k: v for (k, v) in config['storage'].items()
                                          if k in ('crs', 'tile_size', 'resolution', 'origin')}
@@ -60,6 +61,10 @@ def morph_dataset_type(source_type, config):
     return output_type
 
 
+def get_storage_driver(config):
+    return get_driver(config['storage'].get('driver', 'NetCDF CF'))
+
+
 def get_variable_params(config):
     chunking = config['storage']['chunking']
     chunking = [chunking[dim] for dim in config['storage']['dimension_order']]
@@ -166,6 +171,7 @@ def load_config_from_file(index, config):
     config_name = Path(config).name
     _, config = next(read_documents(Path(config)))
     config['filename'] = config_name
+    check_fuser(config.get(FUSER_KEY))
 
     return config
 
@@ -214,9 +220,10 @@ def ingest_work(config, source_type, output_type, tile, tile_index):
     variable_params = get_variable_params(config)
     global_attributes = config['global_attributes']
 
-    with datacube.set_options(reproject_threads=1):
-        fuse_func = {'copy': None}[config.get(FUSER_KEY, 'copy')]
-        data = Datacube.load_data(tile.sources, tile.geobox, measurements, fuse_func=fuse_func)
+    # Loaded lazily, a time slice at a time, as each chunk of the file is written: only the chunks being
+    # written are held in memory, rather than the whole tile.
+    fuse_func = config.get(FUSER_KEY, 'copy')
+    data = Datacube.load_data(tile.sources, tile.geobox, measurements, fuse_func=fuse_func, dask_chunks={})
     nudata = data.rename(namemap)
     file_path = get_filename(config, tile_index, tile.sources)
 
@@ -232,19 +239,17 @@ def ingest_work(config, source_type, output_type, tile, tile_index):
     datasets = xr_apply(tile.sources, _make_dataset, dtype='O')  # Store in Dataarray to associate Time -> Dataset
     nudata['dataset'] = datasets_to_doc(datasets)
 
-    write_dataset_to_netcdf(nudata, file_path, global_attributes, variable_params)
+    with datacube.set_options(reproject_threads=1, compress_threads=config.get('compress_threads', 1)):
+        get_storage_driver(config).write_dataset(nudata, file_path, global_attributes, variable_params)
     _LOG.info('Finished task %s', tile_index)
 
     return datasets
 
 
 def _index_datasets(index, results, skip_sources):
-    n = 0
-    for datasets in results:
-        for dataset in datasets.values:
-            index.datasets.add(dataset, sources_policy='skip')
-            n += 1
-    return n
+    datasets = [dataset for result in results for dataset in result.values]
+    index.datasets.add_many(datasets, sources_policy='skip')
+    return len(datasets)
 
 
 def process_tasks(index, config, source_type, output_type, tasks, queue_size, executor):
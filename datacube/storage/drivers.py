@@ -0,0 +1,149 @@
+# coding=utf-8
+"""
+Storage drivers: the formats that ingest and the stacker can write storage units in, and how to read them back.
+
+A driver is chosen by name: from ``storage: driver:`` in an ingest configuration when writing, and from the
+`format` recorded in each dataset when loading. Names are case insensitive.
+
+==============  ===================================================================
+Name            Storage
+==============  ===================================================================
+``NetCDF CF``   A NetCDF4 file, read through GDAL (also known as ``NetCDF``)
+``zarr``        A Zarr directory holding a file per chunk of each variable, read
+                directly from its chunks. Requires the ``zarr`` package.
+==============  ===================================================================
+
+Formats without a driver (eg. ``GeoTIFF``) are read through GDAL, and can't be written.
+"""
+from __future__ import absolute_import
+
+import shutil
+from contextlib import contextmanager
+
+from datacube.compat import urlparse
+from datacube.storage import zarr_writer
+from datacube.storage.storage import write_dataset_to_netcdf, write_dataset_to_zarr, ZarrDataSource
+from datacube.utils import uri_to_local_path
+
+
+class StorageDriver(object):
+    """
+    A way of writing storage units, and of reading the datasets stored in them
+    """
+    #: The `format` recorded in the datasets written
+    format = None
+
+    #: Whether bands are read through rasterio/GDAL. Otherwise they're read with :meth:`open_band`.
+    reads_with_gdal = True
+
+    def write_dataset(self, dataset, path, global_attributes=None, variable_params=None):
+        """
+        Write a Data Cube style xarray Dataset to a new storage unit
+
+        :param `xarray.Dataset` dataset:
+        :param pathlib.Path path: where to write it
+        :param dict global_attributes: attr_name: attr_value
+        :param dict variable_params: variable_name: {param_name: param_value}
+        """
+        raise NotImplementedError
+
+    def remove(self, path):
+        """
+        Remove a storage unit written by :meth:`write_dataset` (eg. when it failed part way through)
+
+        :param pathlib.Path path:
+        """
+        path.unlink()
+
+    def band_location(self, url, layer):
+        """
+        Where a band is stored. Bands at the same location are read together.
+
+        :param str url: of the storage unit
+        :param str layer: name of the variable
+        :rtype: str
+        """
+        raise NotImplementedError
+
+    def open_band(self, url, layer, time, nodata):
+        """
+        Context manager which returns a data source for reading a band of a storage unit
+
+        :param str url: of the storage unit
+        :param str layer: name of the variable
+        :param float time: time of the band to read, in seconds since 1970
+        :param nodata: nodata value, if the storage unit doesn't have one
+        """
+        raise NotImplementedError
+
+
+class NetCDFDriver(StorageDriver):
+    format = 'NetCDF'
+
+    def write_dataset(self, dataset, path, global_attributes=None, variable_params=None):
+        write_dataset_to_netcdf(dataset, path, global_attributes, variable_params)
+
+
+class ZarrDriver(StorageDriver):
+    format = 'zarr'
+    reads_with_gdal = False
+
+    def write_dataset(self, dataset, path, global_attributes=None, variable_params=None):
+        write_dataset_to_zarr(dataset, path, global_attributes, variable_params)
+
+    def remove(self, path):
+        shutil.rmtree(str(path))
+
+    def band_location(self, url, layer):
+        return str(_local_path(url) / layer)
+
+    @contextmanager
+    def open_band(self, url, layer, time, nodata):
+        yield ZarrDataSource(zarr_writer.open_zarr(_local_path(url)), layer, time=time, nodata=nodata)
+
+
+def _local_path(url):
+    scheme = urlparse(url).scheme
+    if scheme != 'file':
+        raise RuntimeError("Can't access zarr over %s" % scheme)
+    return uri_to_local_path(url)
+
+
+DRIVERS = {}
+
+
+def register_driver(name, driver):
+    """
+    Make a storage driver available by name.
+
+    :param str name: name to select it with, as given in ingest configurations and recorded as dataset formats
+    :param StorageDriver driver:
+    """
+    DRIVERS[name.lower()] = driver
+
+
+register_driver('NetCDF', NetCDFDriver())
+register_driver('NetCDF CF', DRIVERS['netcdf'])
+register_driver('zarr', ZarrDriver())
+
+
+def driver_for_format(name):
+    """
+    The driver registered under `name`, or None if there isn't one.
+
+    :rtype: StorageDriver
+    """
+    return DRIVERS.get(name.lower()) if name else None
+
+
+def get_driver(name):
+    """
+    The driver for writing storage units named by an ingest configuration.
+
+    :raises ValueError: if there's no driver called `name`
+    :rtype: StorageDriver
+    """
+    driver = driver_for_format(name)
+    if driver is None:
+        raise ValueError('Unknown storage driver %r, expected one of: %s' % (name, ', '.join(sorted(DRIVERS))))
+    return driver
@@ -0,0 +1,229 @@
+# coding=utf-8
+"""
+Cache of open raster files, shared by all data sources in a process.
+
+Opening a file (and parsing its headers) is often more expensive than reading a small window from it,
+which is exactly what chunked (dask) loads do over and over. Open files are kept in a bounded
+least-recently-used pool and are handed out to one user at a time, so a file handle is never used by
+two threads at once. Local files are checked for changes (by inode, modification time and size) each
+time they are handed out, so a file replaced in place is opened again rather than read through a stale
+handle.
+"""
+from __future__ import absolute_import
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+import rasterio
+
+from datacube.config import OPTIONS
+
+_LOG = logging.getLogger(__name__)
+
+CacheStats = namedtuple('CacheStats', ['hits', 'misses', 'evictions', 'idle'])
+
+
+class CachedFile(object):
+    """
+    An open file, plus anything derived from it that is worth remembering
+
+    :param dataset: open rasterio dataset
+    :param version: the :func:`file_version` of the file when it was opened
+    """
+    def __init__(self, filename, dataset, version=None):
+        self.filename = filename
+        self.dataset = dataset
+        self.version = version
+        self.pid = os.getpid()
+        self.last_used = time.time()
+        self._memo = {}
+
+    def memo(self, key, func):
+        """
+        Return the value of `func(dataset)`, calculating it only the first time `key` is asked for.
+        """
+        if key not in self._memo:
+            self._memo[key] = func(self.dataset)
+        return self._memo[key]
+
+    def close(self):
+        self.dataset.close()
+
+
+class OpenFileCache(object):
+    """
+    Bounded pool of open files, keyed by filename
+
+    Sizes and timeouts are read from the `file_cache_size` and `file_cache_timeout` options
+    (see :class:`datacube.set_options`) each time the cache is used, unless given explicitly.
+    A size of 0 disables caching.
+
+    :param opener: function opening a file given its name
+    :param int max_size: maximum number of idle open files
+    :param float idle_timeout: seconds after which an unused file is closed
+    """
+
+    def __init__(self, opener=rasterio.open, max_size=None, idle_timeout=None):
+        self._opener = opener
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        #: filename -> list of idle CachedFile, least recently used filename first
+        self._idle = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def max_size(self):
+        return OPTIONS['file_cache_size'] if self._max_size is None else self._max_size
+
+    @property
+    def idle_timeout(self):
+        return OPTIONS['file_cache_timeout'] if self._idle_timeout is None else self._idle_timeout
+
+    @contextmanager
+    def open(self, filename):
+        """
+        Context manager returning a :class:`CachedFile` for exclusive use within the block.
+
+        If an exception escapes the block the file is closed rather than returned to the cache.
+        """
+        cached = self._checkout(filename)
+        try:
+            yield cached
+        except Exception:
+            cached.close()
+            raise
+        self._checkin(cached)
+
+    def stats(self):
+        """
+        :rtype: CacheStats
+        """
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, self._idle_count())
+
+    def clear(self):
+        """
+        Close all idle files
+        """
+        with self._lock:
+            self._check_process()
+            for cached in self._pop_all():
+                cached.close()
+
+    def _checkout(self, filename):
+        version = file_version(filename)
+        with self._lock:
+            self._check_process()
+            expired = self._pop_expired()
+            expired.extend(self._pop_changed(filename, version))
+            available = self._idle.get(filename)
+            if available:
+                cached = available.pop()
+                if not available:
+                    del self._idle[filename]
+                self._hits += 1
+            else:
+                cached = None
+                self._misses += 1
+
+        for old in expired:
+            old.close()
+
+        if cached is None:
+            cached = CachedFile(filename, self._opener(filename), version)
+        return cached
+
+    def _checkin(self, cached):
+        max_size = self.max_size
+        if max_size <= 0:
+            cached.close()
+            return
+
+        cached.last_used = time.time()
+        evicted = []
+        with self._lock:
+            self._check_process()
+            if cached.pid != self._pid:
+                # Opened before a fork: belongs to another process' cache
+                evicted.append(cached)
+            else:
+                self._idle.setdefault(cached.filename, []).append(cached)
+                self._idle[cached.filename] = self._idle.pop(cached.filename)  # most recently used
+                while self._idle_count() > max_size:
+                    filename, available = next(iter(self._idle.items()))
+                    evicted.append(available.pop(0))
+                    if not available:
+                        del self._idle[filename]
+                    self._evictions += 1
+
+        for old in evicted:
+            old.close()
+
+    def _check_process(self):
+        # File handles are not shared with forked children: start again with an empty cache.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._idle = OrderedDict()
+
+    def _idle_count(self):
+        return sum(len(available) for available in self._idle.values())
+
+    def _pop_expired(self):
+        timeout = self.idle_timeout
+        if timeout is None:
+            return []
+        oldest = time.time() - timeout
+        expired = []
+        for filename, available in list(self._idle.items()):
+            expired.extend(cached for cached in available if cached.last_used < oldest)
+            available[:] = [cached for cached in available if cached.last_used >= oldest]
+            if not available:
+                del self._idle[filename]
+        return expired
+
+    def _pop_changed(self, filename, version):
+        available = self._idle.get(filename, [])
+        changed = [cached for cached in available if cached.version != version]
+        if changed:
+            _LOG.debug("%s has changed since it was opened", filename)
+            available[:] = [cached for cached in available if cached.version == version]
+            if not available:
+                del self._idle[filename]
+        return changed
+
+    def _pop_all(self):
+        idle = [cached for available in self._idle.values() for cached in available]
+        self._idle = OrderedDict()
+        return idle
+
+
+def file_version(filename):
+    """
+    The inode, modification time and size of a local file, or None if it can't be checked (eg. a remote URL).
+
+    GDAL subdataset names (eg. ``NetCDF:/path/to/file.nc:band``) are checked by the file they refer to.
+
+    :param str filename: as given to `rasterio.open`
+    """
+    paths = [filename]
+    if filename.count(':') >= 2:
+        paths.append(filename.split(':', 1)[1].rsplit(':', 1)[0].strip('"'))
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except (OSError, ValueError):
+            continue
+        return stat.st_ino, stat.st_mtime, stat.st_size
+    return None
+
+
+#: Process wide cache used by :class:`datacube.storage.storage.BaseRasterDataSource`
+FILE_CACHE = OpenFileCache()
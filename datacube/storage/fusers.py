@@ -0,0 +1,257 @@
+# coding=utf-8
+"""
+Built-in strategies for fusing several overlapping sources into a single array.
+
+A fuser is called as ``fuse_func(dest, src)`` for each source in turn, and updates `dest` in place.
+The built-in fusers are aware of `nodata`, and can be selected by name wherever a `fuse_func`
+is accepted, eg. ``dc.load(..., fuse_func='max')`` or ``fuse_data: max`` in an ingest config.
+
+================  ===========================================================
+Name              Result
+================  ===========================================================
+``first_valid``   The first valid value (the default, also known as ``copy``)
+``last_valid``    The last valid value
+``min``           The smallest valid value
+``max``           The largest valid value
+``bitwise_and``   Bitwise AND of the valid values, eg. for pixel quality flags
+``bitwise_or``    Bitwise OR of the valid values
+``nanmean``       Mean of the valid values
+================  ===========================================================
+
+Fusers keep their scratch buffers between calls, so fusing many sources into the same destination
+does not allocate any more memory after the first. Sources that only cover part of the destination
+are fused a window at a time (see :func:`fuse_window`).
+"""
+from __future__ import absolute_import, division
+
+import numpy
+
+from datacube.compat import string_types
+
+
+def _is_nan(value):
+    return numpy.asarray(value).dtype.kind == 'f' and numpy.isnan(value)
+
+
+class NodataFuser(object):
+    """
+    Base class for fusers that ignore `nodata` values in their inputs
+
+    Subclasses implement :meth:`fuse_window`. Their scratch buffers cover the whole destination and are
+    sliced by the window, so they're reused whichever part of the destination each source covers.
+
+    :param nodata: nodata value of the destination and sources
+    """
+
+    def __init__(self, nodata):
+        self.nodata = nodata
+        self._nan = _is_nan(nodata)
+        self._buffers = {}
+
+    def __call__(self, dest, src):
+        self.fuse_window(dest, src, (slice(None),) * dest.ndim)
+
+    def fuse_window(self, dest, src, window):
+        """
+        Fuse the `window` (a tuple of slices) of `src` into the same window of `dest`,
+        leaving the rest of `dest` alone.
+        """
+        raise NotImplementedError
+
+    def buffer(self, name, shape, dtype, window=None):
+        """
+        Scratch array, reused between calls while the shape and type stay the same.
+
+        :param window: if given, the part of the array to return
+        """
+        array = self._buffers.get(name)
+        if array is None or array.shape != shape or array.dtype != dtype:
+            array = self._buffers[name] = numpy.empty(shape, dtype=dtype)
+        return array if window is None else array[window]
+
+    def invalid(self, array, window, name='mask'):
+        """
+        Mask of `nodata` values in the `window` of `array`, in a scratch buffer.
+        """
+        mask = self.buffer(name, array.shape, numpy.bool_, window)
+        if self._nan:
+            numpy.isnan(array[window], out=mask)
+        else:
+            numpy.equal(array[window], self.nodata, out=mask)
+        return mask
+
+    def valid(self, array, window, name='mask'):
+        """
+        Mask of values that aren't `nodata` in the `window` of `array`, in a scratch buffer.
+        """
+        mask = self.buffer(name, array.shape, numpy.bool_, window)
+        if self._nan:
+            numpy.isnan(array[window], out=mask)
+            numpy.logical_not(mask, out=mask)
+        else:
+            numpy.not_equal(array[window], self.nodata, out=mask)
+        return mask
+
+
+class FirstValidFuser(NodataFuser):
+    """
+    Keep the first valid value seen.
+
+    >>> dest = numpy.array([-1, 2, -1, 4])
+    >>> FirstValidFuser(-1)(dest, numpy.array([5, 6, -1, 8]))
+    >>> dest.tolist()
+    [5, 2, -1, 4]
+    """
+
+    def fuse_window(self, dest, src, window):
+        numpy.copyto(dest[window], src[window], where=self.invalid(dest, window))
+
+
+class LastValidFuser(NodataFuser):
+    """
+    Keep the last valid value seen.
+
+    >>> dest = numpy.array([-1, 2, -1, 4])
+    >>> LastValidFuser(-1)(dest, numpy.array([5, 6, -1, 8]))
+    >>> dest.tolist()
+    [5, 6, -1, 8]
+    """
+
+    def fuse_window(self, dest, src, window):
+        numpy.copyto(dest[window], src[window], where=self.valid(src, window))
+
+
+class ReducingFuser(NodataFuser):
+    """
+    Combine valid values with a binary `ufunc`, eg. :data:`numpy.minimum`.
+
+    `nan_ufunc`, if given, is a single pass equivalent used when nodata is NaN (eg. :data:`numpy.fmin`).
+
+    >>> dest = numpy.array([-1, 2, -1, 4])
+    >>> ReducingFuser(-1, numpy.maximum)(dest, numpy.array([5, 6, -1, 1]))
+    >>> dest.tolist()
+    [5, 6, -1, 4]
+    >>> nan = float('nan')
+    >>> dest = numpy.array([nan, 2, nan])
+    >>> ReducingFuser(nan, numpy.minimum, numpy.fmin)(dest, numpy.array([5, 1, nan]))
+    >>> dest.tolist()
+    [5.0, 1.0, nan]
+    """
+
+    def __init__(self, nodata, ufunc, nan_ufunc=None):
+        super(ReducingFuser, self).__init__(nodata)
+        self.ufunc = ufunc
+        self.nan_ufunc = nan_ufunc
+
+    def fuse_window(self, dest, src, window):
+        dest_window, src_window = dest[window], src[window]
+        if self._nan and self.nan_ufunc is not None:
+            self.nan_ufunc(dest_window, src_window, out=dest_window)
+            return
+        numpy.copyto(dest_window, src_window, where=self.invalid(dest, window))
+        self.ufunc(dest_window, src_window, out=dest_window, where=self.valid(src, window))
+
+
+class MeanFuser(NodataFuser):
+    """
+    Mean of the valid values seen, rounded to the nearest integer for integer destinations.
+
+    >>> fuser = MeanFuser(-1)
+    >>> dest = numpy.array([-1, 2, -1, 4])
+    >>> fuser(dest, numpy.array([5, 6, -1, 1]))
+    >>> fuser(dest, numpy.array([3, 1, -1, -1]))
+    >>> dest.tolist()
+    [4, 3, -1, 2]
+    """
+
+    def __init__(self, nodata):
+        super(MeanFuser, self).__init__(nodata)
+        self._started = False
+
+    def fuse_window(self, dest, src, window):
+        # The running totals cover the whole of `dest`, so must be updated a window at a time
+        total = self.buffer('total', dest.shape, numpy.float64)
+        count = self.buffer('count', dest.shape, numpy.uint32)
+        if not self._started:
+            # `dest` may already hold a source: start from it
+            everywhere = (slice(None),) * dest.ndim
+            valid = self.valid(dest, everywhere)
+            total.fill(0)
+            numpy.copyto(total, dest, where=valid)
+            numpy.copyto(count, valid)
+            self._started = True
+
+        valid = self.valid(src, window)
+        total, count = total[window], count[window]
+        numpy.add(total, src[window], out=total, where=valid)
+        numpy.add(count, 1, out=count, where=valid)
+
+        has_data = self.buffer('has_data', dest.shape, numpy.bool_, window)
+        numpy.not_equal(count, 0, out=has_data)
+        if dest.dtype.kind == 'f':
+            numpy.divide(total, count, out=dest[window], where=has_data)
+        else:
+            mean = self.buffer('mean', dest.shape, numpy.float64, window)
+            numpy.divide(total, count, out=mean, where=has_data)
+            numpy.rint(mean, out=mean)
+            numpy.copyto(dest[window], mean, where=has_data, casting='unsafe')
+
+
+#: Fuser factories by name. Each is called with the nodata value of the destination.
+FUSERS = {}
+
+
+def register_fuser(name, factory):
+    """
+    Make a fuser available by name.
+
+    :param str name: name to select it with
+    :param factory: called with the destination nodata value, returns a ``fuse_func(dest, src)``
+    """
+    FUSERS[name] = factory
+
+
+register_fuser('first_valid', FirstValidFuser)
+register_fuser('copy', FirstValidFuser)
+register_fuser('last_valid', LastValidFuser)
+register_fuser('min', lambda nodata: ReducingFuser(nodata, numpy.minimum, numpy.fmin))
+register_fuser('max', lambda nodata: ReducingFuser(nodata, numpy.maximum, numpy.fmax))
+register_fuser('bitwise_and', lambda nodata: ReducingFuser(nodata, numpy.bitwise_and))
+register_fuser('bitwise_or', lambda nodata: ReducingFuser(nodata, numpy.bitwise_or))
+register_fuser('nanmean', MeanFuser)
+
+
+def check_fuser(fuse_func):
+    """
+    Raise a ValueError if `fuse_func` names a fuser that isn't registered.
+    """
+    if isinstance(fuse_func, string_types) and fuse_func not in FUSERS:
+        raise ValueError('Unknown fuser %r, expected one of: %s' % (fuse_func, ', '.join(sorted(FUSERS))))
+
+
+def fuse_window(fuse_func, dest, src, window):
+    """
+    Fuse the `window` (a tuple of slices) of `src` into `dest` with `fuse_func`, leaving the rest of `dest` alone.
+
+    Plain functions are called with the windows of both arrays, fusers that need to see the whole of `dest`
+    are given the window separately.
+    """
+    if hasattr(fuse_func, 'fuse_window'):
+        fuse_func.fuse_window(dest, src, window)
+    else:
+        fuse_func(dest[window], src[window])
+
+
+def get_fuser(fuse_func, nodata):
+    """
+    Fusing function to use for a destination with the given `nodata`.
+
+    :param fuse_func: None for the default (first valid), the name of a registered fuser, or a function
+    :rtype: callable
+    """
+    if fuse_func is None:
+        return FirstValidFuser(nodata)
+    if isinstance(fuse_func, string_types):
+        check_fuser(fuse_func)
+        return FUSERS[fuse_func](nodata)
+    return fuse_func
@@ -0,0 +1,143 @@
+# coding=utf-8
+"""
+Writing compressed NetCDF4 variables with the compression spread over several threads.
+
+NetCDF4 files are HDF5 files, and HDF5 compresses each chunk of a variable as it's written, on the
+writing thread. Here, chunks are compressed in a pool of threads (zlib releases the GIL), and the
+compressed chunks are written in order, directly into the file with `h5py`. The chunks are exactly
+those HDF5 would have written: the same filters, in the same order, with the same settings.
+
+Requires the optional `h5py` package. Only variables compressed with zlib (and, optionally, shuffled)
+can be written this way.
+"""
+from __future__ import absolute_import, division
+
+import itertools
+import logging
+import math
+import zlib
+from multiprocessing.pool import ThreadPool
+
+import numpy
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+from datacube.storage import netcdf_writer
+
+_LOG = logging.getLogger(__name__)
+
+
+def can_compress_in_parallel(variable_params):
+    """
+    Whether a variable created with these parameters can be written with :func:`write_compressed_variables`.
+
+    :param dict variable_params: parameters given to :func:`datacube.storage.netcdf_writer.create_variable`
+    :rtype: bool
+    """
+    return (h5py is not None and
+            bool(variable_params.get('zlib')) and
+            bool(variable_params.get('chunksizes')) and
+            not variable_params.get('contiguous') and
+            not variable_params.get('fletcher32'))
+
+
+def write_compressed_variables(filename, variables, threads):
+    """
+    Write data into variables of an existing NetCDF4 file, compressing chunks in parallel.
+
+    The file must be closed by anything else using it. Variables whose filters can't be reproduced are
+    written by HDF5 as usual.
+
+    :param str filename:
+    :param variables: (name, data) of each variable to write. The data can be a :class:`numpy.ndarray`
+                      or a :class:`dask.array.Array`, which is computed one slab of chunks at a time.
+    :param int threads: number of threads compressing chunks
+    """
+    pool = ThreadPool(threads)
+    try:
+        with h5py.File(str(filename), 'r+') as h5file:
+            for name, data in variables:
+                _write_variable(h5file[name], data, pool)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _write_variable(dset, data, pool):
+    deflate = _deflate_settings(dset)
+    if deflate is None:
+        _LOG.debug("Can't compress %s in parallel: writing it through HDF5", dset.name)
+
+    chunks = dset.chunks
+    step = chunks[0] * int(math.ceil(max(getattr(data, 'chunks', [[1]])[0]) / chunks[0]))
+    for start in range(0, data.shape[0], step):
+        slab = numpy.asarray(netcdf_writer.netcdfy_data(numpy.asarray(data[start:start + step])), dtype=dset.dtype)
+        if deflate is None:
+            dset[start:start + slab.shape[0]] = slab
+            continue
+
+        complevel, shuffle = deflate
+        offsets = chunk_offsets(slab.shape, chunks)
+        compressed = pool.imap(lambda offset: _compress_chunk(_padded_chunk(slab, offset, chunks, dset.fillvalue),
+                                                              complevel, shuffle),
+                               offsets)
+        for offset, chunk_bytes in zip(offsets, compressed):
+            dset.id.write_direct_chunk((start + offset[0],) + offset[1:], chunk_bytes)
+
+
+def _deflate_settings(dset):
+    """
+    (compression level, whether shuffled) of a variable compressed with zlib, or None for any other filters
+
+    :type dset: h5py.Dataset
+    """
+    plist = dset.id.get_create_plist()
+    filters = [plist.get_filter(i) for i in range(plist.get_nfilters())]
+    codes = [code for code, _, _, _ in filters]
+    if codes == [h5py.h5z.FILTER_DEFLATE]:
+        return filters[0][2][0], False
+    if codes == [h5py.h5z.FILTER_SHUFFLE, h5py.h5z.FILTER_DEFLATE]:
+        return filters[1][2][0], True
+    return None
+
+
+def chunk_offsets(shape, chunks):
+    """
+    Offsets of every chunk of an array, in C order
+
+    >>> chunk_offsets((3, 5), (2, 4))
+    [(0, 0), (0, 4), (2, 0), (2, 4)]
+    """
+    return list(itertools.product(*[range(0, size, chunk) for size, chunk in zip(shape, chunks)]))
+
+
+def _padded_chunk(data, offset, chunks, fill_value):
+    """
+    The chunk of `data` at `offset`, padded with `fill_value` to a whole chunk at the edges, as HDF5 stores them.
+    """
+    chunk = data[tuple(slice(start, start + size) for start, size in zip(offset, chunks))]
+    if chunk.shape == tuple(chunks):
+        return chunk
+    padded = numpy.full(chunks, fill_value if fill_value is not None else 0, dtype=data.dtype)
+    padded[tuple(slice(0, size) for size in chunk.shape)] = chunk
+    return padded
+
+
+def _compress_chunk(chunk, complevel, shuffle):
+    """
+    Compress a chunk as HDF5's shuffle and deflate filters would.
+
+    >>> chunk = numpy.array([1, 2, 3], dtype='<u2')
+    >>> zlib.decompress(_compress_chunk(chunk, 4, shuffle=True)) == b'\\x01\\x02\\x03\\x00\\x00\\x00'
+    True
+    """
+    data = numpy.ascontiguousarray(chunk)
+    if shuffle and data.dtype.itemsize > 1:
+        # All the first bytes of each value, then all the second bytes...
+        raw = data.view('u1').reshape((-1, data.dtype.itemsize)).T.tobytes()
+    else:
+        raw = data.tobytes()
+    return zlib.compress(raw, complevel)
@@ -6,13 +6,26 @@ from __future__ import absolute_import, division, print_function
 
 import logging
 import math
+import os
+import threading
+import time
+from collections import deque, namedtuple, OrderedDict
 from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 from pathlib import Path
 
+import cachetools
+import netCDF4
+
 from datacube.compat import urlparse, urljoin, url_parse_module
 from datacube.config import OPTIONS
 from datacube.model import Dataset
-from datacube.storage import netcdf_writer
+from datacube.storage import netcdf_writer, zarr_writer
+from datacube.storage.file_cache import FILE_CACHE
+from datacube.storage.parallel_compression import can_compress_in_parallel, write_compressed_variables, \
+    chunk_offsets
+from datacube.storage.fusers import get_fuser, fuse_window
+from datacube.storage.warp import PIXEL_MAPPINGS
 from datacube.utils import clamp, data_resolution_and_offset, datetime_to_seconds_since_1970, DatacubeException
 from datacube.utils import geometry
 from datacube.utils import is_url, uri_to_local_path
@@ -105,7 +118,7 @@ def _read_decimated(array_transform, src, dest_shape):
     dy_dx = (array_transform.f, array_transform.c)
     sy_sx = (array_transform.e, array_transform.a)
     read, write, read_shape, write_shape = zip(*map(_calc_offsets2, dy_dx, sy_sx, src.shape, dest_shape))
-    if all(write_shape):
+    if all(size > 0 for size in write_shape):
         window = ((read[0], read[0] + read_shape[0]), (read[1], read[1] + read_shape[1]))
         tmp = src.read(window=window, out_shape=write_shape)
         scale = (read_shape[0]/write_shape[0] if sy_sx[0] > 0 else -read_shape[0]/write_shape[0],
@@ -113,7 +126,7 @@ def _read_decimated(array_transform, src, dest_shape):
         offset = (read[0] + (0 if sy_sx[0] > 0 else read_shape[0]),
                   read[1] + (0 if sy_sx[1] > 0 else read_shape[1]))
         transform = Affine(scale[1], 0, offset[1], 0, scale[0], offset[0])
-        return tmp[::(-1 if sy_sx[0] < 0 else 1), ::(-1 if sy_sx[1] < 0 else 1)], write, transform
+        return tmp[..., ::(-1 if sy_sx[0] < 0 else 1), ::(-1 if sy_sx[1] < 0 else 1)], write, transform
     return None, None, None
 
 
@@ -125,6 +138,218 @@ def _no_fractional_translate(affine, eps=0.01):
     return abs(affine.c % 1.0) < eps and abs(affine.f % 1.0) < eps
 
 
+def _can_read_decimated(src, array_transform, dst_projection, resampling):
+    # if the CRS is the same use decimated reads if possible (NN or 1:1 scaling)
+    return src.crs == dst_projection and _no_scale(array_transform) and (resampling == Resampling.nearest or
+                                                                         _no_fractional_translate(array_transform))
+
+
+def _select_overview(overviews, scale, tolerance):
+    """
+    Pick the coarsest overview decimation factor that is not coarser than `scale`,
+    allowing it to be up to `tolerance` (a fraction of `scale`) coarser.
+
+    Returns 1 (full resolution) if no overview is suitable.
+
+    >>> _select_overview([2, 4, 8], 5.0, 0.1)
+    4
+    >>> _select_overview([2, 4, 8], 7.5, 0.1)
+    8
+    >>> _select_overview([2, 4, 8], 1.5, 0.1)
+    1
+    >>> _select_overview([], 100, 0.1)
+    1
+    """
+    best = 1
+    for factor in overviews:
+        if best < factor <= scale * (1 + tolerance):
+            best = factor
+    return best
+
+
+def _overview_read_plan(src, dest_shape, dst_transform, dst_projection):
+    """
+    Work out how much coarser than `src` the destination is, and the source window it covers.
+
+    :return: (scale, ((row_start, row_end), (col_start, col_end))), or (None, None) if unknown
+    """
+    height, width = dest_shape
+    if src.crs == dst_projection:
+        array_transform = ~src.transform * dst_transform
+        scale = math.sqrt(abs(array_transform.determinant))
+        corners = [array_transform * (x, y) for x in (0, width) for y in (0, height)]
+    else:
+        dst_poly = geometry.polygon_from_transform(width, height, dst_transform, dst_projection)
+        resolution = max(abs(dst_transform.a), abs(dst_transform.e)) * max(width, height) / 16.
+        dst_poly = dst_poly.to_crs(src.crs, resolution=resolution)
+        if not dst_poly.is_valid or dst_poly.is_empty:
+            return None, None
+        scale = math.sqrt(dst_poly.area / abs(src.transform.determinant) / (width * height))
+        bbox = dst_poly.boundingbox
+        corners = [~src.transform * (x, y) for x in (bbox.left, bbox.right) for y in (bbox.bottom, bbox.top)]
+
+    cols, rows = zip(*corners)
+    window = tuple((clamp(int(math.floor(min(coords))), 0, size), clamp(int(math.ceil(max(coords))), 0, size))
+                   for coords, size in ((rows, src.shape[0]), (cols, src.shape[1])))
+    return scale, window
+
+
+def _read_band_from_overview(src, dest, dst_transform, dst_nodata, dst_projection, resampling):
+    """
+    Read a much coarser destination via the source's overviews, instead of from full resolution.
+
+    :return: False if no overview is suitable (and nothing was read)
+    """
+    tolerance = OPTIONS['overview_tolerance']
+    overviews = src.overviews() if tolerance is not None else None
+    if not overviews:
+        return False
+
+    scale, window = _overview_read_plan(src, dest.shape, dst_transform, dst_projection)
+    factor = _select_overview(overviews, scale, tolerance) if scale is not None else 1
+    if factor == 1:
+        return False
+
+    # Align the window to the overview pixel grid, with a pixel of margin for the resampling kernel
+    (row_start, row_end), (col_start, col_end) = window
+    row_start, col_start = (max(0, (start // factor - 1) * factor) for start in (row_start, col_start))
+    row_end, col_end = (min(size, (-(-end // factor) + 1) * factor)
+                        for end, size in ((row_end, src.shape[0]), (col_end, src.shape[1])))
+    if row_end <= row_start or col_end <= col_start:
+        dest.fill(dst_nodata)
+        return True
+
+    out_shape = (-(-(row_end - row_start) // factor), -(-(col_end - col_start) // factor))
+    _LOG.debug('Reading overview 1/%s for a destination %.1f times coarser', factor, scale)
+    tmp = src.read(window=((row_start, row_end), (col_start, col_end)), out_shape=out_shape)
+    tmp_transform = (src.transform *
+                     Affine.translation(col_start, row_start) *
+                     Affine.scale((col_end - col_start) / out_shape[1], (row_end - row_start) / out_shape[0]))
+
+    src_nodata = src.nodata
+    if tmp.dtype == numpy.dtype('int8'):
+        tmp = tmp.view(dtype='uint8')
+        src_nodata = numpy.int8(src_nodata).astype('uint8')
+    rasterio.warp.reproject(tmp,
+                            dest,
+                            src_transform=tmp_transform,
+                            src_crs=str(src.crs),
+                            src_nodata=src_nodata,
+                            dst_transform=dst_transform,
+                            dst_crs=str(dst_projection),
+                            dst_nodata=dst_nodata,
+                            resampling=resampling,
+                            NUM_THREADS=OPTIONS['reproject_threads'])
+    return True
+
+
+def _cached_pixel_mapping(src, dest_shape, dst_transform, dst_projection, resampling):
+    """
+    Where each destination pixel comes from in `src`, if the read can be done without GDAL.
+
+    :rtype: datacube.storage.warp.PixelMapping
+    """
+    if resampling != Resampling.nearest or not OPTIONS['reproject_cache_size']:
+        return None
+    if isinstance(src, NetCDFDataSource):
+        # Its reads are not windowed in the same way as rasterio's
+        return None
+    return PIXEL_MAPPINGS.get(src.crs, src.transform, src.shape, dst_projection, dst_transform, dest_shape)
+
+
+def _read_band_with_mapping(src, dest, mapping, dst_nodata):
+    """
+    Read the source pixels `mapping` says `dest` needs, and put them in place.
+
+    :return: The window of `dest` written to, as a tuple of slices, or None if nothing was written
+    """
+    if mapping.dst_window is None:
+        return None
+    data = src.read(window=mapping.src_window)
+    dest = dest[mapping.dst_window]
+    _copy_valid(dest, mapping.take(data), src.nodata, dst_nodata)
+    if mapping.outside is not None:
+        dest[mapping.outside] = dst_nodata
+    return mapping.dst_window
+
+
+#: Window covering a whole array
+_WHOLE_ARRAY = (slice(None), slice(None))
+
+
+def _copy_valid(dest, data, src_nodata, dst_nodata):
+    """
+    Copy `data` into `dest`, replacing `src_nodata` values with `dst_nodata`.
+    """
+    numpy.copyto(dest, data)
+    same_nodata = src_nodata == dst_nodata or (src_nodata != src_nodata and dst_nodata != dst_nodata)  # or both NaN
+    if not same_nodata:
+        dest[data == src_nodata] = dst_nodata
+
+
+def _read_band(src, dest, dst_transform, dst_nodata, dst_projection, resampling):
+    """
+    Read `src` into `dest`.
+
+    Only the part of `dest` that the source covers is written to (with `dst_nodata` where the source has
+    no data): the rest is left as it was.
+
+    :return: The window of `dest` written to, as a tuple of slices, or None if nothing was written
+    """
+    array_transform = ~src.transform * dst_transform
+    if _can_read_decimated(src, array_transform, dst_projection, resampling):
+        tmp, offset, _ = _read_decimated(array_transform, src, dest.shape)
+        if tmp is None:
+            return None
+        window = (slice(offset[0], offset[0] + tmp.shape[0]), slice(offset[1], offset[1] + tmp.shape[1]))
+        _copy_valid(dest[window], tmp, src.nodata, dst_nodata)
+        return window
+    else:
+        warp_dest, warp_nodata = dest, dst_nodata
+        if dest.dtype == numpy.dtype('int8'):
+            warp_dest = dest.view(dtype='uint8')
+            warp_nodata = dst_nodata.astype('uint8')
+        if _read_band_from_overview(src, warp_dest, dst_transform, warp_nodata, dst_projection, resampling):
+            return _WHOLE_ARRAY
+        mapping = _cached_pixel_mapping(src, dest.shape, dst_transform, dst_projection, resampling)
+        if mapping is not None:
+            return _read_band_with_mapping(src, dest, mapping, dst_nodata)
+        src.reproject(warp_dest,
+                      dst_transform=dst_transform,
+                      dst_crs=str(dst_projection),
+                      dst_nodata=warp_nodata,
+                      resampling=resampling,
+                      NUM_THREADS=OPTIONS['reproject_threads'])
+        return _WHOLE_ARRAY
+
+
+def _fill_outside(dest, window, value):
+    """
+    Fill everything in `dest` outside `window` (a tuple of slices, or None for an empty window) with `value`.
+    """
+    if window is None:
+        dest.fill(value)
+        return
+    rows, cols = (range(*w.indices(size)) for w, size in zip(window, dest.shape))
+    if not rows or not cols:
+        dest.fill(value)
+        return
+    dest[:rows[0]].fill(value)
+    dest[rows[-1] + 1:].fill(value)
+    dest[rows[0]:rows[-1] + 1, :cols[0]].fill(value)
+    dest[rows[0]:rows[-1] + 1, cols[-1] + 1:].fill(value)
+
+
+def _read_source_window(source, dest, dst_transform, dst_nodata, dst_projection, resampling):
+    """
+    Like :func:`read_from_source`, but only writes to the window of `dest` covered by the source.
+
+    :return: The window of `dest` written to, as a tuple of slices, or None if nothing was written
+    """
+    with source.open() as src:
+        return _read_band(src, dest, dst_transform, dst_nodata, dst_projection, resampling)
+
+
 def read_from_source(source, dest, dst_transform, dst_nodata, dst_projection, resampling):
     """
     Read from `source` into `dest`, reprojecting if necessary.
@@ -132,27 +357,67 @@ def read_from_source(source, dest, dst_transform, dst_nodata, dst_projection, re
     :param BaseRasterDataSource source: Data source
     :param numpy.ndarray dest: Data destination
     """
-    with source.open() as src:
-        array_transform = ~src.transform * dst_transform
-        # if the CRS is the same use decimated reads if possible (NN or 1:1 scaling)
-        if src.crs == dst_projection and _no_scale(array_transform) and (resampling == Resampling.nearest or
-                                                                         _no_fractional_translate(array_transform)):
-            dest.fill(dst_nodata)
-            tmp, offset, _ = _read_decimated(array_transform, src, dest.shape)
-            if tmp is None:
-                return
-            dest = dest[offset[0]:offset[0] + tmp.shape[0], offset[1]:offset[1] + tmp.shape[1]]
-            numpy.copyto(dest, tmp, where=(tmp != src.nodata))
-        else:
-            if dest.dtype == numpy.dtype('int8'):
-                dest = dest.view(dtype='uint8')
-                dst_nodata = dst_nodata.astype('uint8')
-            src.reproject(dest,
-                          dst_transform=dst_transform,
-                          dst_crs=str(dst_projection),
-                          dst_nodata=dst_nodata,
-                          resampling=resampling,
-                          NUM_THREADS=OPTIONS['reproject_threads'])
+    window = _read_source_window(source, dest, dst_transform, dst_nodata, dst_projection, resampling)
+    _fill_outside(dest, window, dst_nodata)
+
+
+class _MultiBandReader(object):
+    """
+    Reads several bands of one open file in a single call, presenting them as a 3D array
+    """
+    def __init__(self, bands):
+        self.bands = bands
+        self.shape = bands[0].shape
+
+    def read(self, window=None, out_shape=None):
+        indexes = [band.source.bidx for band in self.bands]
+        if out_shape is not None:
+            out_shape = (len(indexes),) + tuple(out_shape)
+        return self.bands[0].source.ds.read(indexes=indexes, window=window, out_shape=out_shape)
+
+
+def read_bands_from_source(sources, dests, dst_transform, dst_nodatas, dst_projection, resamplings):
+    """
+    Read several bands of the same file into `dests`, reprojecting if necessary.
+
+    The file is only opened once. When no reprojection is required all the bands are read
+    with a single windowed read.
+
+    :param list[BaseRasterDataSource] sources: Data sources, all sharing the same `filename`
+    :param list[numpy.ndarray] dests: Data destination for each source
+    :param dst_nodatas: nodata value of each destination
+    :param resamplings: resampling method of each destination
+    """
+    windows = _read_bands_windows(sources, dests, dst_transform, dst_nodatas, dst_projection, resamplings)
+    for dest, window, dst_nodata in zip(dests, windows, dst_nodatas):
+        _fill_outside(dest, window, dst_nodata)
+
+
+def _read_bands_windows(sources, dests, dst_transform, dst_nodatas, dst_projection, resamplings):
+    """
+    Like :func:`read_bands_from_source`, but only writes to the window of each destination covered by its source.
+
+    :return: The window of each destination written to (see :func:`_read_source_window`)
+    """
+    if len(sources) == 1:
+        return [_read_source_window(sources[0], dests[0], dst_transform, dst_nodatas[0], dst_projection,
+                                    resamplings[0])]
+
+    with open_sources(sources) as bands:
+        decimated = [_can_read_decimated(band, ~band.transform * dst_transform, dst_projection, resampling)
+                     for band, resampling in zip(bands, resamplings)]
+        if not all(isinstance(band, BandDataSource) for band in bands) or not all(decimated):
+            return [_read_band(band, dest, dst_transform, dst_nodata, dst_projection, resampling)
+                    for band, dest, dst_nodata, resampling in zip(bands, dests, dst_nodatas, resamplings)]
+
+        array_transform = ~bands[0].transform * dst_transform
+        tmp, offset, _ = _read_decimated(array_transform, _MultiBandReader(bands), dests[0].shape)
+        if tmp is None:
+            return [None] * len(dests)
+        window = (slice(offset[0], offset[0] + tmp.shape[1]), slice(offset[1], offset[1] + tmp.shape[2]))
+        for band, dest, dst_nodata, band_data in zip(bands, dests, dst_nodatas, tmp):
+            _copy_valid(dest[window], band_data, band.nodata, dst_nodata)
+        return [window] * len(dests)
 
 
 @contextmanager
@@ -168,62 +433,237 @@ def ignore_exceptions_if(ignore_errors):
 
 
 def reproject_and_fuse(sources, destination, dst_transform, dst_projection, dst_nodata,
-                       resampling='nearest', fuse_func=None, skip_broken_datasets=False):
+                       resampling='nearest', fuse_func=None, skip_broken_datasets=False, timings=None):
     """
     Reproject and fuse `sources` into a 2D numpy array `destination`.
 
+    When the `read_threads` option is greater than 1 the sources are read concurrently,
+    see :func:`reproject_and_fuse_many`.
+
     :param List[BaseRasterDataSource] sources: Data sources to open and read from
     :param numpy.ndarray destination: ndarray of appropriate size to read data into
     :type resampling: str
-    :type fuse_func: callable or None
+    :param fuse_func: function, or name of a fuser in :data:`datacube.storage.fusers.FUSERS`
     :param bool skip_broken_datasets: Carry on in the face of adversity and failing reads.
+    :param list timings: If provided, a `SourceReadTime` is appended for every source read
     """
     assert len(destination.shape) == 2
 
-    resampling = _rasterio_resampling_method(resampling)
-
-    def copyto_fuser(dest, src):
-        """
-        :type dest: numpy.ndarray
-        :type src: numpy.ndarray
-        """
-        numpy.copyto(dest, src, where=(dest == dst_nodata))
+    if OPTIONS['read_threads'] > 1 and len(sources) > 1:
+        reproject_and_fuse_many([FuseJob(sources, destination, dst_transform, dst_projection, dst_nodata,
+                                         resampling, fuse_func)],
+                                skip_broken_datasets=skip_broken_datasets, timings=timings)
+        return destination
 
-    fuse_func = fuse_func or copyto_fuser
+    resampling = _rasterio_resampling_method(resampling)
+    fuse_func = get_fuser(fuse_func, dst_nodata)
 
-    destination.fill(dst_nodata)
     if len(sources) == 0:
+        destination.fill(dst_nodata)
         return destination
     elif len(sources) == 1:
-        with ignore_exceptions_if(skip_broken_datasets):
-            read_from_source(sources[0], destination, dst_transform, dst_nodata, dst_projection, resampling)
+        window = _timed_read(sources[0], destination, dst_transform, dst_nodata, dst_projection, resampling,
+                             skip_broken_datasets, timings)
+        _fill_outside(destination, window, dst_nodata)
         return destination
     else:
-        # Muitiple sources, we need to fuse them together into a single array
+        destination.fill(dst_nodata)
+        # Muitiple sources, we need to fuse them together into a single array.
+        # Only the window each source covers is read into the buffer and fused, so the parts of the
+        # buffer that no source covers are never touched.
         buffer_ = numpy.empty(destination.shape, dtype=destination.dtype)
         for source in sources:
-            with ignore_exceptions_if(skip_broken_datasets):
-                read_from_source(source, buffer_, dst_transform, dst_nodata, dst_projection, resampling)
-                fuse_func(destination, buffer_)
+            window = _timed_read(source, buffer_, dst_transform, dst_nodata, dst_projection, resampling,
+                                 skip_broken_datasets, timings)
+            if window is not None:
+                fuse_window(fuse_func, destination, buffer_, window)
 
         return destination
 
 
+#: A single `reproject_and_fuse` call, as accepted by :func:`reproject_and_fuse_many`
+FuseJob = namedtuple('FuseJob', ['sources', 'destination', 'dst_transform', 'dst_projection', 'dst_nodata',
+                                 'resampling', 'fuse_func'])
+
+#: Wall-clock time taken to read a single source
+SourceReadTime = namedtuple('SourceReadTime', ['filename', 'seconds'])
+
+
+def _timed_read(source, dest, dst_transform, dst_nodata, dst_projection, resampling,
+                skip_broken_datasets=False, timings=None):
+    """
+    Call `_read_source_window`, logging and recording how long it took.
+
+    :return: The window of `dest` written to, or None if nothing was read (or the read failed and the
+             failure was ignored)
+    """
+    filename = getattr(source, 'filename', None)
+    start = time.time()
+    window = None
+    with ignore_exceptions_if(skip_broken_datasets):
+        window = _read_source_window(source, dest, dst_transform, dst_nodata, dst_projection, resampling)
+    elapsed = time.time() - start
+
+    _LOG.debug("read %s in %.3fs", filename, elapsed)
+    if timings is not None:
+        timings.append(SourceReadTime(filename, elapsed))
+    return window
+
+
+_READ_POOLS = {}
+_READ_POOLS_LOCK = threading.Lock()
+
+
+def _get_read_pool(threads):
+    """
+    Shared pool of reader threads, one per process and size.
+    """
+    key = (os.getpid(), threads)
+    with _READ_POOLS_LOCK:
+        pool = _READ_POOLS.get(key)
+        if pool is None:
+            pool = _READ_POOLS[key] = ThreadPool(threads)
+    return pool
+
+
+def reproject_and_fuse_many(jobs, skip_broken_datasets=False, timings=None, threads=None):
+    """
+    Run many :func:`reproject_and_fuse` calls, reading all their sources concurrently.
+
+    Every source of every job is read in a pool of `threads` threads (the `read_threads` option by default).
+    Each job's sources are fused into its destination in their original order,
+    so the output is identical to calling `reproject_and_fuse` for each job in turn.
+
+    To bound memory use, only a small number of reads are allowed to run ahead of the one being fused.
+
+    :param list[FuseJob] jobs: jobs to run
+    :param bool skip_broken_datasets: Carry on in the face of adversity and failing reads.
+    :param list timings: If provided, a `SourceReadTime` is appended for every source read
+    :param int threads: number of reader threads
+    """
+    threads = threads or OPTIONS['read_threads']
+    pool = _get_read_pool(threads)
+    max_pending = 2 * threads
+
+    def read(source, dest, job):
+        if dest is None:
+            dest = numpy.empty(job.destination.shape, dtype=job.destination.dtype)
+        local_timings = []
+        window = _timed_read(source, dest, job.dst_transform, job.dst_nodata, job.dst_projection,
+                             _rasterio_resampling_method(job.resampling), skip_broken_datasets, local_timings)
+        return dest, window, local_timings
+
+    def finish(job, fuse_func, future):
+        buffer_, window, read_timings = future.get()
+        if timings is not None:
+            timings.extend(read_timings)
+        if buffer_ is job.destination:
+            _fill_outside(job.destination, window, job.dst_nodata)
+        elif window is not None:
+            fuse_window(fuse_func, job.destination, buffer_, window)
+
+    pending = deque()
+    for job in jobs:
+        assert len(job.destination.shape) == 2
+        fuse_func = get_fuser(job.fuse_func, job.dst_nodata)
+
+        # A lone source can be read straight into the destination
+        direct = len(job.sources) == 1
+        if not direct:
+            job.destination.fill(job.dst_nodata)
+        for source in job.sources:
+            while len(pending) >= max_pending:
+                finish(*pending.popleft())
+            future = pool.apply_async(read, (source, job.destination if direct else None, job))
+            pending.append((job, fuse_func, future))
+
+    while pending:
+        finish(*pending.popleft())
+
+    return [job.destination for job in jobs]
+
+
+def _group_by_filename(sources):
+    """
+    Indexes of `sources` grouped by the file they read from, in order of first appearance.
+    """
+    groups = OrderedDict()
+    for index, source in enumerate(sources):
+        groups.setdefault(getattr(source, 'filename', id(source)), []).append(index)
+    return list(groups.values())
+
+
+def reproject_and_fuse_bands(sources, destinations, dst_transform, dst_projection, dst_nodatas,
+                             resamplings, fuse_func=None, skip_broken_datasets=False):
+    """
+    Reproject and fuse several measurements at once, each into its own 2D numpy array.
+
+    This is equivalent to calling :func:`reproject_and_fuse` once per destination, except that
+    measurements stored in the same file are read together (see :func:`read_bands_from_source`).
+
+    :param sources: For each dataset, a list holding the data source of every destination
+    :type sources: list[list[BaseRasterDataSource]]
+    :param list[numpy.ndarray] destinations: ndarrays of appropriate size to read data into
+    :param dst_nodatas: nodata value of each destination
+    :param list[str] resamplings: resampling method of each destination
+    :param fuse_func: function, or name of a fuser in :data:`datacube.storage.fusers.FUSERS`
+    :param bool skip_broken_datasets: Carry on in the face of adversity and failing reads.
+    """
+    resamplings = [_rasterio_resampling_method(resampling) for resampling in resamplings]
+    fuse_funcs = [get_fuser(fuse_func, dst_nodata) for dst_nodata in dst_nodatas]
+
+    for destination in destinations:
+        assert len(destination.shape) == 2
+
+    if len(sources) == 1:
+        # A lone dataset can be read straight into the destinations, filling the rest with nodata afterwards
+        buffers = destinations
+        direct_windows = [None] * len(destinations)
+    else:
+        for destination, dst_nodata in zip(destinations, dst_nodatas):
+            destination.fill(dst_nodata)
+        buffers = [numpy.empty(destination.shape, dtype=destination.dtype) for destination in destinations]
+
+    for band_sources in sources:
+        for indexes in _group_by_filename(band_sources):
+            with ignore_exceptions_if(skip_broken_datasets):
+                windows = _read_bands_windows([band_sources[i] for i in indexes],
+                                              [buffers[i] for i in indexes],
+                                              dst_transform,
+                                              [dst_nodatas[i] for i in indexes],
+                                              dst_projection,
+                                              [resamplings[i] for i in indexes])
+                for i, window in zip(indexes, windows):
+                    if buffers is destinations:
+                        direct_windows[i] = window
+                    elif window is not None:
+                        fuse_window(fuse_funcs[i], destinations[i], buffers[i], window)
+
+    if buffers is destinations:
+        for destination, window, dst_nodata in zip(destinations, direct_windows, dst_nodatas):
+            _fill_outside(destination, window, dst_nodata)
+
+    return destinations
+
+
 class BandDataSource(object):
     """Wrapper for a rasterio.Band object
 
     :param source: rasterio.Band
     """
-    def __init__(self, source, nodata=None):
+    def __init__(self, source, nodata=None, crs=None):
         self.source = source
         if nodata is None:
             assert self.source.ds.nodatavals[0] is not None
             nodata = self.dtype.type(self.source.ds.nodatavals[0])
         self.nodata = nodata
+        self._crs = crs
 
     @property
     def crs(self):
-        return geometry.CRS(_rasterio_crs_wkt(self.source.ds))
+        if self._crs is None:
+            self._crs = geometry.CRS(_rasterio_crs_wkt(self.source.ds))
+        return self._crs
 
     @property
     def transform(self):
@@ -242,6 +682,11 @@ class BandDataSource(object):
         """
         return self.source.ds.read(indexes=self.source.bidx, window=window, out_shape=out_shape)
 
+    def overviews(self):
+        """Decimation factors of the overviews available for this band
+        """
+        return self.source.ds.overviews(self.source.bidx)
+
     def reproject(self, dest, dst_transform, dst_crs, dst_nodata, resampling, **kwargs):
         return rasterio.warp.reproject(self.source,
                                        dest,
@@ -296,6 +741,9 @@ class NetCDFDataSource(object):
         slab.update(self.slab)
         return data[tuple(slab[d] for d in self.variable.dimensions)]
 
+    def overviews(self):
+        return []
+
     def reproject(self, dest, dst_transform, dst_crs, dst_nodata, resampling, **kwargs):
         dst_poly = geometry.polygon_from_transform(dest.shape[1], dest.shape[0],
                                                    dst_transform, dst_crs).to_crs(self.crs)
@@ -317,6 +765,100 @@ class NetCDFDataSource(object):
                                        **kwargs)
 
 
+def _decimated_indexes(start, size, count):
+    """
+    Indexes of the `count` evenly spaced samples (nearest to each centre) of `size` items from `start`
+
+    >>> _decimated_indexes(10, 8, 4)
+    array([10, 12, 14, 16])
+    """
+    return start + ((numpy.arange(count) + 0.5) * (size / count) - 0.5).round().astype('int')
+
+
+class ZarrDataSource(object):
+    """
+    A band of a variable of a Zarr storage unit, read straight from its chunks (without GDAL)
+
+    Only the chunks covering the window read are decompressed.
+
+    :param zarr.hierarchy.Group group: the open storage unit
+    :param str variable: name of the variable
+    :param float time: for a variable with a time dimension, the time (in seconds since 1970) to read:
+                       the closest one is read
+    :param nodata: defaults to the fill value of the variable
+    """
+    def __init__(self, group, variable, time=None, nodata=None):
+        self.group = group
+        self.variable = group[variable]
+        self.crs = geometry.CRS(group[self.variable.attrs.get('grid_mapping', 'crs')].attrs['crs_wkt'])
+
+        dims = self.variable.attrs['_ARRAY_DIMENSIONS']
+        self._band = ()
+        if len(dims) == 3 and dims[0] == 'time':
+            self._band = (_BandTimes.from_values(group['time'][:]).closest(time) - 1 if time is not None else 0,)
+        if nodata is None:
+            nodata = self.variable.fill_value
+        self.nodata = self.dtype.type(nodata)
+        self._transform = None
+
+    @property
+    def transform(self):
+        if self._transform is None:
+            dims = self.crs.dimensions
+            xres, xoff = data_resolution_and_offset(self.group[dims[1]][:])
+            yres, yoff = data_resolution_and_offset(self.group[dims[0]][:])
+            self._transform = Affine.translation(xoff, yoff) * Affine.scale(xres, yres)
+        return self._transform
+
+    @property
+    def dtype(self):
+        return self.variable.dtype
+
+    @property
+    def shape(self):
+        return self.variable.shape[-2:]
+
+    def read(self, window=None, out_shape=None):
+        """Read data in the native format, returning a native array
+        """
+        if window is None:
+            window = ((0, self.shape[0]), (0, self.shape[1]))
+        (row_start, row_end), (col_start, col_end) = window
+        if out_shape is None or tuple(out_shape) == (row_end - row_start, col_end - col_start):
+            return self.variable[self._band + (slice(row_start, row_end), slice(col_start, col_end))]
+
+        rows = _decimated_indexes(row_start, row_end - row_start, out_shape[0])
+        cols = _decimated_indexes(col_start, col_end - col_start, out_shape[1])
+        return self.variable.get_orthogonal_selection(self._band + (rows, cols))
+
+    def overviews(self):
+        return []
+
+    def reproject(self, dest, dst_transform, dst_crs, dst_nodata, resampling, **kwargs):
+        _, window = _overview_read_plan(self, dest.shape, dst_transform, dst_crs)
+        if window is None:
+            window = ((0, self.shape[0]), (0, self.shape[1]))
+        # A pixel of margin for the resampling kernel
+        (row_start, row_end), (col_start, col_end) = window
+        row_start, col_start = max(0, row_start - 1), max(0, col_start - 1)
+        row_end, col_end = min(self.shape[0], row_end + 1), min(self.shape[1], col_end + 1)
+        if row_end <= row_start or col_end <= col_start:
+            dest.fill(dst_nodata)
+            return
+
+        source = self.read(window=((row_start, row_end), (col_start, col_end)))
+        return rasterio.warp.reproject(source,
+                                       dest,
+                                       src_transform=self.transform * Affine.translation(col_start, row_start),
+                                       src_crs=str(self.crs),
+                                       src_nodata=self.nodata,
+                                       dst_transform=dst_transform,
+                                       dst_crs=str(dst_crs),
+                                       dst_nodata=dst_nodata,
+                                       resampling=resampling,
+                                       **kwargs)
+
+
 class OverrideBandDataSource(object):
     """Wrapper for a rasterio.Band object that overrides nodata, crs and transform
 
@@ -343,6 +885,9 @@ class OverrideBandDataSource(object):
         """
         return self.source.ds.read(indexes=self.source.bidx, window=window, out_shape=out_shape)
 
+    def overviews(self):
+        return self.source.ds.overviews(self.source.bidx)
+
     def reproject(self, dest, dst_transform, dst_crs, dst_nodata, resampling, **kwargs):
         source = self.read()  # TODO: read only the part the we care about
         return rasterio.warp.reproject(source,
@@ -377,37 +922,73 @@ class BaseRasterDataSource(object):
 
     @contextmanager
     def open(self):
-        """Context manager which returns a `BandDataSource`"""
+        """Context manager which returns a `BandDataSource`
+
+        Files are opened through the process wide :data:`datacube.storage.file_cache.FILE_CACHE`,
+        so repeated reads from the same file reuse the open handle and its parsed CRS and transform.
+        """
         try:
             _LOG.debug("opening %s", self.filename)
-            with rasterio.open(self.filename) as src:
-                override = False
-
-                transform = _rasterio_transform(src)
-                if transform.is_identity:
-                    override = True
-                    transform = self.get_transform(src.shape)
-
-                try:
-                    crs = geometry.CRS(_rasterio_crs_wkt(src))
-                except ValueError:
-                    override = True
-                    crs = self.get_crs()
-
-                bandnumber = self.get_bandnumber(src)
-                band = rasterio.band(src, bandnumber)
-                nodata = numpy.dtype(band.dtype).type(src.nodatavals[0] if src.nodatavals[0] is not None
-                                                      else self.nodata)
-
-                if override:
-                    yield OverrideBandDataSource(band, nodata=nodata, crs=crs, transform=transform)
-                else:
-                    yield BandDataSource(band, nodata=nodata)
+            with FILE_CACHE.open(self.filename) as cached:
+                yield self._band_source(cached)
 
         except Exception as e:
             _LOG.error("Error opening source dataset: %s", self.filename)
             raise e
 
+    def _band_source(self, cached):
+        """
+        :param datacube.storage.file_cache.CachedFile cached: the open file
+        :rtype: BandDataSource or OverrideBandDataSource
+        """
+        src = cached.dataset
+        override = False
+
+        transform = cached.memo('transform', _rasterio_transform)
+        if transform.is_identity:
+            override = True
+            transform = self.get_transform(src.shape)
+
+        crs = cached.memo('crs', _rasterio_crs_or_none)
+        if crs is None:
+            override = True
+            crs = self.get_crs()
+
+        bandnumber = self.get_bandnumber(src)
+        band = rasterio.band(src, bandnumber)
+        nodata = numpy.dtype(band.dtype).type(src.nodatavals[0] if src.nodatavals[0] is not None
+                                              else self.nodata)
+
+        if override:
+            return OverrideBandDataSource(band, nodata=nodata, crs=crs, transform=transform)
+        return BandDataSource(band, nodata=nodata, crs=crs)
+
+
+@contextmanager
+def open_sources(sources):
+    """
+    Context manager which opens the file shared by `sources` once, returning a `BandDataSource` for each.
+
+    :param list[BaseRasterDataSource] sources: Data sources, all sharing the same `filename`
+    """
+    filename = sources[0].filename
+    assert all(source.filename == filename for source in sources)
+    try:
+        _LOG.debug("opening %s for %d bands", filename, len(sources))
+        with FILE_CACHE.open(filename) as cached:
+            yield [source._band_source(cached) for source in sources]  # pylint: disable=protected-access
+
+    except Exception as e:
+        _LOG.error("Error opening source dataset: %s", filename)
+        raise e
+
+
+def _rasterio_crs_or_none(src):
+    try:
+        return geometry.CRS(_rasterio_crs_wkt(src))
+    except ValueError:
+        return None
+
 
 class RasterFileDataSource(BaseRasterDataSource):
     def __init__(self, filename, bandnumber, nodata=None, crs=None, transform=None):
@@ -515,37 +1096,136 @@ def _choose_location(dataset):
     return uris[0]
 
 
+class _BandTimes(namedtuple('_BandTimes', ['times', 'bands'])):
+    """
+    Time coordinate of every band of a file, sorted by time
+
+    :param numpy.ndarray times: sorted time values
+    :param numpy.ndarray bands: (1-based) band number of each time
+    """
+
+    @classmethod
+    def from_values(cls, values):
+        values = numpy.asarray(values, dtype='float64')
+        order = numpy.argsort(values, kind='mergesort')
+        return cls(values[order], order + 1)
+
+    def closest(self, value):
+        """
+        Band number whose time is closest to `value`.
+
+        >>> _BandTimes.from_values([30., 10., 20.]).closest(12)
+        2
+        >>> _BandTimes.from_values([30., 10., 20.]).closest(29.)
+        1
+        >>> _BandTimes.from_values([30., 10., 20.]).closest(-5.)
+        2
+        """
+        index = int(numpy.searchsorted(self.times, value))
+        if index == len(self.times) or (index > 0 and value - self.times[index - 1] <= self.times[index] - value):
+            index -= 1
+        return int(self.bands[index])
+
+
+_NETCDF_BAND_TIMES = cachetools.LRUCache(maxsize=1024)
+_NETCDF_BAND_TIMES_LOCK = threading.Lock()
+
+
+def _netcdf_time_values(path, layer):
+    """
+    Time coordinate for each GDAL band of `layer`, straight from the NetCDF `time` variable.
+
+    Returns None if the layer has no time dimension, or other (non-spatial) dimensions.
+    """
+    with netCDF4.Dataset(str(path)) as nco:
+        variable = nco.variables[layer]
+        if 'time' not in variable.dimensions or 'time' not in nco.variables or variable.ndim != 3:
+            return None
+        return numpy.asarray(nco.variables['time'][:])
+
+
+def _gdal_time_values(src):
+    """
+    Time coordinate for each band of `src`, parsed from its GDAL band tags.
+
+    Returns None if the bands have no time tags.
+    """
+    tag_name = GDAL_NETCDF_DIM + 'time'
+    if tag_name not in src.tags(1):  # TODO: support time-less datasets properly
+        return None
+    return [float(src.tags(i)[tag_name]) for i in range(1, src.count + 1)]
+
+
+def _netcdf_band_times(path, layer, src):
+    """
+    Look up (or build and remember) the time to band number mapping of a NetCDF layer.
+
+    :rtype: _BandTimes or None
+    """
+    try:
+        key = (str(path), layer, os.path.getmtime(str(path)))
+    except OSError:
+        key = None
+
+    if key is not None:
+        with _NETCDF_BAND_TIMES_LOCK:
+            if key in _NETCDF_BAND_TIMES:
+                return _NETCDF_BAND_TIMES[key]
+
+    try:
+        values = _netcdf_time_values(path, layer)
+    except (IOError, OSError, KeyError, RuntimeError):
+        values = _gdal_time_values(src)
+
+    if values is not None and len(values) != src.count:
+        values = _gdal_time_values(src)
+
+    band_times = _BandTimes.from_values(values) if values is not None else None
+
+    if key is not None:
+        with _NETCDF_BAND_TIMES_LOCK:
+            _NETCDF_BAND_TIMES[key] = band_times
+    return band_times
+
+
 class DatasetSource(BaseRasterDataSource):
     """Data source for reading from a Datacube Dataset"""
 
     def __init__(self, dataset, measurement_id):
+        from datacube.storage.drivers import driver_for_format  # which imports this module
+
         self._dataset = dataset
         self._measurement = dataset.measurements[measurement_id]
         url = _resolve_url(_choose_location(dataset), self._measurement['path'])
-        filename = _url2rasterio(url, dataset.format, self._measurement.get('layer'))
+        self._driver = driver_for_format(dataset.format)
+        if self._driver is not None and not self._driver.reads_with_gdal:
+            # Each band is read on its own, from where its variable is stored
+            filename = self._driver.band_location(url, self._measurement.get('layer'))
+        else:
+            filename = _url2rasterio(url, dataset.format, self._measurement.get('layer'))
         nodata = dataset.type.measurements[measurement_id].get('nodata')
+        self._url = url
         super(DatasetSource, self).__init__(filename, nodata=nodata)
 
+    def open(self):
+        """Context manager which returns a `BandDataSource`, or the driver's own data source if it
+        doesn't read through GDAL (see :mod:`datacube.storage.drivers`)
+        """
+        if self._driver is None or self._driver.reads_with_gdal:
+            return super(DatasetSource, self).open()
+        return self._driver.open_band(self._url, self._measurement.get('layer'),
+                                      datetime_to_seconds_since_1970(self._dataset.center_time), self.nodata)
+
     def get_bandnumber(self, src):
         if 'netcdf' not in self._dataset.format.lower():
             layer_id = self._measurement.get('layer', 1)
             return layer_id if isinstance(layer_id, integer_types) else 1
 
-        tag_name = GDAL_NETCDF_DIM + 'time'
-        if tag_name not in src.tags(1):  # TODO: support time-less datasets properly
+        band_times = _netcdf_band_times(uri_to_local_path(self._url), self._measurement.get('layer'), src)
+        if band_times is None:
             return 1
 
-        time = self._dataset.center_time
-        sec_since_1970 = datetime_to_seconds_since_1970(time)
-
-        idx = 0
-        dist = float('+inf')
-        for i in range(1, src.count + 1):
-            v = float(src.tags(i)[tag_name])
-            if abs(sec_since_1970 - v) < dist:
-                idx = i
-                dist = abs(sec_since_1970 - v)
-        return idx
+        return band_times.closest(datetime_to_seconds_since_1970(self._dataset.center_time))
 
     def get_transform(self, shape):
         return self._dataset.transform * Affine.scale(1/shape[1], 1/shape[0])
@@ -609,6 +1289,13 @@ def write_dataset_to_netcdf(dataset, filename, global_attributes=None, variable_
 
     Requires a spatial Dataset, with attached coordinates and global crs attribute.
 
+    Variables are written a chunk of their first dimension at a time (see :func:`write_variable_in_slabs`).
+    Variables backed by dask arrays are only computed as they're written, so a lazily loaded dataset can be
+    saved without holding all of it in memory.
+
+    With the `compress_threads` option above 1, zlib-compressed variables are compressed in that many threads
+    (see :mod:`datacube.storage.parallel_compression`).
+
     :param `xarray.Dataset` dataset:
     :param filename: Output filename
     :param global_attributes: Global file attributes. dict of attr_name: attr_value
@@ -628,6 +1315,10 @@ def write_dataset_to_netcdf(dataset, filename, global_attributes=None, variable_
     if not hasattr(dataset, 'crs'):
         raise DatacubeException('Dataset does not contain CRS, cannot write to NetCDF file.')
 
+    threads = OPTIONS['compress_threads']
+    compress_in_parallel = [name for name in dataset.data_vars
+                            if threads > 1 and can_compress_in_parallel(variable_params.get(name, {}))]
+
     nco = create_netcdf_storage_unit(filename,
                                      dataset.crs,
                                      dataset.coords,
@@ -636,7 +1327,189 @@ def write_dataset_to_netcdf(dataset, filename, global_attributes=None, variable_
                                      global_attributes,
                                      netcdfparams)
 
-    for name, variable in dataset.data_vars.items():
-        nco[name][:] = netcdf_writer.netcdfy_data(variable.values)
+    try:
+        for name, variable in dataset.data_vars.items():
+            if name not in compress_in_parallel:
+                write_variable_in_slabs(nco[name], variable.data)
+    finally:
+        nco.close()
+
+    if compress_in_parallel:
+        write_compressed_variables(filename, [(name, dataset[name].data) for name in compress_in_parallel],
+                                   threads)
+
+
+def write_variable_in_slabs(nco_var, data):
+    """
+    Write an array to a NetCDF variable one slab of its first dimension at a time.
+
+    Slabs are whole chunks of the variable along that dimension, so each chunk is only compressed
+    once. Dask arrays are computed a slab at a time, so only one slab needs to be in memory.
+
+    :param netCDF4.Variable nco_var: variable of the same shape as `data`
+    :param data: :class:`numpy.ndarray` or :class:`dask.array.Array`
+    """
+    if data.ndim == 0 or data.shape[0] == 0:
+        nco_var[:] = netcdf_writer.netcdfy_data(numpy.asarray(data))
+        return
+
+    step = _slab_size(nco_var, data)
+    for start in range(0, data.shape[0], step):
+        nco_var[start:start + step] = netcdf_writer.netcdfy_data(numpy.asarray(data[start:start + step]))
+
+
+def _slab_size(nco_var, data):
+    """
+    Length along the first dimension of the slabs to write: a whole number of the variable's chunks,
+    covering at least one chunk of a dask array.
+    """
+    chunking = nco_var.chunking()
+    return _whole_chunks(1 if chunking == 'contiguous' else chunking[0], data)
+
+
+def _whole_chunks(chunk_size, data):
+    """
+    The smallest multiple of `chunk_size` covering a chunk of `data` along its first dimension, if it's
+    a dask array.
+
+    >>> _whole_chunks(3, numpy.zeros(10))
+    3
+    """
+    dask_chunks = getattr(data, 'chunks', None)
+    if dask_chunks:
+        return chunk_size * int(math.ceil(max(dask_chunks[0]) / chunk_size))
+    return chunk_size
+
+
+def create_zarr_storage_unit(path, crs, coordinates, variables, variable_params, global_attributes=None):
+    """
+    Create a Zarr storage unit on disk: a directory, holding a file for each chunk of each variable.
+
+    Variables are created with the same parameters as in :func:`create_netcdf_storage_unit`
+    (see :func:`datacube.storage.zarr_writer.create_variable`).
+
+    :param pathlib.Path path: directory to create
+    :param datacube.utils.geometry.CRS crs: Datacube CRS object defining the spatial projection
+    :param dict coordinates: Dict of named `datacube.model.Coordinate`s to create
+    :param dict variables: Dict of named `datacube.model.Variable`s to create
+    :param dict variable_params:
+        Dict of dicts, with keys matching variable names, of extra parameters for variables
+    :param dict global_attributes: named global attributes to add to the storage unit
+    :return: open zarr group, ready for writing to
+    """
+    path = Path(path)
+    if path.exists():
+        raise RuntimeError('Storage Unit already exists: %s' % path)
+
+    try:
+        path.parent.mkdir(parents=True)
+    except OSError:
+        pass
+
+    _LOG.info('Creating storage unit: %s', path)
+
+    group = zarr_writer.create_zarr(path)
+
+    for name, coord in coordinates.items():
+        zarr_writer.create_coordinate(group, name, coord.values, coord.units)
 
-    nco.close()
+    zarr_writer.create_grid_mapping_variable(group, crs)
+
+    for name, variable in variables.items():
+        set_crs = all(dim in variable.dims for dim in crs.dimensions)
+        zarr_writer.create_variable(group, name, variable, set_crs=set_crs, **variable_params.get(name, {}))
+
+    group.attrs.update(global_attributes or {})
+    return group
+
+
+def write_dataset_to_zarr(dataset, path, global_attributes=None, variable_params=None):
+    """
+    Write a Data Cube style xarray Dataset to a Zarr storage unit.
+
+    Takes the same parameters as :func:`write_dataset_to_netcdf`, and writes the variables a slab of
+    whole chunks at a time in the same way. With the `compress_threads` option above 1, the chunks of
+    each slab are compressed and written by that many threads at once.
+
+    :param `xarray.Dataset` dataset:
+    :param path: directory of the storage unit
+    :param global_attributes: Global attributes. dict of attr_name: attr_value
+    :param variable_params: dict of variable_name: {param_name: param_value, [...]}
+                            Allows setting storage and compression options per variable.
+    """
+    if not dataset.data_vars.keys():
+        raise DatacubeException('Cannot save empty dataset to disk.')
+
+    if not hasattr(dataset, 'crs'):
+        raise DatacubeException('Dataset does not contain CRS, cannot write to Zarr storage unit.')
+
+    group = create_zarr_storage_unit(path,
+                                     dataset.crs,
+                                     dataset.coords,
+                                     dataset.data_vars,
+                                     variable_params or {},
+                                     global_attributes)
+
+    threads = OPTIONS['compress_threads']
+    pool = ThreadPool(threads) if threads > 1 else None
+    try:
+        for name, variable in dataset.data_vars.items():
+            write_zarr_variable(group[name], variable.data, pool)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+def write_zarr_variable(zarr_var, data, pool=None):
+    """
+    Write an array to a Zarr variable one slab of whole chunks of its first dimension at a time, like
+    :func:`write_variable_in_slabs`.
+
+    :param zarr.core.Array zarr_var: variable of the same shape as `data`
+    :param data: :class:`numpy.ndarray` or :class:`dask.array.Array`
+    :param multiprocessing.pool.ThreadPool pool: if given, the chunks of each slab are written in parallel
+    """
+    if data.ndim == 0 or data.shape[0] == 0:
+        zarr_var[...] = zarr_writer.zarrify_data(numpy.asarray(data))
+        return
+
+    chunks = zarr_var.chunks
+    step = _whole_chunks(chunks[0], data)
+    for start in range(0, data.shape[0], step):
+        slab = zarr_writer.zarrify_data(numpy.asarray(data[start:start + step]))
+        if pool is None:
+            zarr_var[start:start + slab.shape[0]] = slab
+            continue
+
+        # Every chunk is stored (and compressed) separately, so they can be written at the same time
+        def write_chunk(offset):
+            chunk = slab[tuple(slice(begin, begin + size) for begin, size in zip(offset, chunks))]
+            target = (start + offset[0],) + offset[1:]
+            zarr_var[tuple(slice(begin, begin + size) for begin, size in zip(target, chunk.shape))] = chunk
+
+        pool.map(write_chunk, chunk_offsets(slab.shape, chunks))
+
+
+def write_zarr_region(path, name, data, offset):
+    """
+    Write `data` into a variable of an existing Zarr storage unit, starting at `offset`.
+
+    Each chunk is stored in its own file, so several workers can write to the same storage unit at once,
+    as long as they write different chunks. The region written must be made of whole chunks (or end at
+    the edge of the variable).
+
+    :param path: directory of the storage unit
+    :param str name: name of the variable
+    :param data: :class:`numpy.ndarray` or :class:`dask.array.Array`
+    :param tuple[int] offset: index of the first value to write, along each dimension
+    :raises ValueError: if the region isn't aligned to the chunks of the variable
+    """
+    zarr_var = zarr_writer.open_zarr(path, mode='r+')[name]
+    for start, size, chunk, length in zip(offset, data.shape, zarr_var.chunks, zarr_var.shape):
+        if start % chunk or (start + size != length and (start + size) % chunk):
+            raise ValueError('Region of %s at %s of shape %s is not aligned to its chunks %s' %
+                             (name, tuple(offset), data.shape, zarr_var.chunks))
+
+    region = tuple(slice(start, start + size) for start, size in zip(offset, data.shape))
+    zarr_var[region] = zarr_writer.zarrify_data(numpy.asarray(data))
@@ -0,0 +1,268 @@
+# coding=utf-8
+"""
+Nearest neighbour reprojection, with a cache of where each destination pixel comes from.
+
+GDAL works out the coordinate transformation for every pixel each time it reprojects, even though a
+load reads many sources on the same grid into the same destination grid (every time slice of a stack,
+every band of a dataset, every chunk of a dask array). For nearest neighbour resampling that mapping
+is all there is to reprojecting, so it is calculated once per pair of grids and kept in a bounded cache
+shared by the whole process. Reads then take the source pixels with a single numpy indexing operation.
+
+Between different CRSs the mapping is calculated exactly on a sparse grid of destination pixels and
+interpolated in between, with the grid refined until the interpolation is within
+:data:`TOLERANCE` source pixels at the points checked, much like GDAL's approximate transformer.
+"""
+from __future__ import absolute_import, division
+
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy
+
+from datacube.config import OPTIONS
+from datacube.utils import geometry
+
+_LOG = logging.getLogger(__name__)
+
+#: Largest acceptable error, in source pixels, of interpolated source coordinates
+TOLERANCE = 0.125
+
+#: Initial spacing, in destination pixels, of the exactly transformed points
+_GRID_STEP = 16
+
+#: Give up (and leave it to GDAL) rather than transform more points than this exactly
+_MAX_EXACT_POINTS = 2 ** 20
+
+#: Points checked along each axis when deciding if the interpolation is good enough
+_CHECK_POINTS = 32
+
+MappingCacheStats = namedtuple('MappingCacheStats', ['hits', 'misses', 'evictions', 'size', 'nbytes'])
+
+
+class PixelMapping(object):
+    """
+    Where the pixels of a destination grid come from in a source grid
+
+    :param tuple dst_window: slices of the destination covered by the source, or None if it covers nothing
+    :param tuple src_window: ((row_start, row_end), (col_start, col_end)) of the source to read
+    :param numpy.ndarray index: for each pixel of `dst_window`, its index into the flattened
+                                `src_window`, or -1 if it falls outside the source
+    """
+
+    def __init__(self, dst_window, src_window, index):
+        self.dst_window = dst_window
+        self.src_window = src_window
+        self.index = index
+        self.outside = None if index is None or index.min() >= 0 else (index < 0)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.index, self.outside) if array is not None)
+
+    def take(self, data):
+        """
+        Destination pixels of `dst_window`, taken from `data` read from `src_window`.
+
+        Pixels outside the source hold arbitrary values, see :attr:`outside`.
+        """
+        return data.ravel().take(self.index, mode='clip')
+
+
+def _grid_points(size, step):
+    points = numpy.arange(0, size, step)
+    if points[-1] != size - 1:
+        points = numpy.append(points, size - 1)
+    return points
+
+
+def _source_pixels(rows, cols, src_crs, src_transform, dst_crs, dst_transform):
+    """
+    Source pixel coordinates of the centres of destination pixels (`rows`, `cols`).
+
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    xs, ys = dst_transform * (cols + 0.5, rows + 0.5)
+    if src_crs != dst_crs:
+        xs, ys = geometry.transform_points(xs, ys, dst_crs, src_crs)
+    src_cols, src_rows = ~src_transform * (xs, ys)
+    return src_rows, src_cols
+
+
+def _interpolation_weights(points, positions):
+    """
+    For each position, the index of the grid point before it and its fractional distance to the next.
+    """
+    if len(points) == 1:
+        return numpy.zeros(len(positions), dtype='intp'), numpy.zeros(len(positions))
+    before = numpy.clip(numpy.searchsorted(points, positions, side='right') - 1, 0, len(points) - 2)
+    fraction = (positions - points[before]) / (points[before + 1] - points[before])
+    return before, fraction
+
+
+def _interpolate(grid, row_points, col_points, rows, cols):
+    """
+    Bilinear interpolation of values known at (`row_points` x `col_points`) to (`rows` x `cols`).
+    """
+    before, fraction = _interpolation_weights(row_points, rows)
+    after = numpy.minimum(before + 1, len(row_points) - 1)
+    grid = grid[before] * (1 - fraction)[:, None] + grid[after] * fraction[:, None]
+
+    before, fraction = _interpolation_weights(col_points, cols)
+    after = numpy.minimum(before + 1, len(col_points) - 1)
+    return grid[:, before] * (1 - fraction) + grid[:, after] * fraction
+
+
+def _check_points(points):
+    middles = (points[:-1] + points[1:]) // 2
+    return middles[::max(1, len(middles) // _CHECK_POINTS)] if len(middles) else points
+
+
+def _approximate_source_pixels(src_crs, src_transform, dst_crs, dst_transform, dst_shape):
+    """
+    Source pixel coordinates of every destination pixel, interpolated from a grid of exactly transformed points.
+
+    :return: rows and columns, or (None, None) if they can't be worked out reliably
+    """
+    height, width = dst_shape
+    step = _GRID_STEP
+    while True:
+        row_points, col_points = _grid_points(height, step), _grid_points(width, step)
+        if len(row_points) * len(col_points) > _MAX_EXACT_POINTS:
+            return None, None
+        grid = _source_pixels(row_points[:, None], col_points[None, :],
+                              src_crs, src_transform, dst_crs, dst_transform)
+        if not all(numpy.isfinite(coords).all() for coords in grid):
+            return None, None
+        if step == 1:
+            return grid
+
+        check_rows, check_cols = _check_points(row_points), _check_points(col_points)
+        exact = _source_pixels(check_rows[:, None], check_cols[None, :],
+                               src_crs, src_transform, dst_crs, dst_transform)
+        if not all(numpy.isfinite(coords).all() for coords in exact):
+            return None, None
+        error = max(abs(_interpolate(coords, row_points, col_points, check_rows, check_cols) - expected).max()
+                    for coords, expected in zip(grid, exact))
+        if error <= TOLERANCE:
+            rows, cols = numpy.arange(height), numpy.arange(width)
+            return tuple(_interpolate(coords, row_points, col_points, rows, cols) for coords in grid)
+        step //= 2
+
+
+def pixel_mapping(src_crs, src_transform, src_shape, dst_crs, dst_transform, dst_shape):
+    """
+    Work out which source pixel each destination pixel takes its value from, with nearest neighbour resampling.
+
+    :param geometry.CRS src_crs:
+    :param affine.Affine src_transform:
+    :param tuple src_shape: (height, width) of the source
+    :param geometry.CRS dst_crs:
+    :param affine.Affine dst_transform:
+    :param tuple dst_shape: (height, width) of the destination
+    :return: The mapping, or None if it can't be calculated accurately enough here
+    :rtype: PixelMapping
+    """
+    if not all(dst_shape):
+        return PixelMapping(None, None, None)
+    if src_crs == dst_crs:
+        rows, cols = numpy.arange(dst_shape[0])[:, None], numpy.arange(dst_shape[1])[None, :]
+        src_rows, src_cols = _source_pixels(rows, cols, src_crs, src_transform, dst_crs, dst_transform)
+    else:
+        src_rows, src_cols = _approximate_source_pixels(src_crs, src_transform, dst_crs, dst_transform, dst_shape)
+        if src_rows is None:
+            _LOG.debug('Unable to map pixels from %s to %s accurately, leaving it to GDAL', src_crs, dst_crs)
+            return None
+
+    # The pixel containing the point, as GDAL does, allowing for rounding errors at pixel edges
+    src_rows = numpy.floor(src_rows + 1e-10)
+    src_cols = numpy.floor(src_cols + 1e-10)
+    inside = (src_rows >= 0) & (src_rows < src_shape[0]) & (src_cols >= 0) & (src_cols < src_shape[1])
+    covered_rows, = numpy.nonzero(inside.any(axis=1))
+    covered_cols, = numpy.nonzero(inside.any(axis=0))
+    if len(covered_rows) == 0:
+        return PixelMapping(None, None, None)
+
+    dst_window = (slice(covered_rows[0], covered_rows[-1] + 1), slice(covered_cols[0], covered_cols[-1] + 1))
+    src_rows, src_cols, inside = src_rows[dst_window], src_cols[dst_window], inside[dst_window]
+    row_start, row_end = int(src_rows[inside].min()), int(src_rows[inside].max()) + 1
+    col_start, col_end = int(src_cols[inside].min()), int(src_cols[inside].max()) + 1
+
+    width = col_end - col_start
+    index = (src_rows - row_start) * width + (src_cols - col_start)
+    index[~inside] = -1
+    dtype = 'int32' if (row_end - row_start) * width < 2 ** 31 else 'int64'
+    return PixelMapping(dst_window, ((row_start, row_end), (col_start, col_end)), index.astype(dtype))
+
+
+class PixelMappingCache(object):
+    """
+    Bounded least-recently-used cache of :class:`PixelMapping`, keyed by the source and destination grids
+
+    The size is read from the `reproject_cache_size` option (see :class:`datacube.set_options`) each
+    time the cache is used, unless given explicitly.
+
+    :param float max_megabytes: maximum total size of the cached mappings, 0 disables caching
+    """
+
+    def __init__(self, max_megabytes=None):
+        self._max_megabytes = max_megabytes
+        self._lock = threading.Lock()
+        self._mappings = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def max_bytes(self):
+        megabytes = OPTIONS['reproject_cache_size'] if self._max_megabytes is None else self._max_megabytes
+        return int((megabytes or 0) * 2 ** 20)
+
+    def get(self, src_crs, src_transform, src_shape, dst_crs, dst_transform, dst_shape):
+        """
+        :func:`pixel_mapping` between the two grids, calculating it only if it isn't already cached.
+
+        :rtype: PixelMapping
+        """
+        key = (str(src_crs), tuple(src_transform)[:6], tuple(src_shape),
+               str(dst_crs), tuple(dst_transform)[:6], tuple(dst_shape))
+        with self._lock:
+            if key in self._mappings:
+                self._hits += 1
+                mapping = self._mappings.pop(key)
+                self._mappings[key] = mapping  # most recently used
+                return mapping
+            self._misses += 1
+
+        mapping = pixel_mapping(src_crs, src_transform, src_shape, dst_crs, dst_transform, dst_shape)
+        nbytes = mapping.nbytes if mapping is not None else 0
+
+        max_bytes = self.max_bytes
+        if nbytes > max_bytes:
+            return mapping
+        with self._lock:
+            if key not in self._mappings:
+                self._mappings[key] = mapping
+                self._nbytes += nbytes
+            while self._nbytes > max_bytes:
+                _, old = self._mappings.popitem(last=False)
+                self._nbytes -= old.nbytes if old is not None else 0
+                self._evictions += 1
+        return mapping
+
+    def stats(self):
+        """
+        :rtype: MappingCacheStats
+        """
+        with self._lock:
+            return MappingCacheStats(self._hits, self._misses, self._evictions, len(self._mappings), self._nbytes)
+
+    def clear(self):
+        with self._lock:
+            self._mappings = OrderedDict()
+            self._nbytes = 0
+
+
+#: Process wide cache used when reading with nearest neighbour resampling
+PIXEL_MAPPINGS = PixelMappingCache()
@@ -0,0 +1,144 @@
+# coding=utf-8
+"""
+Create Zarr storage units (directories with a file per chunk of each variable) and write data to them
+
+The layout follows the NetCDF-CF files written by :mod:`datacube.storage.netcdf_writer`: coordinate
+variables with units, a `crs` grid mapping variable, and the dimensions of each variable in its
+`_ARRAY_DIMENSIONS` attribute (as `xarray.open_zarr` expects).
+
+Requires the optional `zarr` package.
+"""
+from __future__ import absolute_import
+
+import logging
+from datetime import datetime
+
+import numpy
+
+try:
+    import zarr
+    import numcodecs
+except ImportError:
+    zarr = None
+    numcodecs = None
+
+from datacube import __version__
+from datacube.storage.netcdf_writer import netcdfy_coord, _STANDARD_COORDINATES
+
+_LOG = logging.getLogger(__name__)
+
+#: Compression level netCDF4 uses when none is given
+_DEFAULT_COMPLEVEL = 4
+
+
+def create_zarr(zarr_path):
+    """
+    :param str zarr_path: directory to create
+    :rtype: zarr.hierarchy.Group
+    """
+    if zarr is None:
+        raise RuntimeError('Writing Zarr storage units requires the zarr package')
+    group = zarr.open_group(str(zarr_path), mode='w-')
+    group.attrs.update({
+        'date_created': datetime.today().isoformat(),
+        'Conventions': 'CF-1.6, ACDD-1.3',
+        'history': ("Zarr storage unit created by "
+                    "datacube version '{}' at {:%Y%m%d}."
+                    .format(__version__, datetime.utcnow())),
+    })
+    return group
+
+
+def create_coordinate(group, name, labels, units):
+    """
+    :type group: zarr.hierarchy.Group
+    :type name: str
+    :type labels: numpy.array
+    :type units: str
+    :rtype: zarr.core.Array
+    """
+    labels = netcdfy_coord(labels)
+    var = group.create_dataset(name, data=labels, chunks=labels.shape or True)
+    var.attrs.update(_STANDARD_COORDINATES.get(name, {}))
+    var.attrs.update({'units': units, '_ARRAY_DIMENSIONS': [name]})
+    return var
+
+
+def create_variable(group, name, var, set_crs=False, attrs=None, **kwargs):
+    """
+    Create a variable with the same storage parameters as
+    :func:`datacube.storage.netcdf_writer.create_variable`: `chunksizes`, `contiguous`, `zlib`, `complevel`
+    and `shuffle`. There's no checksum filter, so `fletcher32` is ignored.
+
+    :type group: zarr.hierarchy.Group
+    :type var: datacube.model.Variable
+    :rtype: zarr.core.Array
+    """
+    shape = tuple(len(group[dim]) for dim in var.dims)
+    chunks = kwargs.get('chunksizes')
+    if kwargs.get('contiguous') or not shape:
+        chunks = shape or True
+    elif chunks:
+        chunks = tuple(min(chunk, size) if chunk and size else size for chunk, size in zip(chunks, shape))
+    else:
+        chunks = True
+    if kwargs.get('fletcher32'):
+        _LOG.warning('Zarr storage has no checksums, ignoring fletcher32 for %s', name)
+
+    dtype = numpy.dtype(var.dtype)
+    filters = None
+    compressor = None
+    if kwargs.get('zlib'):
+        compressor = numcodecs.Zlib(level=kwargs.get('complevel', _DEFAULT_COMPLEVEL))
+        if kwargs.get('shuffle') and dtype.itemsize > 1:
+            filters = [numcodecs.Shuffle(elementsize=dtype.itemsize)]
+
+    data_var = group.create_dataset(name, shape=shape, chunks=chunks, dtype=dtype,
+                                    fill_value=getattr(var, 'nodata', None),
+                                    compressor=compressor, filters=filters)
+    data_var.attrs['_ARRAY_DIMENSIONS'] = list(var.dims)
+    if set_crs:
+        data_var.attrs['grid_mapping'] = 'crs'
+    if getattr(var, 'units', None):
+        data_var.attrs['units'] = var.units
+    data_var.attrs.update(attrs or {})
+    return data_var
+
+
+def create_grid_mapping_variable(group, crs):
+    """
+    A `crs` variable holding the WKT of `crs`, as in NetCDF-CF files
+
+    :type group: zarr.hierarchy.Group
+    :type crs: datacube.utils.geometry.CRS
+    """
+    crs_var = group.create_dataset('crs', shape=(), dtype='i4')
+    crs_var.attrs.update({
+        '_ARRAY_DIMENSIONS': [],
+        'crs_wkt': crs.wkt,
+        'spatial_ref': crs.wkt,
+        'semi_major_axis': crs.semi_major_axis,
+        'semi_minor_axis': crs.semi_minor_axis,
+        'inverse_flattening': crs.inverse_flattening,
+    })
+    return crs_var
+
+
+def zarrify_data(data):
+    """
+    Data as it's stored: times as seconds since 1970, like NetCDF. Fixed length strings are kept as they are.
+    """
+    if data.dtype.kind == 'M':
+        return netcdfy_coord(data)
+    return data
+
+
+def open_zarr(zarr_path, mode='r'):
+    """
+    :param str zarr_path: directory of an existing storage unit
+    :param str mode: 'r' to read, 'r+' to write to it
+    :rtype: zarr.hierarchy.Group
+    """
+    if zarr is None:
+        raise RuntimeError('Reading Zarr storage units requires the zarr package')
+    return zarr.open_group(str(zarr_path), mode=mode)
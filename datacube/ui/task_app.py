@@ -255,9 +255,8 @@ def check_existing_files(paths):
 
 
 def add_dataset_to_db(index, datasets):
-    for dataset in datasets.values:
-        index.datasets.add(dataset, sources_policy='skip')
-        _LOG.info('Dataset added')
+    index.datasets.add_many(datasets.values, sources_policy='skip')
+    _LOG.info('%d datasets added', len(datasets.values))
 
 
 def do_nothing(result):
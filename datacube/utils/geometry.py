@@ -2,6 +2,7 @@ from __future__ import absolute_import, division
 
 import functools
 import math
+import threading
 from collections import namedtuple, OrderedDict
 
 import cachetools
@@ -66,6 +67,22 @@ def _make_crs(crs_str):
     return crs
 
 
+#: Canonical identities of the CRSs seen so far, so that equal CRSs share one
+_CRS_IDENTITIES = {}
+
+
+@cachetools.cached({})
+def _crs_identity(crs_str):
+    """
+    A canonical identity for a CRS. Strings describing the same CRS get the same object, so CRSs can
+    be compared by identity.
+
+    :rtype: frozenset
+    """
+    identity = frozenset(_make_crs(crs_str).ExportToProj4().split() + ['+wktext'])
+    return _CRS_IDENTITIES.setdefault(identity, identity)
+
+
 class CRS(object):
     """
     Wrapper around `osr.SpatialReference` providing a more pythonic interface
@@ -122,6 +139,7 @@ class CRS(object):
             crs_str = crs_str.crs_str
         self.crs_str = crs_str
         self._crs = _make_crs(crs_str)
+        self._identity = _crs_identity(crs_str)
 
     def __getitem__(self, item):
         return self._crs.GetAttrValue(item)
@@ -219,14 +237,44 @@ class CRS(object):
     def __eq__(self, other):
         if isinstance(other, compat.string_types):
             other = CRS(other)
-        canonical = lambda crs: set(crs.ExportToProj4().split() + ['+wktext'])
-        return canonical(self._crs) == canonical(other._crs)  # pylint: disable=protected-access
+        if not isinstance(other, CRS):
+            return NotImplemented
+        return self._identity is other._identity  # pylint: disable=protected-access
 
     def __ne__(self, other):
-        if isinstance(other, compat.string_types):
-            other = CRS(other)
-        assert isinstance(other, self.__class__)
-        return self._crs.IsSame(other._crs) != 1  # pylint: disable=protected-access
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash(self._identity)
+
+
+#: Number of coordinate transformations kept by each thread
+_TRANSFORM_CACHE_SIZE = 64
+
+_TRANSFORMS = threading.local()
+
+
+def _transformation(src_crs, dst_crs):
+    """
+    A coordinate transformation between two CRSs, reused while it's among the most recently used.
+
+    Transformations aren't safe to share between threads, so each thread keeps its own.
+
+    :type src_crs: CRS
+    :type dst_crs: CRS
+    :rtype: osr.CoordinateTransformation
+    """
+    # pylint: disable=protected-access
+    cache = getattr(_TRANSFORMS, 'cache', None)
+    if cache is None:
+        cache = _TRANSFORMS.cache = cachetools.LRUCache(maxsize=_TRANSFORM_CACHE_SIZE)
+
+    key = (src_crs, dst_crs)
+    transform = cache.get(key)
+    if transform is None:
+        transform = cache[key] = osr.CoordinateTransformation(src_crs._crs, dst_crs._crs)
+    return transform
 
 
 ###################################################
@@ -454,11 +502,11 @@ class Geometry(object):
         if resolution is None:
             resolution = 1 if self.crs.geographic else 100000
 
-        transform = osr.CoordinateTransformation(self.crs._crs, crs._crs)  # pylint: disable=protected-access
+        transform = _transformation(self.crs, crs)
         clone = self._geom.Clone()
 
         if wrapdateline and crs.geographic:
-            rtransform = osr.CoordinateTransformation(crs._crs, self.crs._crs)  # pylint: disable=protected-access
+            rtransform = _transformation(crs, self.crs)
             clone = _chop_along_antimeridian(clone, transform, rtransform)
 
         clone.Segmentize(resolution)
@@ -617,6 +665,29 @@ def polygon_from_transform(width, height, transform, crs):
     return polygon(points, crs=crs)
 
 
+def transform_points(xs, ys, src_crs, dst_crs):
+    """
+    Convert arrays of coordinates from one CRS to another
+
+    Points that can't be converted come back as non-finite values.
+
+    :param numpy.ndarray xs: x coordinates in `src_crs`
+    :param numpy.ndarray ys: y coordinates in `src_crs`, same shape as `xs`
+    :param CRS src_crs:
+    :param CRS dst_crs:
+    :return: x and y coordinates in `dst_crs`, with the same shape as `xs`
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    xs, ys = numpy.broadcast_arrays(numpy.asarray(xs, dtype='float64'), numpy.asarray(ys, dtype='float64'))
+    if src_crs == dst_crs:
+        return xs.copy(), ys.copy()
+
+    transform = _transformation(src_crs, dst_crs)
+    points = transform.TransformPoints(list(zip(xs.ravel().tolist(), ys.ravel().tolist())))
+    points = numpy.array(points, dtype='float64').reshape((-1, 3)) if points else numpy.empty((0, 3))
+    return points[:, 0].reshape(xs.shape), points[:, 1].reshape(xs.shape)
+
+
 ###########################################
 # Multi-geometry operations
 ###########################################
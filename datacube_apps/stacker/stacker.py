@@ -9,11 +9,11 @@ import datetime
 import itertools
 import logging
 import os
+import shutil
 import socket
 from functools import partial
 
 import click
-import dask.array as da
 import dask
 from dateutil import tz
 import pandas as pd
@@ -23,8 +23,7 @@ import datacube
 from datacube.api import Tile
 from datacube.model import Dataset
 from datacube.model.utils import xr_apply, datasets_to_doc
-from datacube.storage import netcdf_writer
-from datacube.storage.storage import create_netcdf_storage_unit
+from datacube.storage.drivers import get_driver
 from datacube.ui import task_app
 from datacube.ui.click import to_pathlib
 
@@ -56,7 +55,9 @@ def get_temp_file(final_output_path):
         tmp_folder.mkdir(parents=True)
     except OSError:
         pass
-    if tmp_path.exists():
+    if tmp_path.is_dir():
+        shutil.rmtree(str(tmp_path))
+    elif tmp_path.exists():
         tmp_path.unlink()
     return tmp_path
 
@@ -139,6 +140,7 @@ def do_stack_task(config, task):
     global_attributes['history'] = get_history_attribute(config, task)
 
     variable_params = config['variable_params']
+    driver = get_driver(config['storage'].get('driver', 'NetCDF CF'))
 
     output_filename = Path(task['output_filename'])
     output_uri = output_filename.absolute().as_uri()
@@ -156,14 +158,10 @@ def do_stack_task(config, task):
     data['dataset'] = datasets_to_doc(unwrapped_datasets)
 
     try:
-        nco = create_netcdf_storage_unit(temp_filename,
-                                         data.crs,
-                                         data.coords,
-                                         data.data_vars,
-                                         variable_params,
-                                         global_attributes)
-        write_data_variables(data.data_vars, nco)
-        nco.close()
+        # Written a time chunk at a time, compressed in parallel if the configuration gives compress_threads
+        with dask.set_options(get=dask.async.get_sync), \
+                datacube.set_options(compress_threads=config.get('compress_threads', 1)):
+            driver.write_dataset(data, temp_filename, global_attributes, variable_params)
 
         temp_filename.rename(output_filename)
 
@@ -174,22 +172,12 @@ def do_stack_task(config, task):
 
     except Exception as e:
         if temp_filename.exists():
-            temp_filename.unlink()
+            driver.remove(temp_filename)
         raise e
 
     return unwrapped_datasets, output_uri
 
 
-def write_data_variables(data_vars, nco):
-    for name, variable in data_vars.items():
-        try:
-            with dask.set_options(get=dask.async.get_sync):
-                da.store(variable.data, nco[name], lock=True)
-        except ValueError:
-            nco[name][:] = netcdf_writer.netcdfy_data(variable.values)
-        nco.sync()
-
-
 def check_identical(data1, data2, output_filename):
     with dask.set_options(get=dask.async.get_sync):
         if not all((data1 == data2).all().values()):
@@ -137,7 +137,9 @@ def index(db):
     """
     :type db: datacube.index.postgres._api.PostgresDb
     """
-    return Index(db)
+    # Tests also change the catalogue through the command line tools, which use their own index.
+    with datacube.set_options(catalogue_refresh_interval=0):
+        yield Index(db)
 
 
 @pytest.fixture
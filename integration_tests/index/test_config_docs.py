@@ -8,6 +8,8 @@ import copy
 
 import pytest
 
+import datacube
+from datacube.index._api import Index
 from datacube.index.postgres._fields import NumericRangeDocField, PgField
 from datacube.model import MetadataType
 from datacube.model import Range, Dataset
@@ -353,6 +355,46 @@ def test_filter_types_by_fields(index, ls5_telem_type):
     assert len(res) == 0
 
 
+def test_catalogue_sees_changes_from_other_indexes(db, index, ls5_telem_doc):
+    """
+    :type index: datacube.index._api.Index
+    """
+    with datacube.set_options(catalogue_refresh_interval=None):
+        assert list(index.products.get_all()) == []
+
+        # Added by another index, so only noticed when it's looked for by name.
+        other_index = Index(db)
+        other_index.products.add_document(ls5_telem_doc)
+        assert list(index.products.get_all()) == []
+        assert index.products.get_by_name(ls5_telem_doc['name']).name == ls5_telem_doc['name']
+        assert [product.name for product in index.products.get_all()] == [ls5_telem_doc['name']]
+
+    updated_doc = copy.deepcopy(ls5_telem_doc)
+    updated_doc['description'] = 'An updated description'
+    other_index.products.update_document(updated_doc)
+    with datacube.set_options(catalogue_refresh_interval=0):
+        assert index.products.get_by_name(ls5_telem_doc['name']).definition['description'] == 'An updated description'
+
+
+def test_catalogue_version_changes_when_updated_in_place(db, index, ls5_telem_doc):
+    """
+    :type index: datacube.index._api.Index
+    """
+    index.products.add_document(ls5_telem_doc)
+    with db.connect() as connection:
+        version = connection.get_catalogue_version()
+
+    updated_doc = copy.deepcopy(ls5_telem_doc)
+    updated_doc['description'] = 'An updated description'
+    index.products.update_document(updated_doc)
+    with db.connect() as connection:
+        assert connection.get_catalogue_version() != version
+        version = connection.get_catalogue_version()
+
+        # Unchanged when nothing is written
+        assert connection.get_catalogue_version() == version
+
+
 def test_filter_types_by_search(index, ls5_telem_type):
     """
     :type ls5_telem_type: datacube.model.DatasetType
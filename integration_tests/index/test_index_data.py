@@ -228,6 +228,34 @@ def test_index_dataset_with_sources(index, default_metadata_type):
         index.datasets.add(child, sources_policy='verify')
 
 
+def test_index_many_datasets_with_sources(index, default_metadata_type):
+    type_ = index.products.add_document(_pseudo_telemetry_dataset_type)
+
+    parent = Dataset(type_, _telemetry_dataset.copy(), None, sources={})
+    children = []
+    for id_ in ('051a003f-5bba-43c7-b5f1-7f1da3ae9cfb', '38d6bbd1-3f0b-4d60-a7b9-3fc7b69ba1a4'):
+        child_doc = _telemetry_dataset.copy()
+        child_doc['lineage'] = {'source_datasets': {'source': _telemetry_dataset}}
+        child_doc['id'] = id_
+        children.append(Dataset(type_, child_doc, uris=['file:///tmp/%s.yaml' % id_], sources={'source': parent}))
+
+    with pytest.raises(MissingRecordError):
+        index.datasets.add_many(children, sources_policy='skip')
+    assert not index.datasets.has(children[0].id)
+
+    assert index.datasets.add_many(children, sources_policy='ensure', batch_size=1) == [True, True]
+    assert index.datasets.get(parent.id)
+    for child in children:
+        assert index.datasets.get(child.id, include_sources=True).sources['source'].id == parent.id
+        assert index.datasets.get_locations(child.id) == child.uris
+
+    # Already indexed: reported per dataset, and new locations are added
+    children[1].uris.append('file:///tmp/elsewhere.yaml')
+    for policy in ('skip', 'ensure', 'verify'):
+        assert index.datasets.add_many(children, sources_policy=policy) == [False, False]
+    assert len(index.datasets.get_locations(children[1].id)) == 2
+
+
 def test_index_dataset_with_location(index, default_metadata_type):
     """
     :type index: datacube.index._api.Index
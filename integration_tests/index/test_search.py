@@ -13,6 +13,7 @@ from decimal import Decimal
 from pathlib import Path
 from uuid import UUID
 
+import numpy
 import pytest
 import yaml
 from click.testing import CliRunner
@@ -28,6 +29,7 @@ from datacube.model import DatasetType
 from datacube.model import MetadataType
 from datacube.model import Range
 from datacube.scripts import dataset as dataset_script
+from datacube.utils import geometry
 
 try:
     from typing import List
@@ -383,6 +385,47 @@ def test_search_dataset_ranges(index, pseudo_ls8_dataset):
     assert len(datasets) == 0
 
 
+def test_search_by_footprint(index, db, pseudo_ls8_type, pseudo_ls8_dataset):
+    """
+    :type index: datacube.index._api.Index
+    :type pseudo_ls8_dataset: datacube.model.Dataset
+    """
+    wgs84 = geometry.CRS('EPSG:4326')
+    diamond = geometry.polygon([(150, -30), (151, -29), (152, -30), (151, -31), (150, -30)], crs=wgs84)
+    id_ = str(uuid.uuid4())
+    with db.connect() as connection:
+        assert connection.insert_dataset(
+            {
+                'id': id_,
+                'product_type': 'pseudo_ls8_data',
+                'platform': {'code': 'LANDSAT_8'},
+                'instrument': {'name': 'OLI_TIRS'},
+                'format': {'name': 'PSEUDOMD'},
+                'lineage': {'source_datasets': {}}
+            },
+            id_,
+            pseudo_ls8_type.id,
+            footprint=diamond
+        )
+
+    def _search(geom):
+        return {dataset.id for dataset in index.datasets.search(product=pseudo_ls8_type.name, footprint=geom)}
+
+    # Datasets without a footprint, like pseudo_ls8_dataset, are always included
+    centre = geometry.box(150.8, -30.2, 151.2, -29.8, crs=wgs84)
+    assert _search(centre) == {UUID(id_), pseudo_ls8_dataset.id}
+    assert _search(centre.to_crs(geometry.CRS('EPSG:3577'))) == {UUID(id_), pseudo_ls8_dataset.id}
+
+    # Inside the bounding box of the footprint, but not the footprint itself
+    assert _search(geometry.box(150, -29.4, 150.4, -29, crs=wgs84)) == {pseudo_ls8_dataset.id}
+
+    # Only for searching: not returned or listed with the other fields
+    summaries = list(index.datasets.search_summaries(product=pseudo_ls8_type.name))
+    assert {row['id'] for row in summaries} == {UUID(id_), pseudo_ls8_dataset.id}
+    assert all('footprint' not in row for row in summaries)
+    assert 'footprint' not in index.datasets.get_field_names(pseudo_ls8_type.name)
+
+
 def test_search_globally(index, pseudo_ls8_dataset):
     """
     :type index: datacube.index._api.Index
@@ -507,6 +550,68 @@ def test_search_returning(index, pseudo_ls8_type, pseudo_ls8_dataset, indexed_ls
     assert document == pseudo_ls8_dataset.metadata_doc
 
 
+def test_search_returning_columnar(index, pseudo_ls8_type, pseudo_ls8_dataset, pseudo_ls8_dataset2):
+    # type: (Index, DatasetType, Dataset, Dataset) -> None
+    results = index.datasets.search_returning_columnar(
+        ('id', 'sat_path', 'sat_row', 'time'),
+        product=pseudo_ls8_type.name,
+    )
+    assert list(results.keys()) == ['id', 'sat_path_begin', 'sat_path_end', 'sat_row_begin', 'sat_row_end',
+                                    'time_begin', 'time_end']
+    assert set(results['id']) == {pseudo_ls8_dataset.id, pseudo_ls8_dataset2.id}
+
+    first = list(results['id']).index(pseudo_ls8_dataset.id)
+    assert results['sat_path_begin'].dtype == numpy.dtype('float64')
+    assert (results['sat_path_begin'][first], results['sat_path_end'][first]) == (116, 116)
+    assert (results['sat_row_begin'][first], results['sat_row_end'][first]) == (74, 84)
+    assert results['time_begin'][first] == numpy.datetime64('2014-07-26T23:48:00.343853')
+    assert results['time_end'][first] == numpy.datetime64('2014-07-26T23:52:00.343853')
+
+    assert index.datasets.search_returning_columnar(('id',), product='no_such_product') == {}
+
+
+def test_search_records(index, pseudo_ls8_type, pseudo_ls8_dataset, pseudo_ls8_dataset2):
+    # type: (Index, DatasetType, Dataset, Dataset) -> None
+    datasets = {dataset.id: dataset for dataset in index.datasets.search(product=pseudo_ls8_type.name)}
+    records = list(index.datasets.search_records(product=pseudo_ls8_type.name))
+    assert {record.id for record in records} == {pseudo_ls8_dataset.id, pseudo_ls8_dataset2.id}
+
+    for record in records:
+        dataset = datasets[record.id]
+        assert record.uris == dataset.uris
+        assert record.center_time == dataset.center_time
+        assert record.format == dataset.format
+        assert record.measurements == dataset.measurements
+        assert record.crs == dataset.crs
+        # The rest of the document is fetched when it's needed
+        assert record.metadata.platform == dataset.metadata.platform
+        assert record.metadata_doc == dataset.metadata_doc
+
+
+def test_search_streams_results(index, db, pseudo_ls8_type, pseudo_ls8_dataset, pseudo_ls8_dataset2,
+                                pseudo_ls8_dataset3, pseudo_ls8_dataset4):
+    """
+    :type index: datacube.index._api.Index
+    :type db: datacube.index.postgres._connections.PostgresDb
+    """
+    expected_ids = {pseudo_ls8_dataset.id, pseudo_ls8_dataset2.id, pseudo_ls8_dataset3.id, pseudo_ls8_dataset4.id}
+
+    for fetch_size in (0, 1, 3):
+        datasets = Index(PostgresDb(db._engine, fetch_size=fetch_size)).datasets
+        assert {dataset.id for dataset in datasets.search(product=pseudo_ls8_type.name)} == expected_ids
+        assert {row.id for row in datasets.search_returning(('id',), product=pseudo_ls8_type.name)} == expected_ids
+        assert {row['id'] for row in datasets.search_summaries(product=pseudo_ls8_type.name)} == expected_ids
+
+        # Each product's results can still be read after the search has finished
+        products = list(datasets.search_by_product(product=pseudo_ls8_type.name))
+        assert {dataset.id for dataset in products[0][1]} == expected_ids
+
+        # Streamed connections can still be used for other queries
+        with datasets._db.connect() as connection:
+            assert len(list(connection.search_datasets([], stream=True))) == 4
+            assert connection.contains_dataset(pseudo_ls8_dataset.id)
+
+
 def test_search_returning_rows(index, pseudo_ls8_type,
                                pseudo_ls8_dataset, pseudo_ls8_dataset2,
                                indexed_ls5_scene_dataset_types):
@@ -755,6 +860,34 @@ def test_get_dataset_with_children(index, ls5_dataset_w_children):
     assert list(level1.sources['satellite_telemetry_data'].sources) == []
 
 
+def test_get_many_datasets_with_children(index, ls5_dataset_w_children, pseudo_ls8_dataset):
+    # type: (Index, Dataset, Dataset) -> None
+    level1 = ls5_dataset_w_children.sources['level1']
+    telemetry = level1.sources['satellite_telemetry_data']
+    missing_id = uuid.uuid4()
+
+    # In the order asked for, leaving out missing ones
+    datasets = index.datasets.get_many([pseudo_ls8_dataset.id, missing_id, str(ls5_dataset_w_children.id)])
+    assert [d.id for d in datasets] == [pseudo_ls8_dataset.id, ls5_dataset_w_children.id]
+    assert all(d.sources is None for d in datasets)
+
+    # Overlapping provenance graphs
+    nbar, level1_again = index.datasets.get_many([ls5_dataset_w_children.id, level1.id], include_sources=True)
+    assert nbar.sources['level1'].id == level1.id
+    assert list(nbar.sources['level1'].sources.keys()) == ['satellite_telemetry_data']
+    assert level1_again.sources['satellite_telemetry_data'].id == telemetry.id
+    assert list(level1_again.sources['satellite_telemetry_data'].sources) == []
+
+    assert index.datasets.get_many([]) == []
+
+    # One generation at a time
+    derived = index.datasets.get_derived_many([telemetry.id, str(level1.id), pseudo_ls8_dataset.id])
+    assert set(derived.keys()) == {telemetry.id, level1.id}
+    assert [d.id for d in derived[telemetry.id]] == [level1.id]
+    assert [d.id for d in derived[level1.id]] == [ls5_dataset_w_children.id]
+    assert [d.id for d in index.datasets.get_derived(telemetry.id)] == [level1.id]
+
+
 def test_count_by_product_searches(index, pseudo_ls8_type, pseudo_ls8_dataset, ls5_telem_type):
     # type: (Index, DatasetType, Dataset, DatasetType) -> None
 
@@ -833,6 +966,30 @@ def test_count_time_groups(index, pseudo_ls8_type, pseudo_ls8_dataset):
     ]
 
 
+def test_count_time_groups_of_all_products(index, pseudo_ls8_type, pseudo_ls8_dataset, ls5_telem_type):
+    # type: (Index, DatasetType, Dataset, DatasetType) -> None
+    timelines = dict(index.datasets.count_by_product_through_time(
+        '1 day',
+        time=Range(
+            datetime.datetime(2014, 7, 25, tzinfo=tz.tzutc()),
+            datetime.datetime(2014, 7, 27, tzinfo=tz.tzutc())
+        )
+    ))
+
+    periods = [
+        Range(datetime.datetime(2014, 7, 25, tzinfo=tz.tzutc()),
+              datetime.datetime(2014, 7, 26, tzinfo=tz.tzutc())),
+        Range(datetime.datetime(2014, 7, 26, tzinfo=tz.tzutc()),
+              datetime.datetime(2014, 7, 27, tzinfo=tz.tzutc())),
+    ]
+    # Products without datasets still have every period
+    assert timelines[ls5_telem_type] == list(zip(periods, [0, 0]))
+    assert timelines[pseudo_ls8_type] == list(zip(periods, [0, 1]))
+
+    assert index.datasets.count(time=periods[1]) == 1
+    assert index.datasets.count(time=periods[0]) == 0
+
+
 @pytest.mark.usefixtures('ga_metadata_type',
                          'indexed_ls5_scene_dataset_types')
 def test_source_filter(global_integration_cli_args, index, example_ls5_dataset_path, ls5_nbar_ingest_config):
@@ -1035,6 +1192,53 @@ def test_cli_missing_info(global_integration_cli_args):
     assert result.output == "{id} missing\n".format(id=id_)
 
 
+def test_cli_invalid_info(global_integration_cli_args):
+    opts = list(global_integration_cli_args)
+    opts.extend(
+        [
+            'dataset', 'info', 'not-a-uuid'
+        ]
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(
+        datacube.scripts.cli_app.cli,
+        opts,
+        catch_exceptions=False
+    )
+
+    assert result.exit_code == 2
+    assert 'not-a-uuid is not a valid dataset id' in result.output
+
+
+@pytest.mark.parametrize('command', ['archive', 'restore'])
+def test_cli_archive_restore_missing(index, global_integration_cli_args, pseudo_ls8_dataset, command):
+    # type: (Index, tuple, Dataset, str) -> None
+    missing_id = str(uuid.uuid4())
+    if command == 'restore':
+        index.datasets.archive([pseudo_ls8_dataset.id])
+
+    opts = list(global_integration_cli_args)
+    opts.extend(
+        [
+            'dataset', command, str(pseudo_ls8_dataset.id), missing_id
+        ]
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(
+        datacube.scripts.cli_app.cli,
+        opts,
+        catch_exceptions=False
+    )
+
+    assert result.exit_code == 1, "Should return exit status when a dataset is missing"
+    assert "{id} missing\n".format(id=missing_id) in result.output
+
+    # The datasets that were found are still processed
+    assert index.datasets.get(pseudo_ls8_dataset.id).is_archived == (command == 'archive')
+
+
 def test_find_duplicates(index, pseudo_ls8_type,
                          pseudo_ls8_dataset, pseudo_ls8_dataset2, pseudo_ls8_dataset3, pseudo_ls8_dataset4,
                          ls5_dataset_w_children):
@@ -6,12 +6,13 @@ from setuptools import setup, find_packages
 tests_require = ['pytest', 'pytest-cov', 'mock', 'pep8', 'pylint==1.6.4', 'hypothesis', 'compliance-checker']
 
 extras_require = {
-    'performance': ['ciso8601', 'bottleneck'],
+    'performance': ['ciso8601', 'bottleneck', 'h5py'],
     'interactive': ['matplotlib', 'fiona'],
     'distributed': ['distributed', 'dask[distributed]'],
     'analytics': ['scipy', 'pyparsing', 'numexpr'],
     'doc': ['Sphinx', 'setuptools'],
     'replicas': ['paramiko', 'sshtunnel', 'tqdm'],
+    'zarr': ['zarr'],
     'test': tests_require,
 }
 # An 'all' option, following ipython naming conventions.
@@ -1,7 +1,13 @@
 from datacube.api.query import GroupBy
 
 from datacube import Datacube
+from datacube.api.core import _make_dask_array, fuse_lazy, _prefetch
+from datacube.utils import geometry
+from affine import Affine
 import datetime
+import mock
+import numpy
+import xarray
 
 
 def test_grouping_datasets():
@@ -50,3 +56,48 @@ def _group_datasets_by_date(datasets):
 
     group_by = GroupBy(dimension, group_func, units, sort_key)
     return Datacube.group_datasets(datasets, group_by)
+
+
+def test_dask_chunks_skip_datasets_outside_them():
+    crs = geometry.CRS('EPSG:3577')
+    geobox = geometry.GeoBox(4, 4, Affine(10.0, 0.0, 0.0, 0.0, -10.0, 40.0), crs)
+    left = mock.MagicMock(id=1, extent=geometry.box(0, 0, 20, 40, crs))
+    everywhere = mock.MagicMock(id=2, extent=None)
+    sources = xarray.DataArray(numpy.empty((2,), dtype=object), dims=['time'])
+    sources.values[0] = (left,)
+    sources.values[1] = (left, everywhere)
+    measurement = {'name': 'blue', 'dtype': 'int16', 'nodata': -999}
+
+    data = _make_dask_array(sources, geobox, measurement, dask_chunks={'time': 1, 'x': 2, 'y': 2})
+    graph = dict(data.dask)
+    name = data.name
+
+    for y in (0, 1):
+        assert graph[(name, 0, y, 0)][0] is fuse_lazy
+        assert graph[(name, 0, y, 0)][1] == (left,)
+        assert graph[(name, 1, y, 1)][1] == (everywhere,)
+        assert (graph[(name, 0, y, 1)][0](*graph[(name, 0, y, 1)][1:]) == -999).all()
+
+    assert (data[0, :, 2:].compute() == -999).all()
+
+
+def test_prefetch_yields_results_in_order():
+    loaded = []
+
+    def load(item):
+        loaded.append(item)
+        return item * 10
+
+    results = _prefetch(load, iter(range(4)))
+    assert next(results) == 0
+    assert list(results) == [10, 20, 30]
+    assert loaded == [0, 1, 2, 3]
+    assert list(_prefetch(load, [])) == []
+
+
+def test_load_data_iter_batches_time_slices():
+    sources = xarray.DataArray(numpy.arange(5), dims=['time'], coords={'time': numpy.arange(5)})
+    with mock.patch('datacube.api.core.Datacube.load_data', side_effect=lambda batch, *args, **kwargs: batch):
+        for prefetch in (True, False):
+            batches = list(Datacube.load_data_iter(sources, 'geobox', [], batch_size=2, prefetch=prefetch))
+            assert [batch.values.tolist() for batch in batches] == [[0, 1], [2, 3], [4]]
@@ -0,0 +1,34 @@
+from __future__ import absolute_import
+
+from mock import MagicMock
+
+from datacube.api._footprints import DatasetFootprints
+from datacube.utils import geometry, intersects
+
+
+def _fake_dataset(extent):
+    dataset = MagicMock()
+    dataset.extent = extent
+    return dataset
+
+
+def test_dataset_footprints():
+    wgs84, albers = geometry.CRS('EPSG:4326'), geometry.CRS('EPSG:3577')
+
+    datasets = [_fake_dataset(geometry.box(149, -36, 150, -35, wgs84)),
+                _fake_dataset(None),
+                _fake_dataset(geometry.box(1500000, -4000000, 1600000, -3900000, albers)),
+                _fake_dataset(geometry.box(140, -30, 141, -29, wgs84)),
+                # Only touches the query
+                _fake_dataset(geometry.box(150.5, -35.5, 151, -35, wgs84)),
+                _fake_dataset(geometry.box(149.5, -35.5, 150, -35.4, geometry.CRS('+init=epsg:4326')))]
+    footprints = DatasetFootprints(datasets)
+
+    query = geometry.box(149.5, -35.9, 150.5, -35.1, wgs84)
+    expected = [dataset for dataset in datasets
+                if dataset.extent is not None and intersects(query.to_crs(dataset.extent.crs), dataset.extent)]
+    assert footprints.intersecting(query) == expected
+    assert list(footprints.intersecting_indexes(query)) == [0, 2, 5]
+
+    assert footprints.intersecting(geometry.box(0, 0, 1, 1, wgs84)) == []
+    assert DatasetFootprints([]).intersecting(query) == []
@@ -163,6 +163,8 @@ class MockDb(object):
     def __init__(self):
         self.dataset = {}
         self.dataset_source = set()
+        self.locations = set()
+        self.batches = []
 
     @contextmanager
     def begin(self):
@@ -178,7 +180,7 @@ class MockDb(object):
     def ensure_dataset_locations(self, *args, **kwargs):
         return
 
-    def insert_dataset(self, metadata_doc, dataset_id, dataset_type_id):
+    def insert_dataset(self, metadata_doc, dataset_id, dataset_type_id, footprint=None):
         # Will we pretend this one was already ingested?
         if dataset_id in self.dataset:
             raise DuplicateRecordError('already ingested')
@@ -190,6 +192,30 @@ class MockDb(object):
     def insert_dataset_source(self, classifier, dataset_id, source_dataset_id):
         self.dataset_source.add((classifier, dataset_id, source_dataset_id))
 
+    def insert_datasets(self, datasets):
+        self.batches.append([dataset['id'] for dataset in datasets])
+        inserted = set()
+        for dataset in datasets:
+            if dataset['id'] not in self.dataset:
+                self.dataset[dataset['id']] = DatasetRecord(dataset['id'], deepcopy(dataset['metadata']),
+                                                            dataset['dataset_type_ref'], None, None, None, None)
+                inserted.add(dataset['id'])
+        return inserted
+
+    def insert_dataset_sources(self, sources):
+        self.dataset_source.update(sources)
+
+    def insert_dataset_locations(self, locations):
+        existing = [location for location in locations if location in self.locations]
+        self.locations.update(locations)
+        return existing
+
+    def datasets_contained(self, dataset_ids):
+        return set(dataset_ids) & set(self.dataset)
+
+    def get_datasets(self, dataset_ids):
+        return [{'id': id_, 'metadata': self.dataset[id_].metadata} for id_ in dataset_ids if id_ in self.dataset]
+
 
 class MockTypesResource(object):
     def __init__(self, type_):
@@ -259,3 +285,52 @@ def test_index_two_levels_already_ingested():
     dataset = datasets.add(_EXAMPLE_NBAR_DATASET)
     assert len(mock_db.dataset) == 3
     assert len(mock_db.dataset_source) == 2
+
+
+def test_index_many_datasets():
+    mock_db = MockDb()
+    datasets = DatasetResource(mock_db, MockTypesResource(_EXAMPLE_DATASET_TYPE))
+    ortho = _EXAMPLE_NBAR_DATASET.sources['ortho']
+
+    assert datasets.add_many([ortho, _EXAMPLE_NBAR_DATASET]) == [True, True]
+    assert len(mock_db.dataset) == 3
+    assert mock_db.dataset_source == {
+        ('ortho', _nbar_uuid, _ortho_uuid),
+        ('satellite_telemetry_data', _ortho_uuid, _telemetry_uuid)
+    }
+    # The telemetry source first, then the requested datasets in one batch
+    assert mock_db.batches == [[_telemetry_uuid], [_ortho_uuid, _nbar_uuid]]
+    assert mock_db.locations == {(id_, 'file://test.zzz') for id_ in (_nbar_uuid, _ortho_uuid, _telemetry_uuid)}
+    # Stored without the embedded source documents, which are left as they were
+    assert mock_db.dataset[_nbar_uuid].metadata['lineage']['source_datasets'] == {}
+    assert _EXAMPLE_NBAR_DATASET.metadata_doc['lineage']['source_datasets']
+
+    # Duplicates are reported per dataset, and checked against what is indexed
+    assert datasets.add_many([_EXAMPLE_NBAR_DATASET, _EXAMPLE_NBAR_DATASET], batch_size=1) == [False, False]
+    assert len(mock_db.dataset) == 3
+
+    ds2 = deepcopy(_EXAMPLE_NBAR_DATASET)
+    ds2.metadata_doc['product_type'] = 'zzzz'
+    with pytest.raises(ValueError):
+        datasets.add_many([ds2])
+
+
+def test_index_many_datasets_sources_policies():
+    for policy, expected_batches in [('skip', [[_nbar_uuid]]),
+                                     ('ensure', [[_nbar_uuid]]),
+                                     ('verify', [[_telemetry_uuid, _ortho_uuid], [_nbar_uuid]])]:
+        mock_db = MockDb()
+        datasets = DatasetResource(mock_db, MockTypesResource(_EXAMPLE_DATASET_TYPE))
+        datasets.add(_EXAMPLE_NBAR_DATASET.sources['ortho'])
+        mock_db.batches = []
+
+        assert datasets.add_many([_EXAMPLE_NBAR_DATASET], sources_policy=policy) == [True]
+        assert mock_db.batches == expected_batches
+
+    mock_db = MockDb()
+    datasets = DatasetResource(mock_db, MockTypesResource(_EXAMPLE_DATASET_TYPE))
+    datasets.add_many([_EXAMPLE_NBAR_DATASET], sources_policy='ensure')
+    assert mock_db.batches == [[_telemetry_uuid, _ortho_uuid], [_nbar_uuid]]
+
+    with pytest.raises(ValueError):
+        datasets.add_many([_EXAMPLE_NBAR_DATASET], sources_policy='nope')
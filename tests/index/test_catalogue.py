@@ -0,0 +1,136 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+from contextlib import contextmanager
+
+from datacube import set_options
+from datacube.index._datasets import MetadataTypeResource, ProductResource
+
+_EO = {'id': 1, 'definition': {'name': 'eo', 'description': 'EO', 'dataset': {'search_fields': {}}}}
+
+
+def _product_row(id_, name):
+    return {'id': id_, 'metadata_type_ref': 1, 'definition': {'name': name,
+                                                              'description': name,
+                                                              'metadata_type': 'eo',
+                                                              'metadata': {'product_type': name}}}
+
+
+class MockDb(object):
+    """Catalogue tables, counting the queries made of them"""
+
+    def __init__(self):
+        self.metadata_types = [_EO]
+        self.products = [_product_row(1, 'ls7_nbar'), _product_row(2, 'ls8_nbar')]
+        self.version = 1
+        self.version_checks = 0
+        self.loads = 0
+        self.in_snapshot = False
+
+    @contextmanager
+    def connect(self):
+        yield self
+
+    @contextmanager
+    def begin(self):
+        yield self
+        self.in_snapshot = False
+
+    def set_repeatable_read(self):
+        self.in_snapshot = True
+
+    def get_dataset_fields(self, search_fields):
+        return {}
+
+    def get_catalogue_version(self):
+        self.version_checks += 1
+        return self.version
+
+    def get_all_metadata_types(self):
+        assert self.in_snapshot
+        self.loads += 1
+        return list(self.metadata_types)
+
+    def get_all_dataset_types(self):
+        assert self.in_snapshot
+        return list(self.products)
+
+    def add_dataset_type(self, name, metadata, metadata_type_id, search_fields, definition, concurrently=True):
+        self.products.append({'id': len(self.products) + 1, 'metadata_type_ref': metadata_type_id,
+                              'definition': definition})
+        self.version += 1
+
+
+def _resources(db):
+    metadata_types = MetadataTypeResource(db)
+    return metadata_types, ProductResource(db, metadata_types)
+
+
+def test_catalogue_is_loaded_once():
+    db = MockDb()
+    metadata_types, products = _resources(db)
+
+    with set_options(catalogue_refresh_interval=None):
+        assert [product.name for product in products.get_all()] == ['ls7_nbar', 'ls8_nbar']
+        assert products.get_by_name('ls8_nbar') is products.get(2)
+        assert products.get(1).metadata_type is metadata_types.get_by_name('eo')
+        assert list(products.get_with_fields(['product_type'])) == []
+        assert [type_.name for type_ in metadata_types.get_all()] == ['eo']
+
+    assert (db.version_checks, db.loads) == (1, 1)
+
+
+def test_catalogue_is_invalidated_by_changes():
+    db = MockDb()
+    metadata_types, products = _resources(db)
+
+    with set_options(catalogue_refresh_interval=None):
+        assert len(list(products.get_all())) == 2
+        products.add_document(_product_row(None, 'ls5_nbar')['definition'])
+        assert [product.name for product in products.get_all()] == ['ls7_nbar', 'ls8_nbar', 'ls5_nbar']
+        assert products.get_by_name('ls5_nbar').id == 3
+
+    assert db.loads == 2
+
+
+def test_catalogue_notices_changes_made_elsewhere():
+    db = MockDb()
+    metadata_types, products = _resources(db)
+
+    with set_options(catalogue_refresh_interval=None):
+        assert len(list(products.get_all())) == 2
+
+        db.products.append(_product_row(3, 'ls5_nbar'))
+        db.version += 1
+        assert len(list(products.get_all())) == 2
+
+        # A product that isn't known yet is looked for in the database before giving up
+        assert products.get_by_name('ls5_nbar').id == 3
+        assert len(list(products.get_all())) == 3
+        assert products.get_by_name('no_such_product') is None
+        assert db.loads == 2
+
+    with set_options(catalogue_refresh_interval=0):
+        db.products.pop()
+        db.version += 1
+        assert len(list(products.get_all())) == 2
+
+        # Unchanged, so only the version is checked
+        assert len(list(products.get_all())) == 2
+        assert db.loads == 3
+
+
+def test_catalogue_notices_products_updated_in_place():
+    db = MockDb()
+    metadata_types, products = _resources(db)
+
+    with set_options(catalogue_refresh_interval=0):
+        db.version = 5
+        assert products.get_by_name('ls8_nbar').definition['description'] == 'ls8_nbar'
+
+        # Same number of products, and a version that's lower (transaction ids wrap around)
+        db.products[1] = _product_row(2, 'ls8_nbar')
+        db.products[1]['definition']['description'] = 'An updated description'
+        db.version = 2
+        assert products.get_by_name('ls8_nbar').definition['description'] == 'An updated description'
+        assert len(list(products.get_all())) == 2
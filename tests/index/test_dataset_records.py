@@ -0,0 +1,147 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+import pickle
+from collections import namedtuple
+from contextlib import contextmanager
+from uuid import UUID
+
+import pytest
+
+from datacube.index._api import _DEFAULT_METADATA_TYPES_PATH
+from datacube.index._datasets import DatasetResource, _partial_doc, _record_offsets
+from datacube.index.postgres._api import get_dataset_fields
+from datacube.model import Dataset, DatasetRecord, DatasetType, MetadataType
+from datacube.utils import read_documents
+
+_EO_DEFINITION = next(doc for _, doc in read_documents(_DEFAULT_METADATA_TYPES_PATH) if doc['name'] == 'eo')
+_EO = MetadataType(_EO_DEFINITION,
+                   dataset_search_fields=get_dataset_fields(_EO_DEFINITION['dataset']['search_fields']))
+_PRODUCT = DatasetType(_EO, {'name': 'ls8_nbar', 'description': '', 'metadata_type': 'eo', 'metadata': {}}, id_=1)
+
+_ID = UUID('f2f12372-8366-11e5-817e-1040f381a756')
+_DOC = {
+    'id': str(_ID),
+    'platform': {'code': 'LANDSAT_8'},
+    'format': {'name': 'GeoTIFF'},
+    'extent': {
+        'from_dt': '2014-01-26T02:05:10',
+        'to_dt': '2014-01-26T02:05:40',
+        'center_dt': '2014-01-26T02:05:25',
+    },
+    'grid_spatial': {
+        'projection': {
+            'spatial_reference': 'EPSG:28350',
+            'geo_ref_points': {
+                'ul': {'y': 7082987.5, 'x': 459012.5},
+                'lr': {'y': 6847987.5, 'x': 692012.5},
+                'ur': {'y': 7082987.5, 'x': 692012.5},
+                'll': {'y': 6847987.5, 'x': 459012.5}
+            },
+        }
+    },
+    'image': {'bands': {'blue': {'path': 'blue.tif', 'layer': 1}}},
+    'lineage': {'source_datasets': {}},
+}
+
+_Row = namedtuple('_Row', ['id', 'dataset_type_ref', 'archived', 'uris'] +
+                 ['document_%d' % i for i in range(len(_record_offsets(_EO)))])
+
+
+def _fetch_doc(id_):
+    assert id_ == _ID
+    return _DOC
+
+
+def _record():
+    offsets = _record_offsets(_EO)
+    values = [_value_at(offset) for offset in offsets]
+    return DatasetRecord(_PRODUCT, _ID, _partial_doc(offsets, values), uris=['file:///tmp/ls8.yaml'],
+                         fetch_doc=_fetch_doc)
+
+
+def _value_at(offset):
+    value = _DOC
+    for key in offset:
+        value = value.get(key)
+        if value is None:
+            return None
+    return value
+
+
+def test_record_offsets():
+    assert _record_offsets(_EO) == [('format', 'name'), ('grid_spatial', 'projection'), ('image', 'bands'),
+                                    ('extent', 'from_dt'), ('extent', 'center_dt'), ('extent', 'to_dt')]
+
+
+def test_partial_doc():
+    assert _partial_doc([('a', 'b'), ('a', 'c'), ('d',)], [1, 2, None]) == {'a': {'b': 1, 'c': 2}}
+
+
+def test_record_matches_dataset():
+    dataset = Dataset(_PRODUCT, _DOC, uris=['file:///tmp/ls8.yaml'])
+    record = _record()
+
+    for name in ('id', 'format', 'measurements', 'center_time', 'time', 'bounds', 'transform', 'crs',
+                 'local_uri', 'local_path', 'is_archived', 'sources'):
+        assert getattr(record, name) == getattr(dataset, name), name
+    assert record.extent.wkt == dataset.extent.wkt
+    assert record == dataset
+    assert hash(record) == hash(dataset)
+
+    # Only the parts needed to load it have been read
+    assert 'platform' not in record._partial_doc
+    assert record._metadata_doc is None
+
+    assert record.metadata.platform == 'LANDSAT_8'
+    assert record.metadata_doc is _DOC
+    assert record.to_dataset().metadata_doc is _DOC
+
+    with pytest.raises(AttributeError):
+        record.sources = {}
+
+
+def test_record_pickles():
+    record = _record()
+    record.extent
+
+    copy = pickle.loads(pickle.dumps(record, pickle.HIGHEST_PROTOCOL))
+    assert copy.id == record.id
+    assert copy.uris == record.uris
+    assert copy.extent.wkt == record.extent.wkt
+    assert copy.metadata_doc == _DOC
+
+
+class MockTypesResource(object):
+    def get(self, id_):
+        return _PRODUCT
+
+    def search_robust(self, **query):
+        yield _PRODUCT, {}
+
+
+class MockDb(object):
+    """One dataset, remembering the offsets asked for"""
+
+    def __init__(self):
+        self.document_offsets = None
+
+    @contextmanager
+    def connect(self):
+        yield self
+
+    def search_dataset_records(self, expressions, document_offsets, stream=False):
+        self.document_offsets = document_offsets
+        values = (_ID, 1, None, ['file:///tmp/ls8.yaml', None]) + tuple(_value_at(offset)
+                                                                       for offset in document_offsets)
+        return [_Row(*values)]
+
+
+def test_search_records():
+    db = MockDb()
+    records = list(DatasetResource(db, MockTypesResource()).search_records(product='ls8_nbar'))
+
+    assert db.document_offsets == _record_offsets(_EO)
+    assert len(records) == 1
+    assert records[0].uris == ['file:///tmp/ls8.yaml']
+    assert records[0].center_time == Dataset(_PRODUCT, _DOC).center_time
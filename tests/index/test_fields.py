@@ -4,10 +4,16 @@ Module
 """
 from __future__ import absolute_import
 
+import numpy
+from sqlalchemy.dialects import postgresql as postgres
+
+from datacube.index.fields import as_expression
+from datacube.index.postgres._api import get_native_fields, _column_array
 from datacube.index.postgres._fields import SimpleDocField, NumericRangeDocField, parse_fields, RangeDocField, \
-    IntDocField
+    IntDocField, FootprintIntersectsExpression, footprint_polygon, columnar_fields
 from datacube.index.postgres.tables import DATASET
 from datacube.model import Range
+from datacube.utils import geometry
 
 
 def _assert_same(obj1, obj2):
@@ -106,3 +112,74 @@ def test_get_range_field():
     assert isinstance(field, RangeDocField)
     extracted = field.extract({'extents': {'geospatial_lat_min': 2, 'geospatial_lat_max': 4}})
     assert extracted == Range(begin=2, end=4)
+
+
+def test_columnar_fields():
+    fields = parse_fields({
+        'platform': {'offset': ['platform', 'code']},
+        'lat': {'type': 'float-range', 'min_offset': [['lat_min']], 'max_offset': [['lat_max']]},
+        'time': {'type': 'datetime-range', 'min_offset': [['time_min']], 'max_offset': [['time_max']]},
+    }, DATASET.c.metadata)
+    fields.update(get_native_fields())
+
+    def columns(name):
+        return [(field.name, dtype) for field, dtype in columnar_fields(fields[name])]
+
+    assert columns('platform') == [('platform', 'object')]
+    assert columns('lat') == [('lat_begin', 'float64'), ('lat_end', 'float64')]
+    assert columns('time') == [('time_begin', 'datetime64[us]'), ('time_end', 'datetime64[us]')]
+    assert columns('dataset_type_id') == [('dataset_type_id', 'int64')]
+
+    # Selected without making a datetime for each value
+    time_begin, _ = columnar_fields(fields['time'])[0]
+    assert str(time_begin.alchemy_expression.compile(dialect=postgres.dialect())).startswith('date_part(')
+
+
+def test_column_array():
+    times = _column_array((1406418480.343853, None), 'datetime64[us]')
+    assert times.dtype == numpy.dtype('datetime64[us]')
+    assert times[0] == numpy.datetime64('2014-07-26T23:48:00.343853')
+    assert numpy.isnat(times[1])
+
+    assert _column_array((1, 2), 'int64').dtype == numpy.dtype('int64')
+    # Missing values
+    ints = _column_array((1, None), 'int64')
+    assert ints.dtype == numpy.dtype('float64') and numpy.isnan(ints[1])
+
+    strings = _column_array(('a', None), 'object')
+    assert strings.dtype == numpy.dtype(object) and list(strings) == ['a', None]
+    assert _column_array((), 'float64').shape == (0,)
+
+
+def test_footprint_expression():
+    field = get_native_fields()['footprint']
+    query = geometry.box(1500000, -4000000, 1600000, -3900000, geometry.CRS('EPSG:3577'))
+
+    expression = as_expression(field, query)
+    assert isinstance(expression, FootprintIntersectsExpression)
+    sql = str(expression.alchemy_expression.compile(dialect=postgres.dialect(),
+                                                    compile_kwargs={"literal_binds": True}))
+    assert sql.startswith('agdc.dataset.footprint IS NULL OR agdc.dataset.footprint && CAST(')
+    assert footprint_polygon(query) in sql
+
+
+def test_footprint_is_search_only():
+    native_fields = get_native_fields()
+    assert native_fields['footprint'].search_only
+    assert not any(field.search_only for name, field in native_fields.items() if name != 'footprint')
+
+
+def test_footprint_polygon():
+    wgs84 = geometry.CRS('EPSG:4326')
+    assert footprint_polygon(None) is None
+    assert footprint_polygon(geometry.box(140, -30, 141, -29, wgs84)) == \
+        '((140.0,-30.0),(140.0,-29.0),(141.0,-29.0),(141.0,-30.0),(140.0,-30.0))'
+
+    # Multiple parts are replaced by their convex hull
+    parts = geometry.multipolygon([[[(140, -30), (140, -29), (141, -29), (140, -30)]],
+                                   [[(142, -30), (142, -29), (143, -29), (142, -30)]]], wgs84)
+    hull = footprint_polygon(parts)
+    assert '(143.0,-29.0)' in hull and '(140.0,-30.0)' in hull
+
+    # Can't be represented in longitude and latitude without wrapping around the antimeridian
+    assert footprint_polygon(geometry.box(-179, -30, 179, -29, wgs84)) is None
@@ -0,0 +1,174 @@
+# coding=utf-8
+from __future__ import absolute_import, division
+
+from collections import namedtuple
+from contextlib import contextmanager
+from uuid import UUID
+
+from datacube import set_options
+from datacube.index._datasets import DatasetResource
+from datacube.index._search_cache import SearchCache, query_key
+from datacube.index.postgres._api import get_dataset_fields
+from datacube.model import Dataset, DatasetType, MetadataType, Range
+
+_EO = MetadataType({'name': 'eo', 'dataset': {'id': ['id'], 'sources': ['lineage', 'source_datasets']}},
+                   dataset_search_fields=get_dataset_fields({}))
+_PRODUCTS = {id_: DatasetType(_EO, {'name': name, 'description': '', 'metadata_type': 'eo', 'metadata': {}}, id_=id_)
+             for id_, name in [(1, 'ls7_nbar'), (2, 'ls8_nbar')]}
+
+_Row = namedtuple('_Row', ['id', 'dataset_type_ref', 'metadata', 'uris', 'added_by', 'added', 'archived'])
+
+
+def _row(product_id, number):
+    id_ = UUID(int=product_id * 1000 + number)
+    return _Row(id_, product_id, {'id': str(id_), 'lineage': {'source_datasets': {}}}, ['file:///%s' % id_],
+                None, None, None)
+
+
+class MockTypesResource(object):
+    def get(self, id_):
+        return _PRODUCTS[id_]
+
+    def get_by_name(self, name):
+        return next(product for product in _PRODUCTS.values() if product.name == name)
+
+    def search_robust(self, **query):
+        for product in _PRODUCTS.values():
+            if query.get('product', product.name) == product.name:
+                yield product, {}
+
+
+class MockDb(object):
+    """Datasets of each product, counting the searches made"""
+
+    def __init__(self):
+        self.rows = {1: [_row(1, 1), _row(1, 2)], 2: [_row(2, 1)]}
+        self.searches = 0
+
+    @contextmanager
+    def connect(self):
+        yield self
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+    def search_datasets(self, expressions, source_exprs=None, select_fields=None, with_source_ids=False,
+                        stream=False):
+        self.searches += 1
+        product_id = next(expr.value for expr in expressions if expr.field.name == 'dataset_type_id')
+        return iter(self.rows[product_id])
+
+    def archive_dataset(self, dataset_id):
+        for product_id, rows in self.rows.items():
+            for row in rows:
+                if row.id == dataset_id:
+                    rows.remove(row)
+                    return product_id
+
+    def remove_location(self, id_, uri):
+        return True
+
+    def insert_dataset(self, metadata_doc, dataset_id, dataset_type_id, footprint=None):
+        self.rows[dataset_type_id].append(_Row(dataset_id, dataset_type_id, metadata_doc, [], None, None, None))
+        return True
+
+    def insert_dataset_source(self, classifier, dataset_id, source_dataset_id):
+        pass
+
+
+def test_search_cache():
+    cache = SearchCache()
+    datasets = [_row(1, 1), _row(1, 2)]
+
+    with set_options(search_cache_size=3, search_cache_ttl=60):
+        assert cache.get('a') is None
+        cache.put('a', [1], datasets, cache.generation)
+        assert cache.get('a') == datasets
+
+        # Too big to fit
+        cache.put('b', [2], [_row(2, n) for n in range(4)], cache.generation)
+        assert cache.get('b') is None
+
+        # The least recently used one makes way
+        cache.put('c', [2], [_row(2, 1)], cache.generation)
+        cache.put('d', [2], [_row(2, 2)], cache.generation)
+        assert cache.get('a') is None
+        assert cache.get('c') is not None
+        assert cache.stats().evictions == 1
+
+        # Results of searches run before an invalidation are out of date
+        generation = cache.generation
+        cache.invalidate(product_ids=[3])
+        cache.put('a', [1], datasets, generation)
+        assert cache.get('a') is None
+
+        cache.invalidate(product_ids=[2])
+        assert cache.get('c') is None
+        assert cache.get('d') is None
+
+        cache.put('a', [1], datasets, cache.generation)
+        cache.invalidate(dataset_ids=[datasets[1].id])
+        assert cache.get('a') is None
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.invalidations, stats.size, stats.datasets) == (2, 7, 3, 0, 0)
+        assert stats.hit_rate == 2 / 9
+
+    with set_options(search_cache_size=3, search_cache_ttl=0):
+        cache.put('a', [1], datasets, cache.generation)
+        assert cache.get('a') is None
+        assert cache.stats().datasets == 0
+
+
+def test_query_key():
+    time = Range(1, 2)
+    assert query_key({'product': 'ls7_nbar', 'time': time}) == query_key({'time': time, 'product': 'ls7_nbar'})
+    assert query_key({'time': time}) != query_key({'time': [1, 2]})
+    assert query_key({'product': {'unhashable'}}) is None
+
+
+def test_dataset_search_is_cached():
+    db = MockDb()
+    datasets = DatasetResource(db, MockTypesResource())
+
+    # Disabled by default
+    assert len(datasets.search_eager()) == 3
+    assert len(datasets.search_eager()) == 3
+    assert db.searches == 4
+
+    with set_options(search_cache_size=10):
+        db.searches = 0
+        assert len(datasets.search_eager(product='ls7_nbar')) == 2
+        assert len(datasets.search_eager(product='ls7_nbar')) == 2
+        assert [d.id for d in datasets.search(product='ls8_nbar')] == [_row(2, 1).id]
+        assert db.searches == 2
+
+        # A search that isn't read to the end isn't cached
+        next(datasets.search())
+        assert len(datasets.search_eager()) == 3
+        assert db.searches == 5
+
+        # Archiving drops the searches that could find datasets of its product
+        datasets.archive([_row(2, 1).id])
+        assert len(datasets.search_eager(product='ls7_nbar')) == 2
+        assert db.searches == 5
+        assert len(datasets.search_eager()) == 2
+        assert datasets.search_eager(product='ls8_nbar') == []
+        assert db.searches == 8
+
+        # Changing locations drops the searches that returned the dataset
+        datasets.remove_location(str(_row(1, 1).id), 'file:///elsewhere')
+        assert len(datasets.search_eager(product='ls7_nbar')) == 2
+        assert db.searches == 9
+
+        # Adding a dataset drops the searches that could find datasets of its product
+        assert len(datasets.search_eager(product='ls8_nbar')) == 0
+        assert db.searches == 9
+        new_row = _row(2, 2)
+        datasets.add(Dataset(_PRODUCTS[2], new_row.metadata, sources={}), sources_policy='skip')
+        assert [d.id for d in datasets.search_eager(product='ls8_nbar')] == [new_row.id]
+        assert db.searches == 10
+
+        stats = datasets.search_cache.stats()
+        assert (stats.hits, stats.misses) == (3, 8)
@@ -0,0 +1,150 @@
+from __future__ import absolute_import
+
+import threading
+
+import pytest
+
+from datacube.storage.file_cache import OpenFileCache
+
+
+class FakeFile(object):
+    def __init__(self, filename):
+        self.filename = filename
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_reuses_open_files():
+    opened = []
+
+    def opener(filename):
+        opened.append(FakeFile(filename))
+        return opened[-1]
+
+    cache = OpenFileCache(opener=opener, max_size=2, idle_timeout=60)
+    for _ in range(3):
+        with cache.open('a.tif') as cached:
+            assert cached.filename == 'a.tif'
+            assert cached.memo('parsed', lambda f: f.filename.upper()) == 'A.TIF'
+
+    assert len(opened) == 1
+    assert not opened[0].closed
+    stats = cache.stats()
+    assert stats.hits == 2
+    assert stats.misses == 1
+    assert stats.idle == 1
+
+
+def test_evicts_least_recently_used():
+    cache = OpenFileCache(opener=FakeFile, max_size=2, idle_timeout=60)
+
+    handles = {}
+    for filename in ('a', 'b', 'a', 'c'):
+        with cache.open(filename) as cached:
+            handles.setdefault(filename, cached.dataset)
+
+    assert handles['b'].closed
+    assert not handles['a'].closed
+    assert not handles['c'].closed
+    assert cache.stats().evictions == 1
+
+    cache.clear()
+    assert handles['a'].closed and handles['c'].closed
+    assert cache.stats().idle == 0
+
+
+def test_concurrent_users_get_separate_handles():
+    cache = OpenFileCache(opener=FakeFile, max_size=4, idle_timeout=60)
+
+    with cache.open('a') as first:
+        with cache.open('a') as second:
+            assert first.dataset is not second.dataset
+
+    assert cache.stats().idle == 2
+
+
+def test_idle_files_are_closed_after_timeout():
+    cache = OpenFileCache(opener=FakeFile, max_size=4, idle_timeout=0)
+
+    with cache.open('a') as cached:
+        old = cached.dataset
+    with cache.open('b'):
+        pass
+
+    assert old.closed
+
+
+def test_disabled_cache_closes_files():
+    cache = OpenFileCache(opener=FakeFile, max_size=0, idle_timeout=60)
+
+    with cache.open('a') as cached:
+        pass
+
+    assert cached.dataset.closed
+    assert cache.stats().idle == 0
+
+
+def test_failed_use_discards_file():
+    cache = OpenFileCache(opener=FakeFile, max_size=4, idle_timeout=60)
+
+    with pytest.raises(ValueError):
+        with cache.open('a') as cached:
+            raise ValueError('broken file')
+
+    assert cached.dataset.closed
+    assert cache.stats().idle == 0
+
+
+def test_thread_safety():
+    cache = OpenFileCache(opener=FakeFile, max_size=3, idle_timeout=60)
+    in_use = set()
+    errors = []
+
+    def worker():
+        for i in range(200):
+            with cache.open(str(i % 5)) as cached:
+                if id(cached.dataset) in in_use:
+                    errors.append(cached.filename)
+                in_use.add(id(cached.dataset))
+                in_use.discard(id(cached.dataset))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    stats = cache.stats()
+    assert stats.hits + stats.misses == 800
+    assert stats.idle <= 3
+
+
+def test_replaced_files_are_reopened(tmpdir):
+    path = tmpdir.join('a.tif')
+    path.write('first')
+    cache = OpenFileCache(opener=FakeFile, max_size=4, idle_timeout=60)
+
+    with cache.open(str(path)) as cached:
+        old = cached.dataset
+        assert cached.memo('size', lambda f: path.size()) == 5
+
+    replacement = tmpdir.join('a.tif.tmp')
+    replacement.write('second version')
+    replacement.rename(path)
+
+    with cache.open(str(path)) as cached:
+        assert cached.dataset is not old
+        assert cached.memo('size', lambda f: path.size()) == 14
+    assert old.closed
+    assert cache.stats().misses == 2
+
+    # Subdatasets are checked by the file they're in
+    with cache.open('NetCDF:%s:B10' % path) as cached:
+        subdataset = cached.dataset
+    path.write('third version, in place')
+    with cache.open('NetCDF:%s:B10' % path) as cached:
+        assert cached.dataset is not subdataset
+    assert subdataset.closed
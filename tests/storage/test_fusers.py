@@ -0,0 +1,83 @@
+from __future__ import absolute_import
+
+import numpy
+import pytest
+
+from datacube.storage.fusers import get_fuser, check_fuser, fuse_window, FUSERS, FirstValidFuser
+
+NAN = float('nan')
+
+
+def _fuse(name, nodata, *arrays):
+    dtype = numpy.asarray(arrays[0]).dtype
+    dest = numpy.full(numpy.shape(arrays[0]), nodata, dtype=dtype)
+    fuse_func = get_fuser(name, nodata)
+    for array in arrays:
+        fuse_func(dest, numpy.asarray(array, dtype=dtype))
+    return dest
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('copy', [1, 5, 3, -1]),
+    ('first_valid', [1, 5, 3, -1]),
+    ('last_valid', [2, 5, 5, -1]),
+    ('min', [1, 5, 3, -1]),
+    ('max', [2, 5, 5, -1]),
+    ('bitwise_and', [1 & 2, 5, 3 & 4 & 5, -1]),
+    ('bitwise_or', [1 | 2, 5, 3 | 4 | 5, -1]),
+    ('nanmean', [2, 5, 4, -1]),
+])
+def test_integer_fusers(name, expected):
+    assert _fuse(name, -1, [1, -1, 3, -1], [2, 5, 4, -1], [-1, -1, 5, -1]).tolist() == expected
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('first_valid', [1., 5., NAN]),
+    ('last_valid', [2., 5., NAN]),
+    ('min', [1., 5., NAN]),
+    ('max', [2., 5., NAN]),
+    ('nanmean', [1.5, 5., NAN]),
+])
+def test_nan_nodata_fusers(name, expected):
+    result = _fuse(name, NAN, [1., NAN, NAN], [2., 5., NAN])
+    numpy.testing.assert_array_equal(result, expected)
+
+
+def test_fusers_reuse_scratch_buffers():
+    fuse_func = get_fuser('max', -1)
+    dest = numpy.full((10, 10), -1, dtype='int16')
+    fuse_func(dest, numpy.ones((10, 10), dtype='int16'))
+    buffers = dict((name, id(array)) for name, array in fuse_func._buffers.items())
+    fuse_func(dest, numpy.full((10, 10), 2, dtype='int16'))
+    assert buffers == dict((name, id(array)) for name, array in fuse_func._buffers.items())
+    assert (dest == 2).all()
+
+
+@pytest.mark.parametrize('name', sorted(FUSERS))
+def test_fusers_reuse_scratch_buffers_between_windows(name):
+    fuse_func = get_fuser(name, -1)
+    dest = numpy.full((10, 10), -1, dtype='int16')
+    fuse_window(fuse_func, dest, numpy.ones((10, 10), dtype='int16'), (slice(0, 6), slice(0, 10)))
+    buffers = dict((name, id(array)) for name, array in fuse_func._buffers.items())
+    fuse_window(fuse_func, dest, numpy.ones((10, 10), dtype='int16'), (slice(4, 10), slice(2, 5)))
+    assert buffers == dict((name, id(array)) for name, array in fuse_func._buffers.items())
+    assert (dest[:6] == 1).all()
+    assert (dest[6:, 2:5] == 1).all()
+    assert (dest[6:, :2] == -1).all()
+
+
+def test_get_fuser():
+    assert isinstance(get_fuser(None, 0), FirstValidFuser)
+
+    def my_fuser(dest, src):
+        pass
+    assert get_fuser(my_fuser, 0) is my_fuser
+
+    check_fuser(None)
+    check_fuser(my_fuser)
+    for name in FUSERS:
+        check_fuser(name)
+    with pytest.raises(ValueError):
+        check_fuser('no_such_fuser')
+    with pytest.raises(ValueError):
+        get_fuser('no_such_fuser', 0)
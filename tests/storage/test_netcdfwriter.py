@@ -3,6 +3,7 @@ from __future__ import print_function, absolute_import
 import netCDF4
 import numpy
 import xarray as xr
+from dask import array as da
 import pytest
 from hypothesis import given
 from hypothesis.strategies import text
@@ -12,7 +13,7 @@ import string
 from datacube.model import Variable
 from datacube.storage.netcdf_writer import create_netcdf, create_coordinate, create_variable, netcdfy_data, \
     create_grid_mapping_variable, flag_mask_meanings
-from datacube.storage.storage import write_dataset_to_netcdf
+from datacube.storage.storage import write_dataset_to_netcdf, write_variable_in_slabs, _slab_size
 from datacube.utils import geometry, DatacubeException, read_strings_from_netcdf
 
 GEO_PROJ = geometry.CRS("""GEOGCS["WGS 84",
@@ -184,6 +185,39 @@ def test_chunksizes(tmpnetcdf_filename):
         assert nco['min_max_chunks'].chunking() == [2, 5]
 
 
+def test_write_variable_in_slabs(tmpnetcdf_filename):
+    nco = create_netcdf(tmpnetcdf_filename)
+    create_coordinate(nco, 'time', numpy.arange(7.0), 'days')
+    create_coordinate(nco, 'x', numpy.arange(4.0), 'm')
+    variable = Variable(numpy.dtype('int16'), -1, ('time', 'x'), None)
+    chunked = create_variable(nco, 'chunked', variable, chunksizes=[3, 4])
+    contiguous = create_variable(nco, 'contiguous', variable)
+    lazy = create_variable(nco, 'lazy', variable, chunksizes=[2, 4])
+
+    data = numpy.arange(28, dtype='int16').reshape((7, 4))
+    computed = []
+
+    def compute_slice(block_id):
+        computed.append(block_id[0])
+        return data[block_id[0]:block_id[0] + 1]
+
+    assert _slab_size(chunked, data) == 3
+    assert _slab_size(contiguous, data) == 1
+    write_variable_in_slabs(chunked, data)
+    write_variable_in_slabs(contiguous, data)
+
+    # One time slice at a time, written two at a time
+    lazy_data = da.map_blocks(compute_slice, chunks=((1,) * 7, (4,)), dtype='int16')
+    assert _slab_size(lazy, lazy_data) == 2
+    write_variable_in_slabs(lazy, lazy_data)
+    nco.close()
+
+    assert sorted(computed) == list(range(7))
+    with netCDF4.Dataset(tmpnetcdf_filename) as nco:
+        for name in ('chunked', 'contiguous', 'lazy'):
+            assert (nco[name][:] == data).all()
+
+
 EXAMPLE_FLAGS_DEF = {
         'band_1_saturated': {
             'bits': 0,
@@ -0,0 +1,70 @@
+from __future__ import absolute_import
+
+import zlib
+
+import netCDF4
+import numpy
+import pytest
+from dask import array as da
+
+from datacube.model import Variable
+from datacube.storage import parallel_compression
+from datacube.storage.netcdf_writer import create_netcdf, create_coordinate, create_variable
+from datacube.storage.parallel_compression import can_compress_in_parallel, write_compressed_variables, \
+    chunk_offsets, _padded_chunk, _compress_chunk
+
+
+def test_can_compress_in_parallel(monkeypatch):
+    monkeypatch.setattr(parallel_compression, 'h5py', object())
+    assert can_compress_in_parallel({'zlib': True, 'complevel': 4, 'chunksizes': [1, 200, 200]})
+    assert can_compress_in_parallel({'zlib': True, 'shuffle': True, 'chunksizes': [1, 200, 200]})
+    assert not can_compress_in_parallel({'zlib': True})
+    assert not can_compress_in_parallel({'chunksizes': [1, 200, 200]})
+    assert not can_compress_in_parallel({'zlib': True, 'chunksizes': [1, 200, 200], 'fletcher32': True})
+    assert not can_compress_in_parallel({'zlib': True, 'chunksizes': [1, 200, 200], 'contiguous': True})
+
+    monkeypatch.setattr(parallel_compression, 'h5py', None)
+    assert not can_compress_in_parallel({'zlib': True, 'chunksizes': [1, 200, 200]})
+
+
+def test_chunks():
+    data = numpy.arange(15, dtype='int16').reshape((3, 5))
+    assert chunk_offsets(data.shape, (2, 4)) == [(0, 0), (0, 4), (2, 0), (2, 4)]
+
+    assert (_padded_chunk(data, (0, 0), (2, 4), -1) == data[:2, :4]).all()
+    assert (_padded_chunk(data, (2, 4), (2, 4), -1) == [[14, -1, -1, -1], [-1, -1, -1, -1]]).all()
+    assert _padded_chunk(data, (2, 4), (2, 4), None)[1, 0] == 0
+
+
+def test_compress_chunk():
+    chunk = numpy.array([[1, 256], [2, 512]], dtype='<i2')
+    assert zlib.decompress(_compress_chunk(chunk, 1, shuffle=False)) == chunk.tobytes()
+    assert zlib.decompress(_compress_chunk(chunk, 1, shuffle=True)) == b'\x01\x00\x02\x00\x00\x01\x00\x02'
+
+    single_bytes = numpy.array([1, 2], dtype='u1')
+    assert zlib.decompress(_compress_chunk(single_bytes, 9, shuffle=True)) == b'\x01\x02'
+
+
+def test_write_compressed_variables(tmpnetcdf_filename):
+    pytest.importorskip('h5py')
+
+    nco = create_netcdf(tmpnetcdf_filename)
+    create_coordinate(nco, 'time', numpy.arange(5.0), 'days')
+    create_coordinate(nco, 'y', numpy.arange(7.0), 'm')
+    create_coordinate(nco, 'x', numpy.arange(9.0), 'm')
+    variable = Variable(numpy.dtype('int16'), -999, ('time', 'y', 'x'), None)
+    create_variable(nco, 'deflated', variable, zlib=True, complevel=4, chunksizes=[2, 4, 4])
+    create_variable(nco, 'shuffled', variable, zlib=True, shuffle=True, complevel=1, chunksizes=[2, 4, 4])
+    create_variable(nco, 'checksummed', variable, zlib=True, fletcher32=True, chunksizes=[2, 4, 4])
+    nco.close()
+
+    data = numpy.arange(5 * 7 * 9, dtype='int16').reshape((5, 7, 9))
+    lazy = da.from_array(data, chunks=(1, 7, 9))
+    write_compressed_variables(tmpnetcdf_filename, [('deflated', data), ('shuffled', lazy),
+                                                    ('checksummed', lazy)], threads=3)
+
+    with netCDF4.Dataset(tmpnetcdf_filename) as nco:
+        for name in ('deflated', 'shuffled', 'checksummed'):
+            nco[name].set_auto_maskandscale(False)
+            assert (nco[name][:] == data).all()
+        assert nco['shuffled'].filters()['shuffle']
@@ -13,6 +13,8 @@ import rasterio.warp
 import datacube
 from datacube.utils import geometry
 from datacube.storage.storage import write_dataset_to_netcdf, reproject_and_fuse, read_from_source, Resampling
+from datacube.storage.storage import reproject_and_fuse_many, FuseJob, RasterFileDataSource
+from datacube.storage.storage import read_bands_from_source, reproject_and_fuse_bands
 from datacube.storage.storage import NetCDFDataSource, OverrideBandDataSource
 
 GEO_PROJ = 'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,298.257223563,AUTHORITY["EPSG","7030"]],' \
@@ -145,6 +147,46 @@ def test_mixed_result_when_first_source_partially_empty():
     assert (output_data == [[1, 1], [2, 2]]).all()
 
 
+def test_concurrent_reads_match_serial_reads():
+    crs = mock.MagicMock()
+    shape = (2, 2)
+    no_data = -1
+
+    values = [[[1, no_data], [no_data, no_data]],
+              [[2, 2], [no_data, no_data]],
+              [[3, 3], [3, no_data]]]
+
+    serial = numpy.full(shape, fill_value=no_data, dtype='int16')
+    reproject_and_fuse([_mock_datasetsource(value, crs=crs, shape=shape) for value in values],
+                       serial, dst_transform=identity, dst_projection=crs, dst_nodata=no_data)
+
+    timings = []
+    concurrent = numpy.full(shape, fill_value=no_data, dtype='int16')
+    with datacube.set_options(read_threads=3):
+        reproject_and_fuse([_mock_datasetsource(value, crs=crs, shape=shape) for value in values],
+                           concurrent, dst_transform=identity, dst_projection=crs, dst_nodata=no_data,
+                           timings=timings)
+
+    assert (serial == [[1, 2], [3, no_data]]).all()
+    assert (concurrent == serial).all()
+    assert len(timings) == len(values)
+    assert all(timing.seconds >= 0 for timing in timings)
+
+
+def test_reproject_and_fuse_many_keeps_jobs_separate():
+    crs = mock.MagicMock()
+    shape = (2, 2)
+    no_data = -1
+
+    jobs = [FuseJob([_mock_datasetsource([[i, i], [i, i]], crs=crs, shape=shape) for i in values],
+                    numpy.empty(shape, dtype='int16'), identity, crs, no_data, 'nearest', None)
+            for values in ([1], [2, 3], [], [4, 5, 6])]
+
+    results = reproject_and_fuse_many(jobs, threads=2)
+
+    assert [result[0, 0] for result in results] == [1, 2, no_data, 4]
+
+
 def _mock_datasetsource(value, crs=None, shape=(2, 2)):
     crs = crs or mock.MagicMock()
     dataset_source = mock.MagicMock()
@@ -424,3 +466,139 @@ def test_read_raster_with_custom_crs_and_transform(example_gdal_path):
         resampling = datacube.storage.storage.RESAMPLING_METHODS['nearest']
         band_data_source.reproject(dest2, dst_transform, dst_crs, dst_nodata, resampling)
         assert (dest1 == dest2).all()
+
+
+def _write_multiband_tiff(filename, data, transform, crs):
+    with rasterio.open(filename, 'w', driver='GTiff', width=data.shape[2], height=data.shape[1],
+                       count=data.shape[0], dtype=data.dtype.name, crs=crs, transform=transform,
+                       nodata=-999) as dst:
+        dst.write(data)
+
+
+def test_read_bands_from_source_matches_single_band_reads(tmpdir):
+    filename = str(tmpdir.join('multiband.tif'))
+    transform = Affine(25.0, 0.0, 1000.0, 0.0, -25.0, 2000.0)
+    data = numpy.arange(3 * 40 * 50, dtype='int16').reshape((3, 40, 50))
+    data[:, :5, :] = -999
+    _write_multiband_tiff(filename, data, transform, 'EPSG:3577')
+    crs = geometry.CRS('EPSG:3577')
+
+    sources = [RasterFileDataSource(filename, bandnumber) for bandnumber in (3, 1, 2)]
+    for dst_transform, dst_shape in [(transform, (40, 50)),
+                                     (transform * Affine.translation(-7, 3), (30, 60)),
+                                     (transform * Affine.translation(10, 10) * Affine.scale(1, -1), (20, 20))]:
+        together = [numpy.zeros(dst_shape, dtype='int32') for _ in sources]
+        read_bands_from_source(sources, together, dst_transform, [numpy.int32(-1)] * 3, crs,
+                               [Resampling.nearest] * 3)
+
+        for source, result in zip(sources, together):
+            expected = numpy.zeros(dst_shape, dtype='int32')
+            read_from_source(source, expected, dst_transform, numpy.int32(-1), crs, Resampling.nearest)
+            assert (result == expected).all()
+
+    destinations = [numpy.empty((40, 50), dtype='int16') for _ in sources]
+    reproject_and_fuse_bands([sources, sources], destinations, transform, crs, [numpy.int16(-999)] * 3,
+                             ['nearest'] * 3)
+    assert (destinations[0] == data[2]).all()
+    assert (destinations[1] == data[0]).all()
+    assert (destinations[2] == data[1]).all()
+
+
+def test_netcdf_band_times_from_time_variable(tmpdir):
+    from datacube.storage.storage import _netcdf_band_times
+
+    path = str(tmpdir / 'stacked.nc')
+    with netCDF4.Dataset(path, 'w') as nco:
+        nco.createDimension('time', 3)
+        nco.createDimension('y', 2)
+        nco.createDimension('x', 2)
+        nco.createVariable('time', 'f8', ('time',))[:] = [300., 100., 200.]
+        nco.createVariable('blue', 'i2', ('time', 'y', 'x'))
+        nco.createVariable('flat', 'i2', ('y', 'x'))
+
+    src = mock.MagicMock(count=3)
+    band_times = _netcdf_band_times(path, 'blue', src)
+    assert band_times.closest(110.) == 2
+    assert band_times.closest(150.) == 2
+    assert band_times.closest(260.) == 1
+    assert band_times.closest(1e9) == 1
+    assert not src.tags.called
+
+    # Cached: the file is not read again
+    with mock.patch('datacube.storage.storage._netcdf_time_values') as time_values:
+        assert _netcdf_band_times(path, 'blue', src) is band_times
+        assert not time_values.called
+
+    src.tags.return_value = {}
+    assert _netcdf_band_times(path, 'flat', src) is None
+
+
+def test_coarse_reads_use_overviews(tmpdir):
+    filename = str(tmpdir.join('overviews.tif'))
+    transform = Affine(25.0, 0.0, 1000.0, 0.0, -25.0, 2000.0)
+    data = numpy.arange(256 * 256, dtype='int32').reshape((1, 256, 256)) % 1000
+    _write_multiband_tiff(filename, data, transform, 'EPSG:3577')
+    with rasterio.open(filename, 'r+') as dst:
+        dst.build_overviews([2, 4, 8], Resampling.nearest)
+    with rasterio.open(filename) as src:
+        overview = src.read(1, out_shape=(32, 32))
+    crs = geometry.CRS('EPSG:3577')
+    source = RasterFileDataSource(filename, 1)
+    dst_transform = transform * Affine.scale(8, 8)
+
+    with mock.patch('datacube.storage.storage.BandDataSource.read', autospec=True,
+                    side_effect=lambda self, window=None, out_shape=None:
+                    self.source.ds.read(indexes=self.source.bidx, window=window, out_shape=out_shape)) as read:
+        dest = numpy.zeros((32, 32), dtype='int32')
+        read_from_source(source, dest, dst_transform, numpy.int32(-1), crs, Resampling.nearest)
+        assert (dest == overview).all()
+        assert read.call_count == 1
+        assert read.call_args[1]['out_shape'][0] <= 32 + 2
+
+        # Disabled: full resolution reprojection, no overview read
+        with datacube.set_options(overview_tolerance=None, reproject_cache_size=0):
+            read_from_source(source, numpy.zeros((32, 32), dtype='int32'), dst_transform, numpy.int32(-1), crs,
+                             Resampling.nearest)
+        assert read.call_count == 1
+
+
+class _ArraySource(object):
+    """Source of a small array at a pixel offset, readable without reprojection"""
+    def __init__(self, data, x, y, crs):
+        self.data = numpy.asarray(data, dtype='int16')
+        self.transform = Affine.translation(x, y)
+        self.crs = crs
+        self.nodata = -1
+        self.shape = self.data.shape
+
+    def read(self, window=None, out_shape=None):
+        return self.data[slice(*window[0]), slice(*window[1])]
+
+    @contextmanager
+    def open(self):
+        yield self
+
+
+def test_partial_sources_only_touch_their_window():
+    crs = mock.MagicMock()
+    data = numpy.arange(16).reshape((4, 4))
+    sources = [_ArraySource(data, 6, 2, crs), _ArraySource(data * 10, 7, 3, crs), _ArraySource(data, 50, 50, crs)]
+    first_only = numpy.full((8, 10), -1, dtype='int16')
+    first_only[2:6, 6:10] = data
+    fused = numpy.full((8, 10), -1, dtype='int16')
+    fused[3:7, 7:10] = (data * 10)[:, :3]
+    fused[2:6, 6:10] = data
+
+    for read_threads in (1, 2):
+        with datacube.set_options(read_threads=read_threads):
+            for count, expected in [(1, first_only), (3, fused)]:
+                destination = numpy.full((8, 10), 99, dtype='int16')
+                reproject_and_fuse(sources[:count], destination, identity, crs, numpy.int16(-1))
+                assert (destination == expected).all()
+
+    # Fusers only see the parts of the buffer that were read into
+    windows = []
+    destination = numpy.empty((8, 10), dtype='int16')
+    reproject_and_fuse(sources, destination, identity, crs, numpy.int16(-1),
+                       fuse_func=lambda dest, src: windows.append(src.shape))
+    assert windows == [(4, 4), (4, 3)]
@@ -0,0 +1,83 @@
+from __future__ import absolute_import, division
+
+import mock
+import numpy
+import rasterio.warp
+from affine import Affine
+
+from datacube.utils import geometry
+from datacube.storage.storage import Resampling
+from datacube.storage.warp import pixel_mapping, PixelMappingCache, PixelMapping, TOLERANCE
+
+
+def _reproject(data, src_crs, src_transform, dst_crs, dst_transform, dst_shape):
+    dest = numpy.full(dst_shape, -1, dtype=data.dtype)
+    mapping = pixel_mapping(src_crs, src_transform, data.shape, dst_crs, dst_transform, dst_shape)
+    if mapping.dst_window is not None:
+        (row_start, row_end), (col_start, col_end) = mapping.src_window
+        values = mapping.take(data[row_start:row_end, col_start:col_end])
+        if mapping.outside is not None:
+            values[mapping.outside] = -1
+        dest[mapping.dst_window] = values
+
+    expected = numpy.full(dst_shape, -1, dtype=data.dtype)
+    rasterio.warp.reproject(data, expected, src_transform=src_transform, src_crs=str(src_crs), src_nodata=-1,
+                            dst_transform=dst_transform, dst_crs=str(dst_crs), dst_nodata=-1,
+                            resampling=Resampling.nearest)
+    return dest, expected
+
+
+def test_pixel_mapping_matches_gdal_in_the_same_crs():
+    crs = geometry.CRS('EPSG:4326')
+    transform = Affine(0.25, 0, 100, 0, -0.25, -30)
+    data = numpy.arange(200 * 300, dtype='int32').reshape((200, 300))
+
+    for dst_transform, dst_shape in [(transform, (200, 300)),
+                                     (transform * Affine.translation(10, -10), (200, 300)),
+                                     (transform * Affine.scale(2, 2) * Affine.translation(-10, 10), (150, 150)),
+                                     (transform * Affine.scale(0.3, 0.3) * Affine.translation(3.3, 5.7), (400, 400)),
+                                     (transform * Affine.translation(1000, 1000), (10, 10))]:
+        dest, expected = _reproject(data, crs, transform, crs, dst_transform, dst_shape)
+        assert (dest == expected).all()
+
+
+def test_pixel_mapping_between_crss_is_within_tolerance():
+    src_crs, dst_crs = geometry.CRS('EPSG:4326'), geometry.CRS('EPSG:3577')
+    src_transform = Affine(0.00025, 0, 149, 0, -0.00025, -35)
+    dst_transform = Affine(25, 0, 1548000, 0, -25, -3950000)
+    data = numpy.arange(1000 * 1000, dtype='int32').reshape((1000, 1000))
+
+    dest, expected = _reproject(data, src_crs, src_transform, dst_crs, dst_transform, (700, 600))
+    assert (dest != -1).any()
+
+    # GDAL approximates the transformation too: only pixels close to the edge of a source pixel may differ
+    rows, cols = numpy.nonzero(dest != expected)
+    xs, ys = dst_transform * (cols + 0.5, rows + 0.5)
+    xs, ys = geometry.transform_points(xs, ys, dst_crs, src_crs)
+    src_cols, src_rows = ~src_transform * (xs, ys)
+    edge_distance = numpy.minimum(abs(src_rows - numpy.round(src_rows)), abs(src_cols - numpy.round(src_cols)))
+    assert (edge_distance <= 2 * TOLERANCE).all()
+
+
+def test_pixel_mapping_cache():
+    def fake_mapping(src_crs, src_transform, src_shape, dst_crs, dst_transform, dst_shape):
+        return PixelMapping((slice(0, 1), slice(0, 1)), ((0, 1), (0, 1)),
+                            numpy.zeros(dst_shape[0] * 2 ** 18, dtype='int32'))
+
+    cache = PixelMappingCache(max_megabytes=2.5)
+    with mock.patch('datacube.storage.warp.pixel_mapping', side_effect=fake_mapping) as calculate:
+        first = cache.get('EPSG:4326', Affine.identity(), (10, 10), 'EPSG:3577', Affine.identity(), (1, 10))
+        assert cache.get('EPSG:4326', Affine.identity(), (10, 10), 'EPSG:3577', Affine.identity(), (1, 10)) is first
+        assert calculate.call_count == 1
+        assert cache.stats() == (1, 1, 0, 1, 2 ** 20)
+
+        # Evicts the least recently used mapping to make room
+        cache.get('EPSG:4326', Affine.identity(), (10, 10), 'EPSG:3577', Affine.identity(), (2, 10))
+        assert cache.stats() == (1, 2, 1, 1, 2 ** 21)
+
+        # Too big to cache at all
+        cache.get('EPSG:4326', Affine.identity(), (10, 10), 'EPSG:3577', Affine.identity(), (3, 10))
+        assert cache.stats() == (1, 3, 1, 1, 2 ** 21)
+
+    cache.clear()
+    assert cache.stats().size == 0
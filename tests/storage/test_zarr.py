@@ -0,0 +1,137 @@
+from __future__ import absolute_import, division
+
+from threading import Thread
+
+import numpy
+import pytest
+import xarray
+from affine import Affine
+
+import datacube
+from datacube.storage.drivers import get_driver, driver_for_format
+from datacube.storage.storage import write_dataset_to_zarr, write_zarr_region, create_zarr_storage_unit
+from datacube.storage.storage import ZarrDataSource, Resampling, read_from_source
+from datacube.utils import geometry
+
+zarr = pytest.importorskip('zarr')
+
+GEO_PROJ = 'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,298.257223563,AUTHORITY["EPSG","7030"]],' \
+           'AUTHORITY["EPSG","6326"]],PRIMEM["Greenwich",0],UNIT["degree",0.0174532925199433],' \
+           'AUTHORITY["EPSG","4326"]]'
+
+TIMES = numpy.array(['2000-01-01', '2000-01-02', '2000-01-03'], dtype='datetime64[ns]')
+AFFINE = Affine.scale(0.1, 0.1) * Affine.translation(20, 30)
+
+
+def _dataset(width=110, height=100):
+    geobox = geometry.GeoBox(width, height, AFFINE, geometry.CRS(GEO_PROJ))
+    dataset = xarray.Dataset(attrs={'extent': geobox.extent, 'crs': geobox.crs})
+    dataset['time'] = ('time', TIMES, {'units': 'seconds since 1970-01-01 00:00:00'})
+    for name, coord in geobox.coordinates.items():
+        dataset[name] = (name, coord.values, {'units': coord.units, 'crs': geobox.crs})
+
+    dataset['B10'] = (('time',) + geobox.dimensions,
+                      numpy.arange(len(TIMES) * width * height, dtype='int16').reshape((len(TIMES),) + geobox.shape),
+                      {'nodata': -1, 'units': '1', 'crs': geobox.crs})
+    return dataset
+
+
+class DriverSource(object):
+    def __init__(self, url, layer, time):
+        self.url = url
+        self.layer = layer
+        self.time = time
+
+    def open(self):
+        return get_driver('zarr').open_band(self.url, self.layer, self.time, None)
+
+
+@pytest.mark.parametrize('threads', [1, 3])
+def test_write_dataset_to_zarr(tmpdir, threads):
+    dataset = _dataset()
+    path = str(tmpdir.join('storage_unit.zarr'))
+
+    with datacube.set_options(compress_threads=threads):
+        write_dataset_to_zarr(dataset, path, global_attributes={'foo': 'bar'},
+                              variable_params={'B10': {'zlib': True, 'shuffle': True, 'chunksizes': [2, 40, 40],
+                                                       'attrs': {'abc': 'xyz'}}})
+
+    group = zarr.open_group(path, mode='r')
+    assert group.attrs['foo'] == 'bar'
+    assert group['B10'].chunks == (2, 40, 40)
+    assert group['B10'].attrs['abc'] == 'xyz'
+    assert group['B10'].attrs['_ARRAY_DIMENSIONS'] == ['time', 'latitude', 'longitude']
+    assert group['B10'].fill_value == -1
+    assert (group['B10'][:] == dataset['B10'].values).all()
+    assert (group['time'][:] == TIMES.astype('<M8[s]').astype('float64')).all()
+
+    with pytest.raises(RuntimeError):
+        write_dataset_to_zarr(dataset, path)
+
+
+def test_zarr_source(tmpdir):
+    dataset = _dataset()
+    path = str(tmpdir.join('storage_unit.zarr'))
+    write_dataset_to_zarr(dataset, path, variable_params={'B10': {'zlib': True, 'chunksizes': [1, 30, 30]}})
+
+    second = TIMES[1].astype('<M8[s]').astype('float64')
+    source = ZarrDataSource(zarr.open_group(path, mode='r'), 'B10', time=second + 60)
+    data = dataset['B10'].values[1]
+    assert source.crs == dataset.crs
+    assert source.transform.almost_equals(AFFINE)
+    assert source.shape == (100, 110)
+    assert source.nodata == -1
+    assert (source.read() == data).all()
+    assert (source.read(window=((10, 20), (30, 45))) == data[10:20, 30:45]).all()
+    assert (source.read(window=((10, 20), (30, 50)), out_shape=(5, 10)) == data[10:20:2, 30:50:2]).all()
+
+    # Through the driver, as for a dataset stored in it
+    dest = numpy.empty((60, 50), dtype='int16')
+    read_from_source(DriverSource('file://' + path, 'B10', second), dest, AFFINE * Affine.translation(10, 10),
+                     -1, source.crs, Resampling.nearest)
+    assert (dest == data[10:70, 10:60]).all()
+
+    source.reproject(dest, AFFINE * Affine.translation(-10, -10), source.crs, -1, Resampling.nearest)
+    assert (dest[10:, 10:] == data[:50, :40]).all()
+    assert (dest[:10, :] == -1).all()
+
+
+def test_write_zarr_region(tmpdir):
+    dataset = _dataset(width=100)
+    path = str(tmpdir.join('storage_unit.zarr'))
+    create_zarr_storage_unit(path, dataset.crs, dataset.coords, dataset.data_vars,
+                             {'B10': {'zlib': True, 'chunksizes': [1, 30, 50]}})
+
+    # Each worker writes its own chunks
+    data = dataset['B10'].values
+    regions = [(time, row, col) for time in range(3) for row in range(0, 100, 30) for col in (0, 50)]
+    workers = [Thread(target=write_zarr_region,
+                      args=(path, 'B10', data[time:time + 1, row:row + 30, col:col + 50], (time, row, col)))
+               for time, row, col in regions]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert (zarr.open_group(path, mode='r')['B10'][:] == data).all()
+
+    with pytest.raises(ValueError):
+        write_zarr_region(path, 'B10', data[:1, :30, :30], (0, 0, 0))
+    with pytest.raises(ValueError):
+        write_zarr_region(path, 'B10', data[:1, :30, :50], (0, 10, 0))
+
+
+def test_drivers():
+    assert get_driver('NetCDF CF') is get_driver('netcdf')
+    assert get_driver('NetCDF CF').format == 'NetCDF'
+    assert get_driver('NetCDF CF').reads_with_gdal
+    assert get_driver('zarr').format == 'zarr'
+    assert not driver_for_format('Zarr').reads_with_gdal
+    assert driver_for_format('GeoTIFF') is None
+    assert driver_for_format(None) is None
+
+    with pytest.raises(ValueError):
+        get_driver('GeoTIFF')
+
+    assert get_driver('zarr').band_location('file:///tmp/storage_unit.zarr', 'B10') == '/tmp/storage_unit.zarr/B10'
+    with pytest.raises(RuntimeError):
+        get_driver('zarr').band_location('s3://bucket/storage_unit.zarr', 'B10')
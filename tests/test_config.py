@@ -12,6 +12,7 @@ def test_find_defaults():
     config = LocalConfig.find(paths=[])
     assert config.db_hostname == ''
     assert config.db_database == 'datacube'
+    assert config.db_fetch_size == 1000
 
 
 def test_find_config():
@@ -6,6 +6,8 @@ try:
 except ImportError:
     import pickle
 
+import numpy
+
 from datacube.utils import geometry
 
 
@@ -183,6 +185,23 @@ def test_crs_equality():
     assert a == c
     assert b == c
 
+    # Equal CRSs are interchangeable as keys
+    assert len({a, b, c}) == 1
+    assert {a: 1}[c] == 1
+    assert a != 'EPSG:4326'
+    assert a != None  # noqa: E711
+
+
+def test_transformations_are_reused():
+    wgs84, albers = geometry.CRS('EPSG:4326'), geometry.CRS('EPSG:3577')
+
+    transform = geometry._transformation(wgs84, albers)  # pylint: disable=protected-access
+    assert geometry._transformation(geometry.CRS('EPSG:4326'), albers) is transform
+    assert geometry._transformation(albers, wgs84) is not transform
+
+    point = geometry.point(149, -35, wgs84)
+    assert numpy.allclose(point.to_crs(albers).to_crs(wgs84).coords, point.coords)
+
 
 def test_geobox():
     points_list = [
@@ -2,7 +2,7 @@
 
 import numpy
 from datacube.model import GridSpec
-from datacube.utils import geometry
+from datacube.utils import geometry, intersects
 
 
 def test_gridspec():
@@ -14,6 +14,33 @@ def test_gridspec():
     assert numpy.isclose(cells[(2, 0)].coordinates['latitude'].values, numpy.linspace(10.95, 10.05, num=10)).all()
 
 
+def test_gridspec_tiles_of_geopolygons():
+    gs = GridSpec(crs=geometry.CRS('EPSG:4326'), tile_size=(1, 1), resolution=(-0.1, 0.1), origin=(10, 10))
+    polygons = [
+        geometry.polygon([(10, 12.2), (10.8, 13), (13, 10.8), (12.2, 10), (10, 12.2)], crs=geometry.CRS('EPSG:4326')),
+        None,
+        geometry.box(11.2, 11.2, 11.8, 11.8, crs=geometry.CRS('EPSG:4326')),
+        geometry.box(1200000, -4000000, 1300000, -3900000, crs=geometry.CRS('EPSG:3577')),
+    ]
+
+    for tile_buffer in [(0, 0), (0.2, 0.2)]:
+        tiles = gs.tiles_of_geopolygons(polygons, tile_buffer=tile_buffer)
+        expected = {}
+        for position, polygon in enumerate(polygons):
+            if polygon is not None:
+                polygon = polygon.to_crs(gs.crs)
+                # Every tile in the bounding box, compared exactly
+                for index, geobox in gs.tiles(polygon.boundingbox.buffered(*tile_buffer)):
+                    if intersects(geobox.buffered(*tile_buffer).extent, polygon):
+                        expected.setdefault(index, []).append(position)
+        assert tiles == expected
+
+    tiles = gs.tiles_of_geopolygons(polygons)
+    assert set(tiles) == {(0, 1), (0, 2), (1, 0), (1, 1), (1, 2), (2, 0), (2, 1)}
+    assert tiles[(1, 1)] == [0, 2]
+    assert gs.tiles_of_geopolygons([]) == {}
+
+
 def test_gridspec_upperleft():
     """ Test to ensure grid indexes can be counted correctly from bottom left or top left
     """